@@ -14,12 +14,15 @@
 #    under the License.
 
 
+import datetime
+import hashlib
 import os
 import re
 
 import enum
 from oslo_config import cfg
 from oslo_log import log as logging
+from oslo_utils import timeutils
 from six.moves import urllib
 import webob
 
@@ -48,7 +51,20 @@ api_common_opts = [
                      "query volumes. Default values "
                      "are: ['name', 'status', "
                      "'metadata', 'availability_zone' ,"
-                     "'bootable']")
+                     "'bootable']"),
+    cfg.BoolOpt('osapi_list_etags',
+                default=False,
+                help='Send an ETag with volume, snapshot and backup '
+                     'listings requested with an If-None-Match header, and '
+                     'answer the requests whose header matches it with a '
+                     '304 Not Modified response without running the '
+                     'listing query. Listings requested without the header '
+                     'are neither tagged nor checked'),
+    cfg.IntOpt('osapi_list_etag_delay',
+               default=2,
+               help='Number of seconds after the last change of a listing '
+                    'during which it is not tagged, as the timestamps it '
+                    'is tagged from may have a one second granularity'),
 ]
 
 CONF = cfg.CONF
@@ -267,6 +283,46 @@ def remove_version_from_href(href):
     return urllib.parse.urlunsplit(parsed_url)
 
 
+def check_list_etag(req, get_generation):
+    """Handle a conditional GET of a resource listing.
+
+    The ETag of a listing is derived from everything in the request that
+    shapes the response and from get_generation(), a cheap aggregate of the
+    listed tables, so the listing itself is not built when the client's
+    copy is still current. Only requests with an If-None-Match header are
+    checked and tagged, so plain listings don't pay for the aggregate.
+    Clients get their first ETag by sending a tag matching nothing.
+
+    :param req: API request
+    :param get_generation: callable returning a value that changes whenever
+                           the listed resources do
+    :returns: (etag, response) tuple, where response is a 304 response to
+              return as is, or None if the listing has to be built and sent
+              with etag, the value of its ETag header, which is None when it
+              must not be tagged
+    """
+    if not CONF.osapi_list_etags or 'If-None-Match' not in req.headers:
+        return None, None
+
+    generation = get_generation()
+    changes = [value for value in generation
+               if isinstance(value, datetime.datetime)]
+    if changes and (timeutils.utcnow() - max(changes) <
+                    datetime.timedelta(seconds=CONF.osapi_list_etag_delay)):
+        return None, None
+
+    context = req.environ['cinder.context']
+    key = (req.path, sorted(req.GET.items()), req.best_match_content_type(),
+           str(req.api_version_request), context.project_id,
+           context.is_admin, sorted(context.roles), generation)
+    etag = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+    if etag in req.if_none_match:
+        response = webob.Response(status_int=304)
+        response.etag = etag
+        return response.headers['ETag'], response
+    return '"%s"' % etag, None
+
+
 class ViewBuilder(object):
     """Model API responses as dictionaries."""
 
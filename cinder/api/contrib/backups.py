@@ -100,6 +100,11 @@ class BackupsController(wsgi.Controller):
             filters['display_name'] = filters['name']
             del filters['name']
 
+        etag, response = common.check_list_etag(
+            req, lambda: self.backup_api.get_generation(context, filters))
+        if response is not None:
+            return response
+
         backups = self.backup_api.get_all(context, search_opts=filters,
                                           marker=marker,
                                           limit=limit,
@@ -114,6 +119,9 @@ class BackupsController(wsgi.Controller):
             backups = self._view_builder.detail_list(req, backups.objects)
         else:
             backups = self._view_builder.summary_list(req, backups.objects)
+
+        if etag:
+            return wsgi.ResponseObject(backups, headers={'ETag': etag})
         return backups
 
     # TODO(frankm): Add some checks here including
@@ -72,6 +72,7 @@ class QuotaClassSetsController(wsgi.Controller):
                     db.quota_class_create(context, quota_class, key, value)
                 except exception.AdminRequired:
                     raise webob.exc.HTTPForbidden()
+        QUOTAS.invalidate_limits()
         return {'quota_class_set': QUOTAS.get_class_quotas(context,
                                                            quota_class)}
 
@@ -287,6 +287,7 @@ class QuotaSetsController(wsgi.Controller):
                 db.quota_create(context, target_project_id, key, value)
             except exception.AdminRequired:
                 raise webob.exc.HTTPForbidden()
+        QUOTAS.invalidate_limits()
 
         if reservations:
             db.reservation_commit(context, reservations)
@@ -349,6 +350,7 @@ class QuotaSetsController(wsgi.Controller):
                 db.quota_destroy_by_project(context, id)
             except exception.AdminRequired:
                 raise webob.exc.HTTPForbidden()
+            QUOTAS.invalidate_limits()
 
     def _delete_nested_quota(self, ctxt, proj_id):
         # Get the parent_id of the target project to verify whether we are
@@ -390,6 +392,7 @@ class QuotaSetsController(wsgi.Controller):
             db.quota_destroy_by_project(ctxt, target_project.id)
         except exception.AdminRequired:
             raise webob.exc.HTTPForbidden()
+        QUOTAS.invalidate_limits()
 
         for res, limit in project_quotas.items():
             # Update child limit to 0 so the parent hierarchy gets it's
@@ -97,6 +97,12 @@ class SnapshotsController(wsgi.Controller):
             search_opts['display_name'] = search_opts['name']
             del search_opts['name']
 
+        etag, response = common.check_list_etag(
+            req, lambda: self.volume_api.get_snapshots_generation(
+                context, search_opts))
+        if response is not None:
+            return response
+
         snapshots = self.volume_api.get_all_snapshots(context,
                                                       search_opts=search_opts,
                                                       marker=marker,
@@ -111,6 +117,9 @@ class SnapshotsController(wsgi.Controller):
             snapshots = self._view_builder.detail_list(req, snapshots.objects)
         else:
             snapshots = self._view_builder.summary_list(req, snapshots.objects)
+
+        if etag:
+            return wsgi.ResponseObject(snapshots, headers={'ETag': etag})
         return snapshots
 
     @wsgi.response(202)
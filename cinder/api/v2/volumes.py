@@ -110,22 +110,38 @@ class VolumeController(wsgi.Controller):
             del filters['name']
 
         self.volume_api.check_volume_filters(filters)
-        volumes = self.volume_api.get_all(context, marker, limit,
-                                          sort_keys=sort_keys,
-                                          sort_dirs=sort_dirs,
-                                          filters=filters,
-                                          viewable_admin_meta=True,
-                                          offset=offset)
 
-        for volume in volumes:
-            utils.add_visible_admin_metadata(volume)
-
-        req.cache_db_volumes(volumes.objects)
+        etag, response = common.check_list_etag(
+            req, lambda: self.volume_api.get_generation(context, filters))
+        if response is not None:
+            return response
 
         if is_detail:
+            volumes = self.volume_api.get_all(context, marker, limit,
+                                              sort_keys=sort_keys,
+                                              sort_dirs=sort_dirs,
+                                              filters=filters,
+                                              viewable_admin_meta=True,
+                                              offset=offset)
+
+            for volume in volumes:
+                utils.add_visible_admin_metadata(volume)
+
+            req.cache_db_volumes(volumes.objects)
+
             volumes = self._view_builder.detail_list(req, volumes)
         else:
+            # The summary view only needs the id and name of the volumes,
+            # skip building the volume objects and their admin metadata.
+            volumes = self.volume_api.get_all_summary(context, marker, limit,
+                                                      sort_keys=sort_keys,
+                                                      sort_dirs=sort_dirs,
+                                                      filters=filters,
+                                                      offset=offset)
             volumes = self._view_builder.summary_list(req, volumes)
+
+        if etag:
+            return wsgi.ResponseObject(volumes, headers={'ETag': etag})
         return volumes
 
     def _image_uuid_from_ref(self, image_ref, context):
@@ -47,22 +47,37 @@ class VolumeController(volumes_v2.VolumeController):
         strict = req.api_version_request.matches("3.2", None)
         self.volume_api.check_volume_filters(filters, strict)
 
-        volumes = self.volume_api.get_all(context, marker, limit,
-                                          sort_keys=sort_keys,
-                                          sort_dirs=sort_dirs,
-                                          filters=filters,
-                                          viewable_admin_meta=True,
-                                          offset=offset)
+        etag, response = common.check_list_etag(
+            req, lambda: self.volume_api.get_generation(context, filters))
+        if response is not None:
+            return response
 
-        for volume in volumes:
-            utils.add_visible_admin_metadata(volume)
+        if is_detail:
+            volumes = self.volume_api.get_all(context, marker, limit,
+                                              sort_keys=sort_keys,
+                                              sort_dirs=sort_dirs,
+                                              filters=filters,
+                                              viewable_admin_meta=True,
+                                              offset=offset)
 
-        req.cache_db_volumes(volumes.objects)
+            for volume in volumes:
+                utils.add_visible_admin_metadata(volume)
+
+            req.cache_db_volumes(volumes.objects)
 
-        if is_detail:
             volumes = self._view_builder.detail_list(req, volumes)
         else:
+            # The summary view only needs the id and name of the volumes,
+            # skip building the volume objects and their admin metadata.
+            volumes = self.volume_api.get_all_summary(context, marker, limit,
+                                                      sort_keys=sort_keys,
+                                                      sort_dirs=sort_dirs,
+                                                      filters=filters,
+                                                      offset=offset)
             volumes = self._view_builder.summary_list(req, volumes)
+
+        if etag:
+            return wsgi.ResponseObject(volumes, headers={'ETag': etag})
         return volumes
 
 
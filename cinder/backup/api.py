@@ -138,6 +138,19 @@ class API(base.Base):
 
         return backups
 
+    def get_generation(self, context, search_opts=None):
+        """Get the change token of the backups get_all lists."""
+        check_policy(context, 'get_all')
+
+        search_opts = search_opts or {}
+        all_tenants = search_opts.get('all_tenants', '0')
+        if (context.is_admin and utils.is_valid_boolstr(all_tenants) and
+                strutils.bool_from_string(all_tenants)):
+            project_id = None
+        else:
+            project_id = context.project_id
+        return self.db.backup_get_generation(context, project_id)
+
     def _is_scalable_only(self):
         """True if we're running in deployment where all c-bak are scalable.
 
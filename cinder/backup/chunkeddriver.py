@@ -309,8 +309,15 @@ class ChunkedBackupDriver(driver.BackupDriver):
                 volume_size_bytes)
 
     def _backup_chunk(self, backup, container, data, data_offset,
-                      object_meta, extra_metadata):
-        """Backup data chunk based on the object metadata and offset."""
+                      object_meta, extra_metadata, md5=None):
+        """Backup data chunk based on the object metadata and offset.
+
+        The MD5 hex digest of the data is computed unless given.
+        """
+        if isinstance(data, memoryview):
+            # The view is on the buffer reused for the next chunk, the
+            # compressor and the object writers get their own copy.
+            data = data.tobytes()
         object_prefix = object_meta['prefix']
         object_list = object_meta['list']
 
@@ -328,7 +335,8 @@ class ChunkedBackupDriver(driver.BackupDriver):
                 container, object_name, extra_metadata=extra_metadata
         ) as writer:
             writer.write(output_data)
-        md5 = hashlib.md5(data).hexdigest()
+        if md5 is None:
+            md5 = hashlib.md5(data).hexdigest()
         obj[object_name]['md5'] = md5
         LOG.debug('backup MD5 for %(object_name)s: %(md5)s',
                   {'object_name': object_name, 'md5': md5})
@@ -340,6 +348,71 @@ class ChunkedBackupDriver(driver.BackupDriver):
         LOG.debug('Calling eventlet.sleep(0)')
         eventlet.sleep(0)
 
+    @staticmethod
+    def _read_chunk(volume_file, buf):
+        """Read from volume_file into the buffer until it is full.
+
+        Returns the number of bytes read, less than the size of the buffer
+        only at the end of the volume. Volume files without readinto are
+        read with read.
+        """
+        length = 0
+        size = len(buf)
+        while length < size:
+            try:
+                count = volume_file.readinto(buf[length:])
+            except (AttributeError, NotImplementedError):
+                data = volume_file.read(size - length)
+                count = len(data)
+                buf[length:length + count] = data
+            if not count:
+                break
+            length += count
+        return length
+
+    def _backup_data(self, backup, container, data, data_offset,
+                     parent_backup_shalist, object_meta, extra_metadata):
+        """Hash the data and back up its extents changed since the parent.
+
+        Without the sha list of a parent backup all of the data is backed
+        up. The shas of the blocks and the MD5s of the extents to back up
+        are calculated in a single pass over the data. Returns the shas of
+        the blocks.
+        """
+        shaindex = data_offset // self.sha_block_size_bytes
+        shalist = []
+        extents = []
+        extent_off = None
+        extent_md5 = None
+        for off in range(0, len(data), self.sha_block_size_bytes):
+            block = data[off:off + self.sha_block_size_bytes]
+            sha = hashlib.sha256(block).hexdigest()
+            shalist.append(sha)
+            if (parent_backup_shalist is not None and
+                    sha == parent_backup_shalist[shaindex]):
+                if extent_off is not None:
+                    # We've reached the end of extent.
+                    extents.append((extent_off, off, extent_md5))
+                    extent_off = None
+            elif extent_off is None:
+                # Start of new extent.
+                extent_off = off
+                extent_md5 = hashlib.md5(block)
+            else:
+                extent_md5.update(block)
+            shaindex += 1
+        # The last extent extends to the end of data buffer.
+        if extent_off is not None:
+            extents.append((extent_off, len(data), extent_md5))
+
+        for extent_off, extent_end, md5_hash in extents:
+            self._backup_chunk(backup, container,
+                               data[extent_off:extent_end],
+                               data_offset + extent_off,
+                               object_meta, extra_metadata,
+                               md5=md5_hash.hexdigest())
+        return shalist
+
     def _prepare_output_data(self, data):
         if self.compressor is None:
             return 'none', data
@@ -432,6 +505,7 @@ class ChunkedBackupDriver(driver.BackupDriver):
         # Read the shafile of the parent backup if backup['parent_id']
         # is given.
         parent_backup_shafile = None
+        parent_backup_shalist = None
         parent_backup = None
         if backup.parent_id:
             parent_backup = objects.Backup.get_by_id(self.context,
@@ -475,8 +549,10 @@ class ChunkedBackupDriver(driver.BackupDriver):
             timer.start(interval=self.backup_timer_interval)
 
         sha256_list = object_sha256['sha256s']
-        shaindex = 0
         is_backup_canceled = False
+        # The chunks are read into the same buffer and hashed through views
+        # on it, so the data isn't copied for hashing.
+        chunk_buf = memoryview(bytearray(self.chunk_size_bytes))
         while True:
             # First of all, we check the status of this backup. If it
             # has been changed to delete or has been deleted, we cancel the
@@ -491,58 +567,16 @@ class ChunkedBackupDriver(driver.BackupDriver):
                 LOG.debug('Cancel the backup process of %s.', backup.id)
                 break
             data_offset = volume_file.tell()
-            data = volume_file.read(self.chunk_size_bytes)
-            if data == b'':
+            datalen = self._read_chunk(volume_file, chunk_buf)
+            if not datalen:
                 break
 
-            # Calculate new shas with the datablock.
-            shalist = []
-            off = 0
-            datalen = len(data)
-            while off < datalen:
-                chunk_start = off
-                chunk_end = chunk_start + self.sha_block_size_bytes
-                if chunk_end > datalen:
-                    chunk_end = datalen
-                chunk = data[chunk_start:chunk_end]
-                sha = hashlib.sha256(chunk).hexdigest()
-                shalist.append(sha)
-                off += self.sha_block_size_bytes
-            sha256_list.extend(shalist)
-
-            # If parent_backup is not None, that means an incremental
-            # backup will be performed.
-            if parent_backup:
-                # Find the extent that needs to be backed up.
-                extent_off = -1
-                for idx, sha in enumerate(shalist):
-                    if sha != parent_backup_shalist[shaindex]:
-                        if extent_off == -1:
-                            # Start of new extent.
-                            extent_off = idx * self.sha_block_size_bytes
-                    else:
-                        if extent_off != -1:
-                            # We've reached the end of extent.
-                            extent_end = idx * self.sha_block_size_bytes
-                            segment = data[extent_off:extent_end]
-                            self._backup_chunk(backup, container, segment,
-                                               data_offset + extent_off,
-                                               object_meta,
-                                               extra_metadata)
-                            extent_off = -1
-                    shaindex += 1
-
-                # The last extent extends to the end of data buffer.
-                if extent_off != -1:
-                    extent_end = datalen
-                    segment = data[extent_off:extent_end]
-                    self._backup_chunk(backup, container, segment,
-                                       data_offset + extent_off,
-                                       object_meta, extra_metadata)
-                    extent_off = -1
-            else:  # Do a full backup.
-                self._backup_chunk(backup, container, data, data_offset,
-                                   object_meta, extra_metadata)
+            sha256_list.extend(self._backup_data(backup, container,
+                                                 chunk_buf[:datalen],
+                                                 data_offset,
+                                                 parent_backup_shalist,
+                                                 object_meta,
+                                                 extra_metadata))
 
             # Notifications
             total_block_sent_num += self.data_block_num
@@ -20,6 +20,7 @@ LVM class for performing LVM operations.
 import math
 import os
 import re
+import time
 
 from os_brick import executor
 from oslo_concurrency import processutils as putils
@@ -70,6 +71,14 @@ class LVM(executor.Executor):
         self._supports_snapshot_lv_activation = None
         self._supports_lvchange_ignoreskipactivation = None
         self.vg_provisioned_capacity = 0.0
+        # LVs of the VG as found by the last update_volume_group_info call,
+        # keyed by the VG name and metadata sequence number they were read
+        # at.
+        self._lv_list = None
+        self._lv_list_key = None
+        # Seconds taken by each command run by the last
+        # update_volume_group_info call.
+        self.stats_timings = {}
 
         # Ensure LVM_SYSTEM_DIR has been added to LVM.LVM_CMD_PREFIX
         # before the first LVM command is executed, and use the directory
@@ -352,7 +361,7 @@ class LVM(executor.Executor):
         """
         cmd = LVM.LVM_CMD_PREFIX + ['vgs', '--noheadings',
                                     '--unit=g', '-o',
-                                    'name,size,free,lv_count,uuid',
+                                    'name,size,free,lv_count,uuid,vg_seqno',
                                     '--separator', ':',
                                     '--nosuffix']
         if vg_name is not None:
@@ -370,20 +379,34 @@ class LVM(executor.Executor):
                                 'size': float(fields[1]),
                                 'available': float(fields[2]),
                                 'lv_count': int(fields[3]),
-                                'uuid': fields[4]})
+                                'uuid': fields[4],
+                                'seqno': int(fields[5])})
 
         return vg_list
 
+    def _timed(self, name, func, *args):
+        start = time.time()
+        try:
+            return func(*args)
+        finally:
+            self.stats_timings[name] = round(time.time() - start, 3)
+
     def update_volume_group_info(self):
         """Update VG info for this instantiation.
 
         Used to update member fields of object and
         provide a dict of info for caller.
 
+        The LVs of the VG are only listed again when the VG metadata
+        sequence number has changed since they were last listed, so that
+        a VG with many LVs is not walked on every stats update.
+
         :returns: Dictionaries of VG info
 
         """
-        vg_list = self.get_all_volume_groups(self._root_helper, self.vg_name)
+        self.stats_timings = {}
+        vg_list = self._timed('vgs', self.get_all_volume_groups,
+                              self._root_helper, self.vg_name)
 
         if len(vg_list) != 1:
             LOG.error(_LE('Unable to find VG: %s'), self.vg_name)
@@ -394,8 +417,10 @@ class LVM(executor.Executor):
         self.vg_lv_count = int(vg_list[0]['lv_count'])
         self.vg_uuid = vg_list[0]['uuid']
 
-        total_vols_size = 0.0
-        if self.vg_thin_pool is not None:
+        seqno = vg_list[0].get('seqno')
+        lv_list_key = (self.vg_name, seqno)
+        if (self._lv_list is None or seqno is None or
+                lv_list_key != self._lv_list_key):
             # NOTE(xyang): If providing only self.vg_name,
             # get_lv_info will output info on the thin pool and all
             # individual volumes.
@@ -407,19 +432,15 @@ class LVM(executor.Executor):
             # stack-vg volume-629e13ab-7759-46a5-b155-ee1eb20ca892  1.00
             # stack-vg volume-e3e6281c-51ee-464c-b1a7-db6c0854622c  1.00
             #
-            # If providing both self.vg_name and self.vg_thin_pool,
-            # get_lv_info will output only info on the thin pool, but not
-            # individual volumes.
-            # get_lv_info(self._root_helper, 'stack-vg', 'stack-pool')
-            # sudo lvs --noheadings --unit=g -o vg_name,name,size
-            # --nosuffix stack-vg/stack-pool
-            # stack-vg stack-pool               9.51
-            #
             # We need info on both the thin pool and the volumes,
             # therefore we should provide only self.vg_name, but not
             # self.vg_thin_pool here.
-            for lv in self.get_lv_info(self._root_helper,
-                                       self.vg_name):
+            self._lv_list = self._timed('lvs', self.get_volumes)
+            self._lv_list_key = lv_list_key
+
+        total_vols_size = 0.0
+        if self.vg_thin_pool is not None:
+            for lv in self._lv_list:
                 lvsize = lv['size']
                 # get_lv_info runs "lvs" command with "--nosuffix".
                 # This removes "g" from "1.00g" and only outputs "1.00".
@@ -430,14 +451,31 @@ class LVM(executor.Executor):
                     lvsize = lvsize[:-1]
                 if lv['name'] == self.vg_thin_pool:
                     self.vg_thin_pool_size = lvsize
-                    tpfs = self._get_thin_pool_free_space(self.vg_name,
-                                                          self.vg_thin_pool)
+                    # The data usage of the pool changes without the VG
+                    # metadata changing, so it is always queried.
+                    tpfs = self._timed('thin_pool',
+                                       self._get_thin_pool_free_space,
+                                       self.vg_name, self.vg_thin_pool)
                     self.vg_thin_pool_free_space = tpfs
                 else:
                     total_vols_size = total_vols_size + float(lvsize)
             total_vols_size = round(total_vols_size, 2)
 
         self.vg_provisioned_capacity = total_vols_size
+        LOG.debug('Updated info of VG %(vg)s, seconds taken: %(timings)s',
+                  {'vg': self.vg_name, 'timings': self.stats_timings})
+
+    def get_cached_volumes(self):
+        """Get the LVs found by the last update_volume_group_info call.
+
+        Falls back to listing the LVs if the VG info was never updated.
+
+        :returns: List of Dictionaries with LV info
+
+        """
+        if self._lv_list is None:
+            return self.get_volumes()
+        return self._lv_list
 
     def _calculate_thin_pool_size(self):
         """Calculates the correct size for a thin pool.
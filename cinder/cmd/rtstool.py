@@ -16,6 +16,7 @@
 #    limitations under the License.
 
 import os
+import shlex
 import sys
 
 # We always use rtslib-fb, but until version 2.1.52 it didn't have its own
@@ -171,6 +172,22 @@ def delete(iqn):
             break
 
 
+def batch(commands):
+    """Run several commands in a single process.
+
+    Each line of commands holds the arguments of one command, as they would
+    be given on the command line.  Execution stops at the first command that
+    fails.
+    """
+    for line in commands.splitlines():
+        argv = shlex.split(line)
+        if not argv:
+            continue
+        if argv[0] == 'batch':
+            usage()
+        main([sys.argv[0]] + argv)
+
+
 def verify_rtslib():
     for member in ['BlockStorageObject', 'FabricModule', 'LUN',
                    'MappedLUN', 'NetworkPortal', 'NodeACL', 'root',
@@ -194,6 +211,7 @@ def usage():
     print(sys.argv[0] + " delete [iqn]")
     print(sys.argv[0] + " verify")
     print(sys.argv[0] + " save [path_to_file]")
+    print(sys.argv[0] + " batch (one command per line on stdin)")
     sys.exit(1)
 
 
@@ -345,6 +363,13 @@ def main(argv=None):
         restore_from_file(configuration_file)
         return 0
 
+    elif argv[1] == 'batch':
+        if len(argv) > 2:
+            usage()
+
+        batch(sys.stdin.read())
+        return 0
+
     else:
         usage()
 
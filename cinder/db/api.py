@@ -198,6 +198,25 @@ def volume_get_all(context, marker, limit, sort_keys=None, sort_dirs=None,
                                offset=offset)
 
 
+def volume_get_generation(context, project_id=None):
+    """Get a value that changes whenever a volume listing would.
+
+    It covers the volumes of the given project, or of all projects if
+    project_id is None, along with their metadata and attachments.
+    """
+    return IMPL.volume_get_generation(context, project_id)
+
+
+def volume_get_all_summary(context, marker, limit, sort_keys=None,
+                           sort_dirs=None, filters=None, offset=None,
+                           project_id=None):
+    """Get the id and name of all volumes, or of a project's volumes."""
+    return IMPL.volume_get_all_summary(context, marker, limit,
+                                       sort_keys=sort_keys,
+                                       sort_dirs=sort_dirs, filters=filters,
+                                       offset=offset, project_id=project_id)
+
+
 def volume_get_all_by_host(context, host, filters=None):
     """Get all volumes belonging to a host."""
     return IMPL.volume_get_all_by_host(context, host, filters=filters)
@@ -228,6 +247,11 @@ def volume_update(context, volume_id, values):
     return IMPL.volume_update(context, volume_id, values)
 
 
+def volume_update_all(context, volume_ids, values):
+    """Set the given properties on several volumes with a single update."""
+    return IMPL.volume_update_all(context, volume_ids, values)
+
+
 def volume_attachment_update(context, attachment_id, values):
     return IMPL.volume_attachment_update(context, attachment_id, values)
 
@@ -284,6 +308,11 @@ def snapshot_get(context, snapshot_id):
     return IMPL.snapshot_get(context, snapshot_id)
 
 
+def snapshot_get_generation(context, project_id=None):
+    """Get a value that changes whenever a snapshot listing would."""
+    return IMPL.snapshot_get_generation(context, project_id)
+
+
 def snapshot_get_all(context, filters=None, marker=None, limit=None,
                      sort_keys=None, sort_dirs=None, offset=None):
     """Get all snapshots."""
@@ -328,6 +357,11 @@ def snapshot_update(context, snapshot_id, values):
     return IMPL.snapshot_update(context, snapshot_id, values)
 
 
+def snapshot_update_all(context, snapshot_ids, values):
+    """Set the given properties on several snapshots with a single update."""
+    return IMPL.snapshot_update_all(context, snapshot_ids, values)
+
+
 def snapshot_data_get_for_project(context, project_id, volume_type_id=None):
     """Get count and gigabytes used for snapshots for specified project."""
     return IMPL.snapshot_data_get_for_project(context,
@@ -449,6 +483,16 @@ def volume_type_get_all(context, inactive=False, filters=None, marker=None,
                                     list_result=list_result)
 
 
+def volume_type_get_generation(context):
+    """Get the id and name of every volume type, sorted by id.
+
+    The value changes whenever a volume type is added, renamed or removed,
+    so it can be used to tell whether anything derived from the set of
+    volume types is stale.
+    """
+    return IMPL.volume_type_get_generation(context)
+
+
 def volume_type_get(context, id, inactive=False, expected_fields=None):
     """Get volume type by id.
 
@@ -886,6 +930,11 @@ def backup_get(context, backup_id, read_deleted=None, project_only=True):
     return IMPL.backup_get(context, backup_id, read_deleted, project_only)
 
 
+def backup_get_generation(context, project_id=None):
+    """Get a value that changes whenever a backup listing would."""
+    return IMPL.backup_get_generation(context, project_id)
+
+
 def backup_get_all(context, filters=None, marker=None, limit=None,
                    offset=None, sort_keys=None, sort_dirs=None):
     """Get all backups."""
@@ -354,6 +354,19 @@ QUOTA_SYNC_FUNCTIONS = {
 }
 
 
+def _quota_sync_resource(resource):
+    """Return the name of the usage refreshed by the sync of a resource.
+
+    Each sync routine refreshes a single usage, named after the routine and,
+    for the per volume type resources, the volume type.
+    """
+    name = resource.sync[len('_sync_'):]
+    volume_type_name = getattr(resource, 'volume_type_name', None)
+    if volume_type_name:
+        name += '_' + volume_type_name
+    return name
+
+
 ###################
 
 
@@ -819,14 +832,21 @@ def _reservation_create(context, uuid, usage, project_id, resource, delta,
 # cause under or over counting of resources. To avoid deadlocks, this
 # code always acquires the lock on quota_usages before acquiring the lock
 # on reservations.
+# Only the usage rows of the resources being changed are locked, always in
+# ascending id order, so that requests for the same project touching
+# different resources don't serialize on each other.
 
-def _get_quota_usages(context, session, project_id):
+def _get_quota_usages(context, session, project_id, resources=None):
     # Broken out for testability
-    rows = model_query(context, models.QuotaUsage,
-                       read_deleted="no",
-                       session=session).\
-        filter_by(project_id=project_id).\
-        order_by(models.QuotaUsage.id.asc()).\
+    query = model_query(context, models.QuotaUsage,
+                        read_deleted="no",
+                        session=session).\
+        filter_by(project_id=project_id)
+    if resources is not None:
+        if not resources:
+            return {}
+        query = query.filter(models.QuotaUsage.resource.in_(resources))
+    rows = query.order_by(models.QuotaUsage.id.asc()).\
         with_lockmode('update').\
         all()
     return {row.resource: row for row in rows}
@@ -865,8 +885,15 @@ def quota_reserve(context, resources, quotas, deltas, expire,
         if project_id is None:
             project_id = context.project_id
 
-        # Get the current usages
-        usages = _get_quota_usages(context, session, project_id)
+        # Get the current usages, locking up front every usage the sync
+        # routines may refresh too, so that all the rows are locked in the
+        # same order.
+        locked = set(deltas)
+        locked.update(_quota_sync_resource(resources[res])
+                      for res in deltas
+                      if getattr(resources[res], 'sync', None))
+        usages = _get_quota_usages(context, session, project_id,
+                                   resources=sorted(locked))
         allocated = quota_allocated_get_all_by_project(context, project_id)
         allocated.pop('project_id')
 
@@ -1030,6 +1057,29 @@ def _quota_reservations(session, context, reservations):
         all()
 
 
+def _quota_reservations_resources(session, context, reservations):
+    """Return the resources of the reservations, without locking them."""
+    rows = model_query(context, models.Reservation.resource,
+                       read_deleted="no",
+                       session=session).\
+        filter(models.Reservation.uuid.in_(reservations)).\
+        distinct().\
+        all()
+    return sorted(row.resource for row in rows)
+
+
+def _quota_reservations_delete(session, context, reservations):
+    """Delete the reservations with a single statement."""
+    model_query(context, models.Reservation,
+                read_deleted="no",
+                session=session).\
+        filter(models.Reservation.uuid.in_(reservations)).\
+        update({'deleted': True,
+                'deleted_at': timeutils.utcnow(),
+                'updated_at': literal_column('updated_at')},
+               synchronize_session=False)
+
+
 def _dict_with_usage_id(usages):
     return {row.id: row for row in usages.values()}
 
@@ -1039,7 +1089,10 @@ def _dict_with_usage_id(usages):
 def reservation_commit(context, reservations, project_id=None):
     session = get_session()
     with session.begin():
-        usages = _get_quota_usages(context, session, project_id)
+        resources = _quota_reservations_resources(session, context,
+                                                  reservations)
+        usages = _get_quota_usages(context, session, project_id,
+                                   resources=resources)
         usages = _dict_with_usage_id(usages)
 
         for reservation in _quota_reservations(session, context, reservations):
@@ -1050,7 +1103,7 @@ def reservation_commit(context, reservations, project_id=None):
                     usage.reserved -= reservation.delta
                 usage.in_use += reservation.delta
 
-            reservation.delete(session=session)
+        _quota_reservations_delete(session, context, reservations)
 
 
 @require_context
@@ -1058,7 +1111,10 @@ def reservation_commit(context, reservations, project_id=None):
 def reservation_rollback(context, reservations, project_id=None):
     session = get_session()
     with session.begin():
-        usages = _get_quota_usages(context, session, project_id)
+        resources = _quota_reservations_resources(session, context,
+                                                  reservations)
+        usages = _get_quota_usages(context, session, project_id,
+                                   resources=resources)
         usages = _dict_with_usage_id(usages)
         for reservation in _quota_reservations(session, context, reservations):
             if reservation.allocated_id:
@@ -1068,7 +1124,7 @@ def reservation_rollback(context, reservations, project_id=None):
                 if reservation.delta >= 0:
                     usage.reserved -= reservation.delta
 
-            reservation.delete(session=session)
+        _quota_reservations_delete(session, context, reservations)
 
 
 def quota_destroy_by_project(*args, **kwargs):
@@ -1610,9 +1666,106 @@ def volume_get_all_by_project(context, project_id, marker, limit,
         return query.all()
 
 
+def _resource_get_generation(context, session, model, project_id=None,
+                             parent=None, parent_key='volume_id'):
+    """Aggregate the rows of model into a value that changes with them.
+
+    Deleted rows are included so that deleting one changes the max
+    deleted_at, while adding or updating one changes the row count or the
+    max created_at/updated_at.  Rows of a child model, such as metadata,
+    are scoped to a project through their parent model.
+    """
+    query = model_query(context,
+                        func.count(model.id),
+                        func.max(model.created_at),
+                        func.max(model.updated_at),
+                        func.max(model.deleted_at),
+                        session=session, read_deleted="yes")
+    if project_id is not None:
+        if parent is None:
+            query = query.filter(model.project_id == project_id)
+        else:
+            query = query.join(
+                parent, getattr(model, parent_key) == parent.id).filter(
+                parent.project_id == project_id)
+    return tuple(query.first())
+
+
+def _get_generation(context, model, children=(), project_id=None,
+                    parent_key='volume_id'):
+    if project_id is None:
+        if not is_admin_context(context):
+            raise exception.AdminRequired()
+    else:
+        authorize_project_context(context, project_id)
+
+    session = get_session()
+    with session.begin():
+        generation = _resource_get_generation(context, session, model,
+                                              project_id)
+        for child in children:
+            generation += _resource_get_generation(context, session, child,
+                                                   project_id, parent=model,
+                                                   parent_key=parent_key)
+    return generation
+
+
+@require_context
+def volume_get_generation(context, project_id=None):
+    # NOTE: Volume listings also show the volumes' metadata, image
+    # metadata, attachments and volume type names.
+    return (_get_generation(context, models.Volume,
+                            (models.VolumeMetadata,
+                             models.VolumeAdminMetadata,
+                             models.VolumeGlanceMetadata,
+                             models.VolumeAttachment),
+                            project_id=project_id) +
+            volume_type_get_generation(context))
+
+
+@require_context
+def volume_get_all_summary(context, marker, limit, sort_keys=None,
+                           sort_dirs=None, filters=None, offset=None,
+                           project_id=None):
+    """Retrieves the id and name of all volumes, or of a project's volumes.
+
+    Takes the same sorting, pagination and filtering arguments as
+    volume_get_all, but only the id and display_name columns are read:
+    no relationship is loaded and no model instance is built.
+
+    :param project_id: project for all volumes being retrieved, all
+                       projects if None, which requires an admin context
+    :returns: list of dictionaries with the 'id' and 'display_name' keys
+    """
+    if project_id is None and not is_admin_context(context):
+        raise exception.AdminRequired()
+
+    session = get_session()
+    with session.begin():
+        if project_id is not None:
+            authorize_project_context(context, project_id)
+            # Add in the project filter without modifying the given filters
+            filters = filters.copy() if filters else {}
+            filters['project_id'] = project_id
+        query = _generate_paginate_query(context, session, marker, limit,
+                                         sort_keys, sort_dirs, filters, offset,
+                                         get_query=_volume_summary_get_query)
+        # No volumes would match, return empty list
+        if query is None:
+            return []
+        query = query.with_entities(models.Volume.id,
+                                    models.Volume.display_name)
+        return [{'id': volume_id, 'display_name': display_name}
+                for volume_id, display_name in query]
+
+
+def _volume_summary_get_query(context, session=None):
+    return _volume_get_query(context, session=session, joined_load=False)
+
+
 def _generate_paginate_query(context, session, marker, limit, sort_keys,
                              sort_dirs, filters, offset=None,
-                             paginate_type=models.Volume):
+                             paginate_type=models.Volume, get_query=None):
     """Generate the query to include the filters and the paginate options.
 
     Returns a query with sorting / pagination criteria added or None
@@ -1633,9 +1786,13 @@ def _generate_paginate_query(context, session, marker, limit, sort_keys,
                     function for more information
     :param offset: number of items to skip
     :param paginate_type: type of pagination to generate
+    :param get_query: function building the base query, defaults to the
+                      one registered for paginate_type
     :returns: updated query or None
     """
-    get_query, process_filters, get = PAGINATION_HELPERS[paginate_type]
+    default_get_query, process_filters, get = PAGINATION_HELPERS[
+        paginate_type]
+    get_query = get_query or default_get_query
 
     sort_keys, sort_dirs = process_sort_params(sort_keys,
                                                sort_dirs,
@@ -1838,6 +1995,19 @@ def volume_update(context, volume_id, values):
         return volume_ref
 
 
+@handle_db_data_error
+@require_context
+def volume_update_all(context, volume_ids, values):
+    if not volume_ids:
+        return 0
+    session = get_session()
+    with session.begin():
+        return model_query(context, models.Volume, session=session,
+                           read_deleted="no").\
+            filter(models.Volume.id.in_(volume_ids)).\
+            update(values, synchronize_session=False)
+
+
 @require_context
 def volume_attachment_update(context, attachment_id, values):
     session = get_session()
@@ -2186,6 +2356,13 @@ def snapshot_get(context, snapshot_id):
     return _snapshot_get(context, snapshot_id)
 
 
+@require_context
+def snapshot_get_generation(context, project_id=None):
+    return _get_generation(context, models.Snapshot,
+                           (models.SnapshotMetadata,),
+                           project_id=project_id, parent_key='snapshot_id')
+
+
 @require_admin_context
 def snapshot_get_all(context, filters=None, marker=None, limit=None,
                      sort_keys=None, sort_dirs=None, offset=None):
@@ -2380,6 +2557,19 @@ def snapshot_update(context, snapshot_id, values):
         snapshot_ref.update(values)
         return snapshot_ref
 
+
+@handle_db_data_error
+@require_context
+def snapshot_update_all(context, snapshot_ids, values):
+    if not snapshot_ids:
+        return 0
+    session = get_session()
+    with session.begin():
+        return model_query(context, models.Snapshot, session=session,
+                           read_deleted="no").\
+            filter(models.Snapshot.id.in_(snapshot_ids)).\
+            update(values, synchronize_session=False)
+
 ####################
 
 
@@ -2668,6 +2858,19 @@ def volume_type_get_all(context, inactive=False, filters=None, marker=None,
         return result
 
 
+@require_context
+def volume_type_get_generation(context):
+    # NOTE: The names are returned rather than an aggregate of the
+    # timestamps, which only have a precision of a second and miss a type
+    # renamed within the second it was created or last updated in.
+    rows = model_query(context,
+                       models.VolumeTypes.id,
+                       models.VolumeTypes.name,
+                       read_deleted="no").\
+        order_by(models.VolumeTypes.id).all()
+    return tuple((row.id, row.name) for row in rows)
+
+
 def _volume_type_get_id_from_volume_type_query(context, id, session=None):
     return model_query(
         context, models.VolumeTypes.id, read_deleted="no",
@@ -3715,6 +3918,11 @@ def _process_backups_filters(query, filters):
     return query
 
 
+@require_context
+def backup_get_generation(context, project_id=None):
+    return _get_generation(context, models.Backup, project_id=project_id)
+
+
 @require_admin_context
 def backup_get_all(context, filters=None, marker=None, limit=None,
                    offset=None, sort_keys=None, sort_dirs=None):
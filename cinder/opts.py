@@ -161,6 +161,7 @@ from cinder.volume.drivers.zfssa import zfssaiscsi as \
     cinder_volume_drivers_zfssa_zfssaiscsi
 from cinder.volume.drivers.zfssa import zfssanfs as \
     cinder_volume_drivers_zfssa_zfssanfs
+from cinder.volume import http_client as cinder_volume_httpclient
 from cinder.volume import manager as cinder_volume_manager
 from cinder.wsgi import eventlet_server as cinder_wsgi_eventletserver
 from cinder.zonemanager.drivers.brocade import brcd_fabric_opts as \
@@ -173,6 +174,8 @@ from cinder.zonemanager.drivers.cisco import cisco_fc_zone_driver as \
     cinder_zonemanager_drivers_cisco_ciscofczonedriver
 from cinder.zonemanager import fc_zone_manager as \
     cinder_zonemanager_fczonemanager
+from cinder.zonemanager import fc_zone_service as \
+    cinder_zonemanager_fczoneservice
 
 
 def list_opts():
@@ -180,6 +183,7 @@ def list_opts():
         ('FC-ZONE-MANAGER',
             itertools.chain(
                 cinder_zonemanager_fczonemanager.zone_manager_opts,
+                cinder_zonemanager_fczoneservice.zone_service_opts,
                 cinder_zonemanager_drivers_brocade_brcdfczonedriver.brcd_opts,
                 cinder_zonemanager_drivers_cisco_ciscofczonedriver.cisco_opts,
             )),
@@ -269,6 +273,7 @@ def list_opts():
                 cinder_volume_drivers_zfssa_zfssaiscsi.ZFSSA_OPTS,
                 cinder_volume_driver.volume_opts,
                 cinder_volume_driver.iser_opts,
+                cinder_volume_httpclient.http_client_opts,
                 cinder_api_views_versions.versions_opts,
                 cinder_volume_drivers_nimble.nimble_opts,
                 cinder_volume_drivers_windows_windows.windows_opts,
@@ -18,6 +18,7 @@
 
 from collections import deque
 import datetime
+import time
 
 from oslo_config import cfg
 from oslo_log import log as logging
@@ -74,12 +75,49 @@ quota_opts = [
                      'with default quota.'),
     cfg.IntOpt('per_volume_size_limit',
                default=-1,
-               help='Max size allowed per volume, in gigabytes'), ]
+               help='Max size allowed per volume, in gigabytes'),
+    cfg.IntOpt('quota_limit_cache_ttl',
+               default=0,
+               help='Number of seconds the quota limits of projects and '
+                    'quota classes are cached for. Limits changed through '
+                    'this process are seen immediately, limits changed '
+                    'through other processes may take up to this long to '
+                    'be applied. 0 disables the cache.'), ]
 
 CONF = cfg.CONF
 CONF.register_opts(quota_opts)
 
 
+class QuotaLimitCache(object):
+    """Short lived cache of the quota limits read from the database."""
+
+    def __init__(self):
+        self._entries = {}
+
+    @property
+    def enabled(self):
+        return CONF.quota_limit_cache_ttl > 0
+
+    def get(self, key, loader):
+        """Get the limits cached under key, calling loader if needed."""
+        if not self.enabled:
+            return loader()
+
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is None or now - entry[0] >= CONF.quota_limit_cache_ttl:
+            entry = (now, loader())
+            self._entries[key] = entry
+        return dict(entry[1])
+
+    def invalidate(self):
+        """Drop all the cached limits."""
+        self._entries.clear()
+
+
+LIMIT_CACHE = QuotaLimitCache()
+
+
 class DbQuotaDriver(object):
 
     """Driver to perform check to enforcement of quotas.
@@ -98,9 +136,29 @@ class DbQuotaDriver(object):
 
         return db.quota_class_get(context, quota_class, resource_name)
 
+    def _get_default_limits(self, context):
+        return LIMIT_CACHE.get(
+            ('class', None), lambda: db.quota_class_get_default(context))
+
+    def _get_class_limits(self, context, quota_class):
+        loader = lambda: db.quota_class_get_all_by_name(context, quota_class)
+        # Only use the cache if the context may read these limits.
+        if LIMIT_CACHE.enabled and (context.is_admin or
+                                    context.quota_class == quota_class):
+            return LIMIT_CACHE.get(('class', quota_class), loader)
+        return loader()
+
+    def _get_project_limits(self, context, project_id):
+        loader = lambda: db.quota_get_all_by_project(context, project_id)
+        # Only use the cache if the context may read these limits.
+        if LIMIT_CACHE.enabled and (context.is_admin or
+                                    context.project_id == project_id):
+            return LIMIT_CACHE.get(('project', project_id), loader)
+        return loader()
+
     def get_default(self, context, resource, project_id):
         """Get a specific default quota for a resource."""
-        default_quotas = db.quota_class_get_default(context)
+        default_quotas = self._get_default_limits(context)
         return default_quotas.get(resource.name, resource.default)
 
     def get_defaults(self, context, resources, project_id=None):
@@ -117,7 +175,7 @@ class DbQuotaDriver(object):
         quotas = {}
         default_quotas = {}
         if CONF.use_default_quota_class:
-            default_quotas = db.quota_class_get_default(context)
+            default_quotas = self._get_default_limits(context)
 
         for resource in resources.values():
             if default_quotas:
@@ -147,9 +205,9 @@ class DbQuotaDriver(object):
 
         quotas = {}
         default_quotas = {}
-        class_quotas = db.quota_class_get_all_by_name(context, quota_class)
+        class_quotas = self._get_class_limits(context, quota_class)
         if defaults:
-            default_quotas = db.quota_class_get_default(context)
+            default_quotas = self._get_default_limits(context)
         for resource in resources.values():
             if resource.name in class_quotas:
                 quotas[resource.name] = class_quotas[resource.name]
@@ -186,7 +244,7 @@ class DbQuotaDriver(object):
         """
 
         quotas = {}
-        project_quotas = db.quota_get_all_by_project(context, project_id)
+        project_quotas = self._get_project_limits(context, project_id)
         allocated_quotas = None
         if usages:
             project_usages = db.quota_usage_get_all_by_project(context,
@@ -202,7 +260,7 @@ class DbQuotaDriver(object):
         if project_id == context.project_id:
             quota_class = context.quota_class
         if quota_class:
-            class_quotas = db.quota_class_get_all_by_name(context, quota_class)
+            class_quotas = self._get_class_limits(context, quota_class)
         else:
             class_quotas = {}
 
@@ -428,6 +486,7 @@ class DbQuotaDriver(object):
         :param project_id: The ID of the project being deleted.
         """
         db.quota_destroy_by_project(context, project_id)
+        LIMIT_CACHE.invalidate()
 
     def expire(self, context):
         """Expire reservations.
@@ -1071,6 +1130,10 @@ class QuotaEngine(object):
 
         self._driver.destroy_by_project(context, project_id)
 
+    def invalidate_limits(self):
+        """Drop the cached quota limits after they were changed."""
+        LIMIT_CACHE.invalidate()
+
     def expire(self, context):
         """Expire reservations.
 
@@ -1119,9 +1182,27 @@ class QuotaEngine(object):
 class VolumeTypeQuotaEngine(QuotaEngine):
     """Represent the set of all quotas."""
 
+    def __init__(self, quota_driver_class=None):
+        super(VolumeTypeQuotaEngine, self).__init__(quota_driver_class)
+        # Resources built for the volume type generation they are keyed by.
+        self._type_resources = (None, None)
+
     @property
     def resources(self):
-        """Fetches all possible quota resources."""
+        """Fetches all possible quota resources.
+
+        The resources are only rebuilt when the ids and names of the volume
+        types read from the database have changed since they were last
+        built. Reading them is a single query on the volume_types table,
+        which is still needed on every access: volume types created by
+        another API worker would be unknown to this one otherwise.
+        """
+
+        ctxt = context.get_admin_context()
+        generation = db.volume_type_get_generation(ctxt)
+        cached_generation, cached = self._type_resources
+        if cached is not None and generation == cached_generation:
+            return dict(cached)
 
         result = {}
         # Global quotas.
@@ -1137,13 +1218,17 @@ class VolumeTypeQuotaEngine(QuotaEngine):
             result[resource.name] = resource
 
         # Volume type quotas.
-        volume_types = db.volume_type_get_all(context.get_admin_context(),
-                                              False)
+        volume_types = db.volume_type_get_all(ctxt, False)
         for volume_type in volume_types.values():
             for part_name in ('volumes', 'gigabytes', 'snapshots'):
                 resource = VolumeTypeResource(part_name, volume_type)
                 result[resource.name] = resource
-        return result
+        self._type_resources = (generation, result)
+        return dict(result)
+
+    def invalidate_resources(self):
+        """Forces the resources to be rebuilt on their next access."""
+        self._type_resources = (None, None)
 
     def register_resource(self, resource):
         raise NotImplementedError(_("Cannot register resource"))
@@ -1174,6 +1259,7 @@ class VolumeTypeQuotaEngine(QuotaEngine):
             db.quota_update_resource(context,
                                      old_res,
                                      new_res)
+        LIMIT_CACHE.invalidate()
 
 
 class CGQuotaEngine(QuotaEngine):
@@ -19,6 +19,7 @@
 """Utilities related to SSH connection management."""
 
 import os
+import time
 
 from eventlet import pools
 from oslo_config import cfg
@@ -52,7 +53,16 @@ CONF.register_opts(ssh_opts)
 
 
 class SSHPool(pools.Pool):
-    """A simple eventlet pool to hold ssh connections."""
+    """A simple eventlet pool to hold ssh connections.
+
+    Besides the eventlet pool arguments the pool takes:
+
+    :param idle_timeout: seconds after which unused connections above
+                         min_size are closed, 0 keeps them open
+    :param check_interval: seconds a connection may be unused before it is
+                           probed with a new channel when taken from the
+                           pool, 0 only checks the transport state
+    """
 
     def __init__(self, ip, port, conn_timeout, login, password=None,
                  privatekey=None, *args, **kwargs):
@@ -63,6 +73,9 @@ class SSHPool(pools.Pool):
         self.conn_timeout = conn_timeout if conn_timeout else None
         self.privatekey = privatekey
         self.hosts_key_file = None
+        self.idle_timeout = kwargs.pop('idle_timeout', 0)
+        self.check_interval = kwargs.pop('check_interval', 0)
+        self._last_used = {}
 
         # Validate good config setting here.
         # Paramiko handles the case where the file is inaccessible.
@@ -160,18 +173,56 @@ class SSHPool(pools.Pool):
 
         For dead connections create and return a new connection.
         """
+        self._evict_idle()
         conn = super(SSHPool, self).get()
+        last_used = self._last_used.pop(conn, None)
         if conn:
-            if conn.get_transport().is_active():
+            if self._is_alive(conn, last_used):
                 return conn
             else:
                 conn.close()
         return self.create()
 
+    def put(self, item):
+        """Return a connection to the pool."""
+        self._last_used[item] = time.time()
+        super(SSHPool, self).put(item)
+
     def remove(self, ssh):
         """Close an ssh client and remove it from free_items."""
         ssh.close()
+        self._last_used.pop(ssh, None)
         if ssh in self.free_items:
             self.free_items.remove(ssh)
             if self.current_size > 0:
                 self.current_size -= 1
+
+    def _is_alive(self, ssh, last_used):
+        transport = ssh.get_transport()
+        if not transport or not transport.is_active():
+            return False
+        if (self.check_interval and last_used is not None and
+                time.time() - last_used > self.check_interval):
+            # The transport only notices a dead peer when it sends
+            # something, opening a channel is a single round trip.
+            try:
+                transport.open_session(timeout=self.conn_timeout).close()
+            except Exception as e:
+                LOG.debug("Discarding ssh connection to %(ip)s: %(err)s",
+                          {'ip': self.ip, 'err': e})
+                return False
+        return True
+
+    def _evict_idle(self):
+        if not self.idle_timeout:
+            return
+        now = time.time()
+        for ssh in list(self.free_items):
+            if self.current_size <= self.min_size:
+                break
+            last_used = self._last_used.get(ssh)
+            if last_used is not None and now - last_used > self.idle_timeout:
+                LOG.debug("Closing ssh connection to %(ip)s unused for "
+                          "%(idle)d seconds.",
+                          {'ip': self.ip, 'idle': now - last_used})
+                self.remove(ssh)
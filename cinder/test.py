@@ -45,6 +45,7 @@ from cinder.db import migration
 from cinder.db.sqlalchemy import api as sqla_api
 from cinder import i18n
 from cinder.objects import base as objects_base
+from cinder import quota
 from cinder import rpc
 from cinder import service
 from cinder.tests import fixtures as cinder_fixtures
@@ -195,6 +196,12 @@ class TestCase(testtools.TestCase):
             objects_base.CinderObjectRegistry._registry._obj_classes)
         self.addCleanup(self._restore_obj_registry)
 
+        # NOTE: The quota resources and limits are cached globally, and
+        # tests stub out the database calls they are built from.
+        quota.QUOTAS.invalidate_resources()
+        self.addCleanup(quota.QUOTAS.invalidate_resources)
+        self.addCleanup(quota.QUOTAS.invalidate_limits)
+
         # emulate some of the mox stuff, we can't use the metaclass
         # because it screws with our generators
         mox_fixture = self.useFixture(moxstubout.MoxStubout())
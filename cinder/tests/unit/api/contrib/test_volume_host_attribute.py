@@ -56,6 +56,11 @@ def fake_volume_get_all(*args, **kwargs):
     return objects.VolumeList(objects=[fake_volume_api_get()])
 
 
+def fake_volume_get_all_summary(*args, **kwargs):
+    vol = fake_volume_api_get()
+    return [{'id': vol.id, 'display_name': vol.display_name}]
+
+
 def app():
     # no auth, just let environ['cinder.context'] pass through
     api = fakes.router.APIRouter()
@@ -70,6 +75,8 @@ class VolumeHostAttributeTest(test.TestCase):
         super(VolumeHostAttributeTest, self).setUp()
         self.stubs.Set(volume.api.API, 'get', fake_volume_api_get)
         self.stubs.Set(volume.api.API, 'get_all', fake_volume_get_all)
+        self.stubs.Set(volume.api.API, 'get_all_summary',
+                       fake_volume_get_all_summary)
         self.stubs.Set(db, 'volume_get', fake_db_volume_get)
 
         self.UUID = uuid.uuid4()
@@ -41,6 +41,11 @@ def fake_volume_get_all(*args, **kwargs):
     return objects.VolumeList(objects=[fake_volume_get()])
 
 
+def fake_volume_get_all_summary(*args, **kwargs):
+    vol = fake_volume_get()
+    return [{'id': vol.id, 'display_name': vol.display_name}]
+
+
 def app():
     # no auth, just let environ['cinder.context'] pass through
     api = fakes.router.APIRouter()
@@ -55,6 +60,8 @@ class VolumeTenantAttributeTest(test.TestCase):
         super(VolumeTenantAttributeTest, self).setUp()
         self.stubs.Set(volume.api.API, 'get', fake_volume_get)
         self.stubs.Set(volume.api.API, 'get_all', fake_volume_get_all)
+        self.stubs.Set(volume.api.API, 'get_all_summary',
+                       fake_volume_get_all_summary)
         self.UUID = uuid.uuid4()
 
     def test_get_volume_allowed(self):
@@ -17,7 +17,10 @@
 Test suites for 'common' code used throughout the OpenStack HTTP API.
 """
 
+import datetime
+
 import mock
+from oslo_utils import timeutils
 from testtools import matchers
 import webob
 import webob.exc
@@ -26,6 +29,7 @@ from oslo_config import cfg
 
 from cinder.api import common
 from cinder import test
+from cinder.tests.unit.api import fakes
 
 
 NS = "{http://docs.openstack.org/compute/api/v1.1}"
@@ -579,3 +583,59 @@ class RequestUrlTest(test.TestCase):
         result = common.get_request_url(request)
         self.assertEqual('http://192.168.0.243:24/v2;param?key=value#frag',
                          result)
+
+
+class ListETagTest(test.TestCase):
+    def setUp(self):
+        super(ListETagTest, self).setUp()
+        self.override_config('osapi_list_etags', True)
+        self.generation = (3, datetime.datetime(2016, 1, 1))
+
+    def test_check_list_etag_disabled(self):
+        self.override_config('osapi_list_etags', False)
+        get_generation = mock.Mock()
+        req = fakes.HTTPRequest.blank('/v2/volumes')
+        self.assertEqual((None, None),
+                         common.check_list_etag(req, get_generation))
+        self.assertFalse(get_generation.called)
+
+    def test_check_list_etag_no_header(self):
+        get_generation = mock.Mock()
+        req = fakes.HTTPRequest.blank('/v2/volumes')
+        self.assertEqual((None, None),
+                         common.check_list_etag(req, get_generation))
+        self.assertFalse(get_generation.called)
+
+    def test_check_list_etag(self):
+        req = fakes.HTTPRequest.blank('/v2/volumes?limit=1')
+        req.headers['If-None-Match'] = '"0"'
+        etag, response = common.check_list_etag(req,
+                                                lambda: self.generation)
+        self.assertIsNone(response)
+
+        # The same listing is not modified
+        req = fakes.HTTPRequest.blank('/v2/volumes?limit=1')
+        req.headers['If-None-Match'] = etag
+        same_etag, response = common.check_list_etag(req,
+                                                     lambda: self.generation)
+        self.assertEqual(etag, same_etag)
+        self.assertEqual(304, response.status_int)
+        self.assertEqual(etag, response.headers['ETag'])
+
+        # Nor is it once the resources or the query change
+        for path, generation in (('/v2/volumes?limit=2', self.generation),
+                                 ('/v2/volumes?limit=1', (4,) +
+                                  self.generation[1:])):
+            req = fakes.HTTPRequest.blank(path)
+            req.headers['If-None-Match'] = etag
+            new_etag, response = common.check_list_etag(
+                req, lambda: generation)
+            self.assertNotEqual(etag, new_etag)
+            self.assertIsNone(response)
+
+    def test_check_list_etag_recent_change(self):
+        generation = (3, timeutils.utcnow())
+        req = fakes.HTTPRequest.blank('/v2/volumes')
+        req.headers['If-None-Match'] = '"0"'
+        self.assertEqual((None, None),
+                         common.check_list_etag(req, lambda: generation))
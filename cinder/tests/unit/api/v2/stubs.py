@@ -16,6 +16,7 @@
 import datetime
 import iso8601
 
+from cinder import db
 from cinder import exception as exc
 from cinder import objects
 from cinder.tests.unit import fake_constants as fake
@@ -176,6 +177,23 @@ def stub_volume_get_all_by_project(self, context, marker, limit,
                             viewable_admin_meta=True)]
 
 
+def stub_volume_get_all_summary(context, marker, limit, sort_keys=None,
+                                sort_dirs=None, filters=None, offset=None,
+                                project_id=None):
+    # Summarize whatever the (possibly stubbed) full listing returns
+    if project_id is None:
+        volumes = db.volume_get_all(context, marker, limit,
+                                    sort_keys=sort_keys, sort_dirs=sort_dirs,
+                                    filters=filters, offset=offset)
+    else:
+        volumes = db.volume_get_all_by_project(context, project_id, marker,
+                                               limit, sort_keys=sort_keys,
+                                               sort_dirs=sort_dirs,
+                                               filters=filters, offset=offset)
+    return [{'id': volume['id'], 'display_name': volume['display_name']}
+            for volume in volumes]
+
+
 def stub_volume_api_get_all_by_project(self, context, marker, limit,
                                        sort_keys=None, sort_dirs=None,
                                        filters=None,
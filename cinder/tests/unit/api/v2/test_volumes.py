@@ -60,6 +60,8 @@ class VolumeApiTest(test.TestCase):
         self.flags(host='fake',
                    notification_driver=[fake_notifier.__name__])
         self.stubs.Set(db, 'volume_get_all', stubs.stub_volume_get_all)
+        self.stubs.Set(db, 'volume_get_all_summary',
+                       stubs.stub_volume_get_all_summary)
         self.stubs.Set(volume_api.API, 'delete', stubs.stub_volume_delete)
         self.stubs.Set(db, 'service_get_all_by_topic',
                        stubs.stub_service_get_all_by_topic)
@@ -743,10 +745,8 @@ class VolumeApiTest(test.TestCase):
                           req, fake.volume_id, body)
 
     def test_volume_list_summary(self):
-        self.stubs.Set(volume_api.API, 'get_all',
-                       stubs.stub_volume_api_get_all_by_project)
-        self.stubs.Set(db.sqlalchemy.api, '_volume_type_get_full',
-                       stubs.stub_volume_type_get)
+        self.stubs.Set(db, 'volume_get_all_by_project',
+                       stubs.stub_volume_get_all_by_project)
 
         req = fakes.HTTPRequest.blank('/v2/volumes')
         res_dict = self.controller.index(req)
@@ -771,8 +771,8 @@ class VolumeApiTest(test.TestCase):
             ]
         }
         self.assertEqual(expected, res_dict)
-        # Finally test that we cached the returned volumes
-        self.assertEqual(1, len(req.cached_resource()))
+        # The summary listing does not build nor cache volume objects
+        self.assertIsNone(req.cached_resource())
 
     def test_volume_list_detail(self):
         self.stubs.Set(volume_api.API, 'get_all',
@@ -790,6 +790,56 @@ class VolumeApiTest(test.TestCase):
         # Finally test that we cached the returned volumes
         self.assertEqual(1, len(req.cached_resource()))
 
+    @mock.patch.object(volume_api.API, 'get_generation',
+                       return_value=(1, None))
+    def test_volume_list_detail_etag(self, mock_generation):
+        self.override_config('osapi_list_etags', True)
+        self.stubs.Set(volume_api.API, 'get_all',
+                       stubs.stub_volume_api_get_all_by_project)
+        self.stubs.Set(db.sqlalchemy.api, '_volume_type_get_full',
+                       stubs.stub_volume_type_get)
+
+        req = fakes.HTTPRequest.blank('/v2/volumes/detail')
+        res = self.controller.detail(req)
+        self.assertFalse(mock_generation.called)
+        self.assertEqual(1, len(res['volumes']))
+
+        req = fakes.HTTPRequest.blank('/v2/volumes/detail')
+        req.headers['If-None-Match'] = '"0"'
+        res = self.controller.detail(req)
+        etag = res['ETag']
+        self.assertEqual(1, len(res.obj['volumes']))
+
+        req = fakes.HTTPRequest.blank('/v2/volumes/detail')
+        req.headers['If-None-Match'] = etag
+        with mock.patch.object(volume_api.API, 'get_all') as mock_get_all:
+            res = self.controller.detail(req)
+        self.assertEqual(304, res.status_int)
+        self.assertEqual(etag, res.headers['ETag'])
+        self.assertFalse(mock_get_all.called)
+
+    def test_volume_list_detail_etag_image_metadata(self):
+        self.override_config('osapi_list_etags', True)
+        self.override_config('osapi_list_etag_delay', 0)
+        volume = stubs.stub_volume(fake.volume_id)
+        del volume['name']
+        del volume['volume_type']
+        del volume['volume_type_id']
+        db.volume_create(context.get_admin_context(), volume)
+
+        req = fakes.HTTPRequest.blank('/v2/volumes/detail')
+        req.headers['If-None-Match'] = '"0"'
+        etag = self.controller.detail(req)['ETag']
+
+        db.volume_glance_metadata_create(context.get_admin_context(),
+                                         fake.volume_id, 'image_name',
+                                         'image')
+        req = fakes.HTTPRequest.blank('/v2/volumes/detail')
+        req.headers['If-None-Match'] = etag
+        res = self.controller.detail(req)
+        self.assertNotEqual(etag, res['ETag'])
+        self.assertEqual(1, len(res.obj['volumes']))
+
     def test_volume_list_detail_with_admin_metadata(self):
         volume = stubs.stub_volume(fake.volume_id)
         del volume['name']
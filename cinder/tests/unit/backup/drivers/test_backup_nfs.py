@@ -98,6 +98,9 @@ class BackupNFSShareTestCase(test.TestCase):
 
 def fake_md5(arg):
     class result(object):
+        def update(self, data):
+            pass
+
         def hexdigest(self):
             return 'fake-md5-sum'
 
@@ -439,6 +442,79 @@ class BackupNFSSwiftBasedTestCase(test.TestCase):
         self.assertNotEqual(content1['sha256s'][16], content2['sha256s'][16])
         self.assertNotEqual(content1['sha256s'][20], content2['sha256s'][20])
 
+    def _backup_volume_file(self, volume_file, backup_id=fake.backup_id,
+                            parent_id=None):
+        container_name = self.temp_dir.replace(tempfile.gettempdir() + '/',
+                                               '', 1)
+        self._create_backup_db_entry(volume_id=fake.volume_id,
+                                     container=container_name,
+                                     backup_id=backup_id,
+                                     parent_id=parent_id)
+        service = nfs.NFSBackupDriver(self.ctxt)
+        self.volume_file.seek(0)
+        backup = objects.Backup.get_by_id(self.ctxt, backup_id)
+        service.backup(backup, volume_file)
+        return service, objects.Backup.get_by_id(self.ctxt, backup_id)
+
+    def _expected_sha256s(self):
+        self.volume_file.seek(0)
+        data = self.volume_file.read()
+        return [hashlib.sha256(data[off:off + 1024]).hexdigest()
+                for off in range(0, len(data), 1024)]
+
+    def test_backup_readinto(self):
+        self.flags(backup_file_size=(8 * 1024))
+        self.flags(backup_sha_block_size_bytes=1024)
+        volume_file = mock.Mock(wraps=self.volume_file)
+
+        service, backup = self._backup_volume_file(volume_file)
+
+        content = service._read_sha256file(backup)
+        self.assertEqual(self._expected_sha256s(), content['sha256s'])
+        self.assertEqual(5, volume_file.readinto.call_count)
+        self.assertFalse(volume_file.read.called)
+
+    def test_backup_without_readinto(self):
+        self.flags(backup_file_size=(8 * 1024))
+        self.flags(backup_sha_block_size_bytes=1024)
+        volume_file = mock.Mock(spec=['read', 'tell'],
+                                wraps=self.volume_file)
+
+        service, backup = self._backup_volume_file(volume_file)
+
+        content = service._read_sha256file(backup)
+        self.assertEqual(self._expected_sha256s(), content['sha256s'])
+        metadata = service._read_metadata(backup)
+        self.assertEqual([0, 8192, 16384, 24576],
+                         [list(obj.values())[0]['offset']
+                          for obj in metadata['objects']])
+
+    def test_backup_delta_extent_md5(self):
+        self.flags(backup_file_size=(8 * 1024))
+        self.flags(backup_sha_block_size_bytes=1024)
+        self.mock_object(hashlib, 'md5',
+                         lambda data=b'': hashlib.new('md5', data))
+        self._backup_volume_file(self.volume_file)
+
+        self.volume_file.seek(17 * 1024)
+        self.volume_file.write(os.urandom(2 * 1024))
+        self.volume_file.seek(23 * 1024)
+        self.volume_file.write(os.urandom(1024))
+        service, deltabackup = self._backup_volume_file(
+            self.volume_file, backup_id=fake.backup2_id,
+            parent_id=fake.backup_id)
+
+        self.volume_file.seek(0)
+        data = self.volume_file.read()
+        objs = [list(obj.values())[0] for obj in
+                service._read_metadata(deltabackup)['objects']]
+        self.assertEqual([(17 * 1024, 2 * 1024), (23 * 1024, 1024)],
+                         [(obj['offset'], obj['length']) for obj in objs])
+        for obj in objs:
+            extent = data[obj['offset']:obj['offset'] + obj['length']]
+            self.assertEqual(hashlib.new('md5', extent).hexdigest(),
+                             obj['md5'])
+
     def test_backup_backup_metadata_fail(self):
         """Test of when an exception occurs in backup().
 
@@ -25,6 +25,9 @@ class FakeBrickLVM(object):
     def get_volumes(self):
         return ['fake-volume']
 
+    def get_cached_volumes(self):
+        return self.get_volumes()
+
     def get_volume(self, name):
         return ['name']
 
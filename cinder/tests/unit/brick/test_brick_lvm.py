@@ -73,24 +73,24 @@ class BrickLvmTestCase(test.TestCase):
               cmd_string):
             data = "  kVxztV-dKpG-Rz7E-xtKY-jeju-QsYU-SLG6Z1\n"
         elif 'env, LC_ALL=C, vgs, --noheadings, --unit=g, ' \
-             '-o, name,size,free,lv_count,uuid, ' \
+             '-o, name,size,free,lv_count,uuid,vg_seqno, ' \
              '--separator, :, --nosuffix' in cmd_string:
             data = ("  test-prov-cap-vg-unit:10.00:10.00:0:"
-                    "mXzbuX-dKpG-Rz7E-xtKY-jeju-QsYU-SLG8Z4\n")
+                    "mXzbuX-dKpG-Rz7E-xtKY-jeju-QsYU-SLG8Z4:1\n")
             if 'test-prov-cap-vg-unit' in cmd_string:
                 return (data, "")
             data = ("  test-prov-cap-vg-no-unit:10.00:10.00:0:"
-                    "mXzbuX-dKpG-Rz7E-xtKY-jeju-QsYU-SLG8Z4\n")
+                    "mXzbuX-dKpG-Rz7E-xtKY-jeju-QsYU-SLG8Z4:1\n")
             if 'test-prov-cap-vg-no-unit' in cmd_string:
                 return (data, "")
             data = "  fake-vg:10.00:10.00:0:"\
-                   "kVxztV-dKpG-Rz7E-xtKY-jeju-QsYU-SLG6Z1\n"
+                   "kVxztV-dKpG-Rz7E-xtKY-jeju-QsYU-SLG6Z1:1\n"
             if 'fake-vg' in cmd_string:
                 return (data, "")
             data += "  fake-vg-2:10.00:10.00:0:"\
-                    "lWyauW-dKpG-Rz7E-xtKY-jeju-QsYU-SLG7Z2\n"
+                    "lWyauW-dKpG-Rz7E-xtKY-jeju-QsYU-SLG7Z2:1\n"
             data += "  fake-vg-3:10.00:10.00:0:"\
-                    "mXzbuX-dKpG-Rz7E-xtKY-jeju-QsYU-SLG8Z3\n"
+                    "mXzbuX-dKpG-Rz7E-xtKY-jeju-QsYU-SLG8Z3:1\n"
         elif ('env, LC_ALL=C, lvs, --noheadings, '
               '--unit=g, -o, vg_name,name,size, --nosuffix, '
               'fake-vg/lv-nothere' in cmd_string):
@@ -301,6 +301,38 @@ class BrickLvmTestCase(test.TestCase):
         self.assertEqual(7.6, self.vg.vg_thin_pool_free_space)
         self.assertEqual(3.0, self.vg.vg_provisioned_capacity)
 
+    def test_update_volume_group_info_reuses_lv_list(self):
+        vg_info = {'name': 'fake-vg', 'size': 10.0, 'available': 10.0,
+                   'lv_count': 2, 'uuid': 'fake-uuid', 'seqno': 5}
+        with mock.patch.object(self.vg, 'get_all_volume_groups',
+                               return_value=[vg_info]), \
+                mock.patch.object(self.vg, 'get_volumes',
+                                  return_value=[]) as mock_get_volumes:
+            self.vg.update_volume_group_info()
+            self.vg.update_volume_group_info()
+            self.assertEqual(1, mock_get_volumes.call_count)
+
+            vg_info['seqno'] = 6
+            self.vg.update_volume_group_info()
+            self.assertEqual(2, mock_get_volumes.call_count)
+        self.assertEqual([], self.vg.get_cached_volumes())
+        self.assertIn('vgs', self.vg.stats_timings)
+
+    def test_update_volume_group_info_thin_pool_always_queried(self):
+        self.vg.vg_thin_pool = 'test-prov-cap-pool-unit'
+        self.vg.vg_name = 'test-prov-cap-vg-unit'
+        self.vg.update_volume_group_info()
+        with mock.patch.object(self.vg, 'get_volumes') as mock_get_volumes, \
+                mock.patch.object(self.vg, '_get_thin_pool_free_space',
+                                  return_value=1.0) as mock_free_space:
+            self.vg.update_volume_group_info()
+
+        self.assertFalse(mock_get_volumes.called)
+        mock_free_space.assert_called_once_with('test-prov-cap-vg-unit',
+                                                'test-prov-cap-pool-unit')
+        self.assertEqual(1.0, self.vg.vg_thin_pool_free_space)
+        self.assertEqual(3.0, self.vg.vg_provisioned_capacity)
+
     def test_thin_pool_free_space(self):
         # The size of fake-vg-pool is 9g and the allocated data sums up to
         # 12% so the calculated free space should be 7.92
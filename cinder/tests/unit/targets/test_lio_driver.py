@@ -55,44 +55,47 @@ class TestLioAdmDriver(tf.TargetDriverFixture):
         self.assertEqual(expected,
                          self.target._get_target_and_lun(ctxt, self.testvol))
 
+    def _assert_create_batch(self, mexecute, *create_args):
+        process_input = ('create %s\nget-targets' %
+                         ' '.join(create_args))
+        mexecute.assert_called_once_with('cinder-rtstool', 'batch',
+                                         process_input=process_input,
+                                         run_as_root=True)
+
     @mock.patch.object(lio.LioAdm, '_execute', side_effect=lio.LioAdm._execute)
     @mock.patch.object(lio.LioAdm, '_persist_configuration')
     @mock.patch('cinder.utils.execute')
-    @mock.patch.object(lio.LioAdm, '_get_target')
-    def test_create_iscsi_target(self, mget_target, mexecute, mpersist_cfg,
-                                 mlock_exec):
+    def test_create_iscsi_target(self, mexecute, mpersist_cfg, mlock_exec):
 
-        mget_target.return_value = 1
+        mexecute.return_value = (self.test_vol, None)
         # create_iscsi_target sends volume_name instead of volume_id on error
         self.assertEqual(
-            1,
+            self.test_vol,
             self.target.create_iscsi_target(
                 self.test_vol,
                 1,
                 0,
                 self.fake_volumes_dir))
         mpersist_cfg.assert_called_once_with(self.VOLUME_NAME)
-        mexecute.assert_called_once_with(
-            'cinder-rtstool',
-            'create',
+        self._assert_create_batch(
+            mexecute,
             self.fake_volumes_dir,
             self.test_vol,
-            '',
-            '',
-            self.target.iscsi_protocol == 'iser',
-            run_as_root=True)
+            "''",
+            "''",
+            str(self.target.iscsi_protocol == 'iser'))
 
     @mock.patch.object(lio.LioAdm, '_execute', side_effect=lio.LioAdm._execute)
     @mock.patch.object(lio.LioAdm, '_persist_configuration')
     @mock.patch.object(utils, 'execute')
-    @mock.patch.object(lio.LioAdm, '_get_target', return_value=1)
-    def test_create_iscsi_target_port_ip(self, mget_target, mexecute,
-                                         mpersist_cfg, mlock_exec):
+    def test_create_iscsi_target_port_ip(self, mexecute, mpersist_cfg,
+                                         mlock_exec):
         ip = '10.0.0.15'
         port = 3261
+        mexecute.return_value = (self.test_vol, None)
 
         self.assertEqual(
-            1,
+            self.test_vol,
             self.target.create_iscsi_target(
                 name=self.test_vol,
                 tid=1,
@@ -100,33 +103,29 @@ class TestLioAdmDriver(tf.TargetDriverFixture):
                 path=self.fake_volumes_dir,
                 **{'portals_port': port, 'portals_ips': [ip]}))
 
-        expected_args = (
-            'cinder-rtstool',
-            'create',
+        self._assert_create_batch(
+            mexecute,
             self.fake_volumes_dir,
             self.test_vol,
-            '',
-            '',
-            self.target.iscsi_protocol == 'iser',
+            "''",
+            "''",
+            str(self.target.iscsi_protocol == 'iser'),
             '-p%s' % port,
             '-a' + ip)
-
-        mlock_exec.assert_any_call(*expected_args, run_as_root=True)
-        mexecute.assert_any_call(*expected_args, run_as_root=True)
         mpersist_cfg.assert_called_once_with(self.VOLUME_NAME)
 
     @mock.patch.object(lio.LioAdm, '_execute', side_effect=lio.LioAdm._execute)
     @mock.patch.object(lio.LioAdm, '_persist_configuration')
     @mock.patch.object(utils, 'execute')
-    @mock.patch.object(lio.LioAdm, '_get_target', return_value=1)
-    def test_create_iscsi_target_port_ips(self, mget_target, mexecute,
-                                          mpersist_cfg, mlock_exec):
+    def test_create_iscsi_target_port_ips(self, mexecute, mpersist_cfg,
+                                          mlock_exec):
         test_vol = 'iqn.2010-10.org.openstack:' + self.VOLUME_NAME
         ips = ['10.0.0.15', '127.0.0.1']
         port = 3261
+        mexecute.return_value = (test_vol, None)
 
         self.assertEqual(
-            1,
+            test_vol,
             self.target.create_iscsi_target(
                 name=test_vol,
                 tid=1,
@@ -134,28 +133,37 @@ class TestLioAdmDriver(tf.TargetDriverFixture):
                 path=self.fake_volumes_dir,
                 **{'portals_port': port, 'portals_ips': ips}))
 
-        expected_args = (
-            'cinder-rtstool',
-            'create',
+        self._assert_create_batch(
+            mexecute,
             self.fake_volumes_dir,
             test_vol,
-            '',
-            '',
-            self.target.iscsi_protocol == 'iser',
+            "''",
+            "''",
+            str(self.target.iscsi_protocol == 'iser'),
             '-p%s' % port,
             '-a' + ','.join(ips))
-
-        mlock_exec.assert_any_call(*expected_args, run_as_root=True)
-        mexecute.assert_any_call(*expected_args, run_as_root=True)
         mpersist_cfg.assert_called_once_with(self.VOLUME_NAME)
 
+    @mock.patch.object(lio.LioAdm, '_execute', side_effect=lio.LioAdm._execute)
+    @mock.patch.object(lio.LioAdm, '_persist_configuration')
+    @mock.patch('cinder.utils.execute')
+    def test_create_iscsi_target_not_found(self, mexecute, mpersist_cfg,
+                                           mlock_exec):
+        mexecute.return_value = ('', None)
+        self.assertRaises(exception.NotFound,
+                          self.target.create_iscsi_target,
+                          self.test_vol,
+                          1,
+                          0,
+                          self.fake_volumes_dir)
+        self.assertFalse(mpersist_cfg.called)
+
     @mock.patch.object(lio.LioAdm, '_execute', side_effect=lio.LioAdm._execute)
     @mock.patch.object(lio.LioAdm, '_persist_configuration')
     @mock.patch('cinder.utils.execute',
                 side_effect=putils.ProcessExecutionError)
-    @mock.patch.object(lio.LioAdm, '_get_target')
-    def test_create_iscsi_target_already_exists(self, mget_target, mexecute,
-                                                mpersist_cfg, mlock_exec):
+    def test_create_iscsi_target_already_exists(self, mexecute, mpersist_cfg,
+                                                mlock_exec):
         chap_auth = ('foo', 'bar')
         self.assertRaises(exception.ISCSITargetCreateFailed,
                           self.target.create_iscsi_target,
@@ -165,10 +173,32 @@ class TestLioAdmDriver(tf.TargetDriverFixture):
                           self.fake_volumes_dir,
                           chap_auth)
         self.assertFalse(mpersist_cfg.called)
-        expected_args = ('cinder-rtstool', 'create', self.fake_volumes_dir,
-                         self.test_vol, chap_auth[0], chap_auth[1], False)
-        mlock_exec.assert_called_once_with(*expected_args, run_as_root=True)
-        mexecute.assert_called_once_with(*expected_args, run_as_root=True)
+        self._assert_create_batch(mexecute, self.fake_volumes_dir,
+                                  self.test_vol, chap_auth[0], chap_auth[1],
+                                  'False')
+        self.assertEqual(1, mlock_exec.call_count)
+
+    @mock.patch('cinder.utils.execute')
+    def test_persist_configuration(self, mexecute):
+        self.target._persist_configuration(self.fake_volume_id)
+        self.target._persist_configuration(self.fake_volume_id)
+        self.assertEqual([mock.call('cinder-rtstool', 'save',
+                                    run_as_root=True)] * 2,
+                         mexecute.call_args_list)
+
+    @mock.patch('cinder.utils.execute')
+    def test_persist_configuration_coalesced(self, mexecute):
+        target = self.target
+
+        # While we wait for the lock another caller saves the configuration,
+        # which already includes our change.
+        def saved_by_other_caller(*args):
+            target._saved_requests = target._save_requests
+
+        target._save_lock = mock.MagicMock()
+        target._save_lock.__enter__.side_effect = saved_by_other_caller
+        target._persist_configuration(self.fake_volume_id)
+        self.assertFalse(mexecute.called)
 
     @mock.patch.object(lio.LioAdm, '_execute', side_effect=lio.LioAdm._execute)
     @mock.patch.object(lio.LioAdm, '_persist_configuration')
@@ -226,6 +256,20 @@ class TestLioAdmDriver(tf.TargetDriverFixture):
                                   self.fake_volumes_dir)
         self.assertFalse(mock_restore.called)
 
+    @mock.patch.object(lio.LioAdm, '_get_targets')
+    @mock.patch.object(lio.LioAdm, '_restore_configuration')
+    def test_ensure_exports(self, mock_restore, mock_get_targets):
+
+        ctxt = context.get_admin_context()
+        mock_get_targets.return_value = None
+        failed = self.target.ensure_exports(
+            ctxt, [(self.testvol, self.fake_volumes_dir),
+                   (self.testvol_2, self.fake_volumes_dir)])
+
+        self.assertEqual({}, failed)
+        mock_get_targets.assert_called_once_with()
+        mock_restore.assert_called_once_with()
+
     @mock.patch.object(lio.LioAdm, '_execute', side_effect=lio.LioAdm._execute)
     @mock.patch.object(lio.LioAdm, '_persist_configuration')
     @mock.patch('cinder.utils.execute')
@@ -380,3 +380,50 @@ class TestTgtAdmDriver(tf.TargetDriverFixture):
             old_name=None,
             portals_ips=[self.configuration.iscsi_ip_address],
             portals_port=self.configuration.iscsi_port)
+
+    @mock.patch.object(tgt.TgtAdm, '_get_target_chap_auth')
+    @mock.patch.object(tgt.TgtAdm, 'create_iscsi_target')
+    @mock.patch('cinder.utils.execute')
+    def test_ensure_exports(self, mock_execute, mock_create, mock_get_chap):
+        ctxt = context.get_admin_context()
+        mock_get_chap.return_value = ('foo', 'bar')
+        testvol = dict(self.testvol, name=self.VOLUME_NAME)
+        mock_execute.return_value = (self.fake_iscsi_scan, None)
+
+        failed = self.target.ensure_exports(
+            ctxt, [(testvol, self.testvol_path),
+                   (self.testvol_2, self.testvol_path)])
+
+        self.assertEqual({}, failed)
+        mock_execute.assert_any_call('tgt-admin', '--update', 'ALL',
+                                     run_as_root=True)
+        self.assertTrue(os.path.exists(
+            os.path.join(self.fake_volumes_dir, self.VOLUME_NAME)))
+        self.assertTrue(os.path.exists(
+            os.path.join(self.fake_volumes_dir, self.testvol_2['name'])))
+        # Only the volume without a target in tgtd is exported on its own
+        mock_create.assert_called_once_with(
+            self.iscsi_target_prefix + self.testvol_2['name'],
+            0, 1, self.testvol_path, ('foo', 'bar'),
+            check_exit_code=False,
+            old_name=None,
+            portals_ips=[self.configuration.iscsi_ip_address],
+            portals_port=self.configuration.iscsi_port)
+
+    @mock.patch.object(tgt.TgtAdm, '_get_target_chap_auth',
+                       return_value=None)
+    @mock.patch.object(tgt.TgtAdm, 'create_iscsi_target')
+    @mock.patch('cinder.utils.execute')
+    def test_ensure_exports_failure(self, mock_execute, mock_create,
+                                    mock_get_chap):
+        ctxt = context.get_admin_context()
+        mock_execute.return_value = ('', None)
+        mock_create.side_effect = exception.ISCSITargetCreateFailed(
+            volume_id=self.testvol['id'])
+
+        failed = self.target.ensure_exports(
+            ctxt, [(self.testvol, self.testvol_path)])
+
+        self.assertEqual([self.testvol['id']], list(failed))
+        self.assertIsInstance(failed[self.testvol['id']],
+                              exception.ISCSITargetCreateFailed)
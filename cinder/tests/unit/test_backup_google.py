@@ -46,6 +46,9 @@ class FakeMD5(object):
     def __init__(self, *args, **kwargs):
         pass
 
+    def update(self, data):
+        pass
+
     @classmethod
     def digest(self):
         return 'gcscindermd5'
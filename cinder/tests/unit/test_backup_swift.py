@@ -49,6 +49,9 @@ ANY = mock.ANY
 
 def fake_md5(arg):
     class result(object):
+        def update(self, data):
+            pass
+
         def hexdigest(self):
             return 'fake-md5-sum'
 
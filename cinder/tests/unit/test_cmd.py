@@ -1361,6 +1361,33 @@ class TestCinderRtstoolCmd(test.TestCase):
         mock_save.assert_called_once_with(mock.sentinel.filename)
         self.assertEqual(0, rc)
 
+    @mock.patch('cinder.cmd.rtstool.save_to_file')
+    @mock.patch('cinder.cmd.rtstool.create')
+    def test_main_batch(self, mock_create, mock_save):
+        sys.argv = ['cinder-rtstool', 'batch']
+        stdin = six.StringIO("create /dev/vg/vol iqn.vol '' '' False -p3261\n"
+                             "\n"
+                             "save\n")
+        with mock.patch('sys.stdin', new=stdin):
+            rc = cinder_rtstool.main()
+
+        mock_create.assert_called_once_with('/dev/vg/vol', 'iqn.vol', '', '',
+                                            'False', portals_port=3261)
+        mock_save.assert_called_once_with(None)
+        self.assertEqual(0, rc)
+
+    @mock.patch('cinder.cmd.rtstool.save_to_file')
+    @mock.patch('cinder.cmd.rtstool.delete',
+                side_effect=cinder_rtstool.RtstoolError)
+    def test_main_batch_stops_on_error(self, mock_delete, mock_save):
+        sys.argv = ['cinder-rtstool', 'batch']
+        with mock.patch('sys.stdin', new=six.StringIO('delete iqn\nsave')):
+            self.assertRaises(cinder_rtstool.RtstoolError,
+                              cinder_rtstool.main)
+
+        mock_delete.assert_called_once_with('iqn')
+        self.assertFalse(mock_save.called)
+
     def test_main_create(self):
         with mock.patch('cinder.cmd.rtstool.create') as create:
             sys.argv = ['cinder-rtstool',
@@ -20,11 +20,13 @@ import enum
 import mock
 from oslo_utils import uuidutils
 import six
+from sqlalchemy.orm import query as sa_query
 
 from cinder.api import common
 from cinder import context
 from cinder import db
 from cinder.db.sqlalchemy import api as sqlalchemy_api
+from cinder.db.sqlalchemy import models
 from cinder import exception
 from cinder import objects
 from cinder import quota
@@ -540,6 +542,96 @@ class DBAPIVolumeTestCase(BaseTest):
                                             self.ctxt, 'p%d' % i, None,
                                             None, ['host'], None))
 
+    def test_volume_get_all_summary(self):
+        volumes = [db.volume_create(self.ctxt,
+                                    {'project_id': 'p%d' % (i % 2),
+                                     'display_name': 'vol%d' % i,
+                                     'metadata': {'key': str(i % 3)}})
+                   for i in range(6)]
+
+        def summary(vols):
+            return [{'id': v['id'], 'display_name': v['display_name']}
+                    for v in vols]
+
+        self.assertEqual(
+            summary(db.volume_get_all(self.ctxt, None, None)),
+            db.volume_get_all_summary(self.ctxt, None, None))
+        self.assertEqual(
+            summary(db.volume_get_all(self.ctxt, volumes[3]['id'], 2,
+                                      ['display_name'], ['asc'],
+                                      {'metadata': {'key': '0'}})),
+            db.volume_get_all_summary(self.ctxt, volumes[3]['id'], 2,
+                                      ['display_name'], ['asc'],
+                                      {'metadata': {'key': '0'}}))
+        self.assertEqual(
+            summary(db.volume_get_all_by_project(self.ctxt, 'p1', None, None,
+                                                 ['display_name'], ['desc'])),
+            db.volume_get_all_summary(self.ctxt, None, None,
+                                      ['display_name'], ['desc'],
+                                      project_id='p1'))
+        self.assertEqual([], db.volume_get_all_summary(
+            self.ctxt, None, None, filters={'invalid_key': 'foo'}))
+
+    def test_volume_get_all_summary_all_projects_non_admin(self):
+        ctxt = context.RequestContext('user', 'p1', is_admin=False)
+        self.assertRaises(exception.AdminRequired,
+                          db.volume_get_all_summary, ctxt, None, None)
+
+    def test_volume_get_all_summary_columns(self):
+        for i in range(3):
+            db.volume_create(self.ctxt, {'project_id': 'p1', 'size': i + 1,
+                                         'display_name': 'vol%d' % i})
+
+        with mock.patch.object(sa_query.Query, 'with_entities',
+                               autospec=True,
+                               side_effect=sa_query.Query.with_entities
+                               ) as with_entities:
+            summary = db.volume_get_all_summary(self.ctxt, None, None,
+                                                filters={'size': 2})
+
+        with_entities.assert_called_once_with(mock.ANY, models.Volume.id,
+                                              models.Volume.display_name)
+        self.assertEqual(1, len(summary))
+        self.assertEqual({'id', 'display_name'}, set(summary[0]))
+        self.assertEqual('vol1', summary[0]['display_name'])
+
+    def test_volume_get_generation(self):
+        volume = db.volume_create(self.ctxt, {'project_id': 'p1'})
+        generation = db.volume_get_generation(self.ctxt, 'p1')
+        self.assertEqual(generation, db.volume_get_generation(self.ctxt,
+                                                              'p1'))
+
+        # Changes to other projects' volumes do not matter
+        db.volume_create(self.ctxt, {'project_id': 'p2'})
+        self.assertEqual(generation, db.volume_get_generation(self.ctxt,
+                                                              'p1'))
+        self.assertNotEqual(generation, db.volume_get_generation(self.ctxt))
+
+        for change in (
+                lambda: db.volume_metadata_update(self.ctxt, volume.id,
+                                                  {'key': 'value'}, False),
+                lambda: db.volume_glance_metadata_create(
+                    self.ctxt, volume.id, 'image_name', 'image'),
+                lambda: db.volume_glance_metadata_delete_by_volume(
+                    self.ctxt, volume.id),
+                lambda: db.volume_attach(self.ctxt,
+                                         {'volume_id': volume.id}),
+                lambda: db.volume_update(self.ctxt, volume.id,
+                                         {'status': 'error'}),
+                lambda: db.volume_destroy(self.ctxt, volume.id)):
+            change()
+            new_generation = db.volume_get_generation(self.ctxt, 'p1')
+            self.assertNotEqual(generation, new_generation)
+            generation = new_generation
+
+    def test_volume_get_generation_non_admin(self):
+        ctxt = context.RequestContext('user', 'p1', is_admin=False)
+        db.volume_get_generation(ctxt, 'p1')
+        self.assertRaises(exception.AdminRequired,
+                          db.volume_get_generation, ctxt)
+        self.assertRaises(exception.NotAuthorized,
+                          db.volume_get_generation, ctxt, 'p2')
+
     def test_volume_get_by_name(self):
         db.volume_create(self.ctxt, {'display_name': 'vol1'})
         db.volume_create(self.ctxt, {'display_name': 'vol2'})
@@ -1371,6 +1463,15 @@ class DBAPISnapshotTestCase(BaseTest):
 
         self.assertEqual(metadata, db.snapshot_metadata_get(self.ctxt, 1))
 
+    def test_snapshot_get_generation(self):
+        db.volume_create(self.ctxt, {'id': 1})
+        db.snapshot_create(self.ctxt, {'id': 1, 'volume_id': 1,
+                                       'project_id': 'p1'})
+        generation = db.snapshot_get_generation(self.ctxt, 'p1')
+        db.snapshot_metadata_update(self.ctxt, 1, {'a': '1'}, False)
+        self.assertNotEqual(generation,
+                            db.snapshot_get_generation(self.ctxt, 'p1'))
+
     def test_snapshot_metadata_update(self):
         metadata1 = {'a': '1', 'c': '2'}
         metadata2 = {'a': '3', 'd': '5'}
@@ -1717,6 +1818,49 @@ class DBAPIReservationTestCase(BaseTest):
                              self.ctxt,
                              'project1'))
 
+    def test_quota_reserve_locks_usages_up_front(self):
+        with mock.patch.object(sqlalchemy_api, '_get_quota_usages',
+                               wraps=sqlalchemy_api._get_quota_usages) as \
+                mock_get_usages:
+            _quota_reserve(self.ctxt, 'project1')
+        mock_get_usages.assert_called_once_with(
+            mock.ANY, mock.ANY, 'project1',
+            resources=['gigabytes', 'volumes'])
+
+    def test_quota_sync_resource(self):
+        volume_type = {'id': 'fake-type-id', 'name': 'type1'}
+        resources = [quota.VolumeTypeResource(part_name, volume_type)
+                     for part_name in ('volumes', 'gigabytes', 'snapshots')]
+        resources.append(quota.ReservableResource('backups', '_sync_backups'))
+        session = sqlalchemy_api.get_session()
+        for resource in resources:
+            sync = sqlalchemy_api.QUOTA_SYNC_FUNCTIONS[resource.sync]
+            updates = sync(self.ctxt, 'project1',
+                           volume_type_id=getattr(resource, 'volume_type_id',
+                                                  None),
+                           volume_type_name=getattr(resource,
+                                                    'volume_type_name', None),
+                           session=session)
+            self.assertEqual([sqlalchemy_api._quota_sync_resource(resource)],
+                             list(updates))
+
+    def test_reservation_commit_deletes_reservations(self):
+        reservations = _quota_reserve(self.ctxt, 'project1')
+        db.reservation_commit(self.ctxt, reservations, 'project1')
+        models = sqlalchemy_api.models
+        rows = sqlalchemy_api.model_query(
+            self.ctxt, models.Reservation, read_deleted="no").filter(
+            models.Reservation.uuid.in_(reservations)).all()
+        self.assertEqual([], rows)
+
+    def test_reservation_commit_locks_only_reserved_resources(self):
+        reservations = _quota_reserve(self.ctxt, 'project1')
+        with mock.patch.object(sqlalchemy_api, '_get_quota_usages',
+                               wraps=sqlalchemy_api._get_quota_usages) as \
+                mock_get_usages:
+            db.reservation_commit(self.ctxt, reservations[:1], 'project1')
+        self.assertEqual(1, len(mock_get_usages.call_args[1]['resources']))
+
     def test_reservation_rollback(self):
         reservations = _quota_reserve(self.ctxt, 'project1')
         expected = {'project_id': 'project1',
@@ -2001,6 +2145,13 @@ class DBAPIBackupTestCase(BaseTest):
         return [{k: compose(v, i) for k, v in base_values.items()}
                 for i in range(1, 4)]
 
+    def test_backup_get_generation(self):
+        generation = db.backup_get_generation(self.ctxt, 'project1')
+        db.backup_update(self.ctxt, self.created[0].id, {'status': 'error'})
+        self.assertNotEqual(generation,
+                            db.backup_get_generation(self.ctxt, 'project1'))
+        self.assertEqual(3, db.backup_get_generation(self.ctxt)[0])
+
     def test_backup_create(self):
         values = self._get_values()
         for i, backup in enumerate(self.created):
@@ -7804,6 +7804,24 @@ class EMCVMAXUtilsTest(test.TestCase):
             emc_vmax_provision.COPY_ON_WRITE, extraSpecs)
         self.assertIsNotNone(rsdInstance)
 
+    def test_find_replication_service_cached(self):
+        conn = FakeEcomConnection()
+        conn.EnumerateInstanceNames = mock.Mock(
+            wraps=conn.EnumerateInstanceNames)
+
+        repService = self.driver.utils.find_replication_service(
+            conn, self.data.storage_system)
+        self.assertEqual(repService,
+                         self.driver.utils.find_replication_service(
+                             conn, self.data.storage_system))
+        conn.EnumerateInstanceNames.assert_called_once_with(
+            'EMC_ReplicationService')
+
+        self.driver.utils.clear_cim_cache(conn)
+        self.driver.utils.find_replication_service(
+            conn, self.data.storage_system)
+        self.assertEqual(2, conn.EnumerateInstanceNames.call_count)
+
 
 class EMCVMAXCommonTest(test.TestCase):
     def setUp(self):
@@ -7843,6 +7861,27 @@ class EMCVMAXCommonTest(test.TestCase):
             sourceInstance, cloneName, extraSpecs)
         self.assertIsNotNone(duplicateVolumeInstance)
 
+    @mock.patch.object(
+        emc_vmax_common.EMCVMAXCommon,
+        '_create_ecom_connection',
+        side_effect=[FakeEcomConnection(), FakeEcomConnection()])
+    def test_get_ecom_connection_reused(self, mock_create):
+        common = self.driver.common
+        common.url = 'http://10.10.10.10:5988'
+        common.user = 'user'
+        common.passwd = 'pass'
+        common.ecomUseSSL = False
+
+        conn = common._get_ecom_connection()
+        self.assertEqual(conn, common._get_ecom_connection())
+        self.assertEqual(1, mock_create.call_count)
+
+        common.utils.clear_cim_cache = mock.Mock()
+        common._reset_ecom_connection()
+        common.utils.clear_cim_cache.assert_called_once_with(conn)
+        self.assertNotEqual(conn, common._get_ecom_connection())
+        self.assertEqual(2, mock_create.call_count)
+
     def test_cleanup_target(self):
         common = self.driver.common
         common.conn = FakeEcomConnection()
@@ -5872,6 +5872,8 @@ class EMCVNXCLIToggleSPTestCase(test.TestCase):
         self.configuration.zoning_mode = None
         self.configuration.storage_vnx_security_file_dir = ""
         self.configuration.config_group = 'toggle-backend'
+        self.configuration.naviseccli_max_processes = 0
+        self.configuration.naviseccli_query_cache_ttl = 0
         self.cli_client = emc_vnx_cli.CommandLineHelper(
             configuration=self.configuration)
         self.test_data = EMCVNXCLIToggleSPTestData()
@@ -6492,6 +6494,72 @@ class EMCVNXCLIDriverReplicationV2TestCase(DriverTestCaseBase):
 VNXError = emc_vnx_cli.VNXError
 
 
+class ArrayCLIStateTest(test.TestCase):
+
+    def setUp(self):
+        super(ArrayCLIStateTest, self).setUp()
+        self.mock_object(emc_vnx_cli.ArrayCLIState, '_states', {})
+
+    def test_get_shared(self):
+        state = emc_vnx_cli.ArrayCLIState.get(('10.0.0.1', '10.0.0.2'),
+                                              max_processes=4)
+
+        self.assertIs(state, emc_vnx_cli.ArrayCLIState.get(
+            ('10.0.0.2', '10.0.0.1')))
+        self.assertIsNot(state, emc_vnx_cli.ArrayCLIState.get(
+            ('10.0.0.3', None)))
+
+    @mock.patch('time.time', mock.Mock(return_value=100))
+    def test_query(self):
+        state = emc_vnx_cli.ArrayCLIState(query_ttl=60)
+        query = ('storagepool', '-list', '-state')
+        func = mock.Mock(return_value=('Pool Name: pool1', 0))
+
+        state.query(query, False, func)
+        out = state.query(query, False, func)
+
+        self.assertEqual(('Pool Name: pool1', 0), out)
+        self.assertEqual(1, func.call_count)
+        # Polling queries get fresh output.
+        state.query(query, True, func)
+        self.assertEqual(2, func.call_count)
+        state.invalidate()
+        state.query(query, False, func)
+        self.assertEqual(3, func.call_count)
+
+    def test_query_failed(self):
+        state = emc_vnx_cli.ArrayCLIState(query_ttl=60)
+        query = ('ndu', '-list')
+        func = mock.Mock(return_value=('Error', 255))
+
+        state.query(query, False, func)
+        state.query(query, False, func)
+
+        self.assertEqual(2, func.call_count)
+
+    @mock.patch('os.path.exists', mock.Mock(return_value=True))
+    @mock.patch('cinder.utils.execute')
+    def test_command_execute_shared(self, mock_execute):
+        mock_execute.return_value = ('Pool Name: pool1', '')
+        configuration = conf.Configuration(None)
+        configuration.naviseccli_path = '/opt/Navisphere/bin/naviseccli'
+        configuration.san_ip = '10.0.0.1'
+        configuration.naviseccli_query_cache_ttl = 60
+        client = emc_vnx_cli.CommandLineHelper(configuration)
+        other_client = emc_vnx_cli.CommandLineHelper(configuration)
+
+        client.command_execute('storagepool', '-list', '-state', poll=False)
+        other_client.command_execute('storagepool', '-list', '-state',
+                                     poll=False)
+        self.assertEqual(1, mock_execute.call_count)
+
+        client.command_execute('lun', '-create', '-capacity', 1,
+                               '-poolName', 'pool1', '-name', 'vol1')
+        other_client.command_execute('storagepool', '-list', '-state',
+                                     poll=False)
+        self.assertEqual(3, mock_execute.call_count)
+
+
 class VNXErrorTest(test.TestCase):
 
     def test_has_error(self):
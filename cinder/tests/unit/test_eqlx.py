@@ -45,6 +45,8 @@ class DellEQLSanISCSIDriverTestCase(test.TestCase):
         self.configuration.ssh_min_pool_conn = 1
         self.configuration.ssh_max_pool_conn = 5
         self.configuration.ssh_conn_timeout = 30
+        self.configuration.ssh_pool_idle_timeout = 600
+        self.configuration.ssh_pool_check_interval = 60
         self.configuration.eqlx_pool = 'non-default'
         self.configuration.eqlx_group_name = 'group-0'
         self.configuration.eqlx_cli_timeout = 30
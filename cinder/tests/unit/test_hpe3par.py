@@ -4969,6 +4969,46 @@ class TestHPE3PARFCDriver(HPE3PARBaseDriver, test.TestCase):
             common.client.deleteCPG(HPE3PAR_CPG)
             common.client.createCPG(HPE3PAR_CPG, {})
 
+    def test_get_volume_stats_cached(self):
+        config = self.setup_configuration()
+        mock_client = self.setup_driver(config=config)
+        mock_client.getCPG.return_value = self.cpgs[0]
+        mock_client.getStorageSystemInfo.return_value = {
+            'id': self.CLIENT_ID,
+            'serialNumber': '1234'
+        }
+        mock_client.getCPGAvailableSpace.return_value = {
+            "usableFreeMiB": 1024.0 * 3
+        }
+        mock_client.getCPGStatData.return_value = {
+            THROUGHPUT: 0,
+            BANDWIDTH: 0,
+            LATENCY: 0,
+            IO_SIZE: 0,
+            QUEUE_LENGTH: 0,
+            AVG_BUSY_PERC: 0
+        }
+
+        with mock.patch.object(hpecommon.HPE3PARCommon,
+                               '_create_client') as mock_create_client:
+            mock_create_client.return_value = mock_client
+
+            self.driver.get_volume_stats(True)
+            stats = self.driver.get_volume_stats(True)
+
+            self.assertEqual(3.0, stats['pools'][0]['free_capacity_gb'])
+            self.assertEqual(2, mock_client.getCPGStatData.call_count)
+            self.assertEqual(2, mock_client.getCPGAvailableSpace.call_count)
+
+            usage = dict(self.cpgs[0]['UsrUsage'])
+            usage['usedMiB'] += 1024
+            mock_client.getCPG.return_value = dict(self.cpgs[0],
+                                                   UsrUsage=usage)
+            self.driver.get_volume_stats(True)
+
+            self.assertEqual(2, mock_client.getCPGStatData.call_count)
+            self.assertEqual(4, mock_client.getCPGAvailableSpace.call_count)
+
     def test_get_volume_stats2(self):
         # Testing when the API_VERSION is incompatible with getCPGStatData
         srstatld_api_version = 30201200
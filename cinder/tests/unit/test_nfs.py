@@ -54,6 +54,7 @@ class RemoteFsDriverTestCase(test.TestCase):
         self.configuration.nas_secure_file_operations = 'false'
         self.configuration.max_over_subscription_ratio = 1.0
         self.configuration.reserved_percentage = 5
+        self.configuration.nas_allocation_reconcile_interval = 600
         self._driver = remotefs.RemoteFSDriver(
             configuration=self.configuration)
         mock_exc = mock.patch.object(self._driver, '_execute')
@@ -341,6 +342,7 @@ class NfsDriverTestCase(test.TestCase):
         self.configuration.nas_share_path = None
         self.configuration.nas_mount_options = None
         self.configuration.volume_dd_blocksize = '1M'
+        self.configuration.nas_allocation_reconcile_interval = 600
         self._driver = nfs.NfsDriver(configuration=self.configuration)
         self._driver.shares = {}
         mock_exc = mock.patch.object(self._driver, '_execute')
@@ -467,6 +469,75 @@ class NfsDriverTestCase(test.TestCase):
 
             self._execute.assert_has_calls(calls)
 
+    def test_get_capacity_info_uses_tracked_allocation(self):
+        drv = self._driver
+        stat_output = '1 2620544 2129984'
+
+        with mock.patch.object(
+                drv, '_get_mount_point_for_share') as mock_get_mount:
+            mock_get_mount.return_value = self.TEST_MNT_POINT
+            self._execute.side_effect = [(stat_output, None),
+                                         ('490560 /mnt', None),
+                                         (stat_output, None)]
+
+            drv._get_capacity_info(self.TEST_NFS_EXPORT1)
+            drv._update_share_allocated(self.TEST_NFS_EXPORT1, 1000)
+            self.assertEqual((2620544, 2129984, 491560),
+                             drv._get_capacity_info(self.TEST_NFS_EXPORT1))
+
+            self.assertEqual(3, self._execute.call_count)
+        # Kept apart from the allocation used for the provisioned capacity.
+        self.assertEqual(
+            [(self.TEST_NFS_EXPORT1, '_scan_share_apparent_size')],
+            list(drv._share_allocated))
+
+    @mock.patch('time.time')
+    def test_get_share_allocated_walks_after_interval(self, mock_time):
+        drv = self._driver
+        self.configuration.nas_allocation_reconcile_interval = 600
+        mock_time.return_value = 1000
+        self._execute.side_effect = [('490560 /mnt', None),
+                                     ('123456 /mnt', None)]
+
+        self.assertEqual(490560, drv._get_share_allocated(
+            self.TEST_NFS_EXPORT1, self.TEST_MNT_POINT))
+        drv._update_share_allocated(self.TEST_NFS_EXPORT1, -490560 * 2)
+
+        # The tracked value is used until it is older than the interval.
+        mock_time.return_value = 1599
+        self.assertEqual(0, drv._get_share_allocated(
+            self.TEST_NFS_EXPORT1, self.TEST_MNT_POINT))
+        self.assertEqual(1, self._execute.call_count)
+
+        mock_time.return_value = 1600
+        self.assertEqual(123456, drv._get_share_allocated(
+            self.TEST_NFS_EXPORT1, self.TEST_MNT_POINT))
+        self.assertEqual(2, self._execute.call_count)
+        self.assertEqual(
+            [123456, 1600],
+            drv._share_allocated[(self.TEST_NFS_EXPORT1,
+                                  '_scan_share_allocated')])
+
+    def test_create_and_delete_volume_update_share_allocated(self):
+        drv = self._driver
+        drv._ensure_shares_mounted = mock.Mock()
+        drv._ensure_share_mounted = mock.Mock()
+        drv._do_create_volume = mock.Mock()
+        key = (self.TEST_NFS_EXPORT1, '_scan_share_allocated')
+        drv._share_allocated[key] = [units.Gi, 0]
+
+        volume = self._simple_volume()
+        volume['provider_location'] = self.TEST_NFS_EXPORT1
+        with mock.patch.object(drv, '_find_share',
+                               return_value=self.TEST_NFS_EXPORT1):
+            drv.create_volume(volume)
+        self.assertEqual(11 * units.Gi, drv._share_allocated[key][0])
+
+        with mock.patch.object(drv, 'local_path',
+                               return_value=self.TEST_LOCAL_PATH):
+            drv.delete_volume(volume)
+        self.assertEqual(units.Gi, drv._share_allocated[key][0])
+
     def test_load_shares_config(self):
         drv = self._driver
         drv.configuration.nfs_shares_config = self.TEST_SHARES_CONFIG_FILE
@@ -661,6 +732,7 @@ class NfsDriverTestCase(test.TestCase):
         volume = DumbVolume()
         volume['name'] = 'volume-123'
         volume['provider_location'] = self.TEST_NFS_EXPORT1
+        volume['size'] = 1
 
         with mock.patch.object(drv, 'local_path') as mock_local_path:
             mock_local_path.return_value = self.TEST_LOCAL_PATH
@@ -676,6 +748,7 @@ class NfsDriverTestCase(test.TestCase):
         volume = DumbVolume()
         volume['name'] = 'volume-123'
         volume['provider_location'] = self.TEST_NFS_EXPORT1
+        volume['size'] = 1
 
         with mock.patch.object(
                 drv, '_ensure_share_mounted') as mock_ensure_share:
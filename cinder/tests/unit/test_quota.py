@@ -879,6 +879,45 @@ class VolumeTypeQuotaEngineTestCase(test.TestCase):
         db.volume_type_destroy(ctx, vtype['id'])
         db.volume_type_destroy(ctx, vtype2['id'])
 
+    @mock.patch.object(db, 'volume_type_get_generation')
+    @mock.patch.object(db, 'volume_type_get_all')
+    def test_volume_type_resources_cached(self, mock_vtga, mock_generation):
+        mock_vtga.return_value = {'type1': {'id': 'fake-id',
+                                            'name': 'type1'}}
+        mock_generation.return_value = (('fake-id', 'type1'),)
+
+        engine = quota.VolumeTypeQuotaEngine()
+        self.assertIn('volumes_type1', engine.resources)
+        self.assertIn('volumes_type1', engine.resources)
+        self.assertEqual(1, mock_vtga.call_count)
+
+        mock_vtga.return_value = {}
+        mock_generation.return_value = ()
+        self.assertNotIn('volumes_type1', engine.resources)
+        self.assertEqual(2, mock_vtga.call_count)
+
+        engine.invalidate_resources()
+        engine.resources
+        self.assertEqual(3, mock_vtga.call_count)
+
+    @mock.patch('oslo_utils.timeutils.utcnow')
+    def test_volume_type_get_generation_changes(self, mock_utcnow):
+        # Every change happens within the same second.
+        mock_utcnow.return_value = datetime.datetime(2016, 1, 1, 12, 0, 0)
+        ctx = context.RequestContext('admin', 'admin', is_admin=True)
+        generation = db.volume_type_get_generation(ctx)
+        vtype = db.volume_type_create(ctx, {'name': 'type1'})
+        created = db.volume_type_get_generation(ctx)
+        self.assertNotEqual(generation, created)
+        self.assertEqual(((vtype['id'], 'type1'),), created)
+        db.volume_type_update(ctx, vtype['id'],
+                              {'name': 'type2', 'description': None,
+                               'is_public': None})
+        renamed = db.volume_type_get_generation(ctx)
+        self.assertEqual(((vtype['id'], 'type2'),), renamed)
+        db.volume_type_destroy(ctx, vtype['id'])
+        self.assertEqual(generation, db.volume_type_get_generation(ctx))
+
     def test_update_quota_resource(self):
         ctx = context.RequestContext('admin', 'admin', is_admin=True)
 
@@ -1030,6 +1069,35 @@ class DbQuotaDriverTestCase(DbQuotaDriverBaseTestCase):
         self._stub_quota_class_get_all_by_name()
         self._stub_quota_class_get_default()
 
+    @mock.patch.object(db, 'quota_class_get_default', return_value={})
+    @mock.patch.object(db, 'quota_class_get_all_by_name', return_value={})
+    @mock.patch.object(db, 'quota_get_all_by_project',
+                       return_value={'volumes': 5})
+    def test_get_project_quotas_cached_limits(self, mock_qgabp, mock_qcgabn,
+                                              mock_qcgd):
+        self.flags(quota_limit_cache_ttl=60)
+        self._stub_volume_type_get_all()
+        ctxt = FakeContext('test_project', 'test_class')
+        for i in range(2):
+            result = self.driver.get_project_quotas(
+                ctxt, quota.QUOTAS.resources, 'test_project', usages=False)
+            self.assertEqual(5, result['volumes']['limit'])
+        self.assertEqual(1, mock_qgabp.call_count)
+        self.assertEqual(1, mock_qcgabn.call_count)
+        self.assertEqual(1, mock_qcgd.call_count)
+
+        quota.QUOTAS.invalidate_limits()
+        self.driver.get_project_quotas(
+            ctxt, quota.QUOTAS.resources, 'test_project', usages=False)
+        self.assertEqual(2, mock_qgabp.call_count)
+
+        # Limits of other projects are not served from the cache.
+        self.driver.get_project_quotas(
+            ctxt, quota.QUOTAS.resources, 'other_project', usages=False)
+        self.driver.get_project_quotas(
+            ctxt, quota.QUOTAS.resources, 'other_project', usages=False)
+        self.assertEqual(4, mock_qgabp.call_count)
+
     def test_get_project_quotas(self):
         self._stub_get_by_project()
         self._stub_volume_type_get_all()
@@ -1691,8 +1759,10 @@ class QuotaReserveSqlAlchemyTestCase(test.TestCase):
         def fake_get_session():
             return FakeSession()
 
-        def fake_get_quota_usages(context, session, project_id):
-            return self.usages.copy()
+        def fake_get_quota_usages(context, session, project_id,
+                                  resources=None):
+            return {k: v for k, v in self.usages.items()
+                    if resources is None or k in resources}
 
         def fake_quota_usage_create(context, project_id, resource, in_use,
                                     reserved, until_refresh, session=None,
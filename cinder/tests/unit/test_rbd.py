@@ -147,6 +147,9 @@ class RBDTestCase(test.TestCase):
         self.cfg.rbd_store_chunk_size = 4
         self.cfg.rados_connection_retries = 3
         self.cfg.rados_connection_interval = 5
+        self.cfg.rbd_flatten_in_background = False
+        self.cfg.rbd_background_flatten_batch_size = 1
+        self.cfg.rbd_flatten_hot_clone_threshold = 0
 
         mock_exec = mock.Mock()
         mock_exec.return_value = ('', '')
@@ -677,6 +680,91 @@ class RBDTestCase(test.TestCase):
                  (self.volume_b.name, 'clone_snap'))))
             self.mock_rbd.Image.return_value.close.assert_called_once_with()
 
+    @common_mocks
+    def test_get_clone_depth_cached(self):
+        self.cfg.rbd_max_clone_depth = 5
+        client = self.mock_client.return_value
+
+        with mock.patch.object(self.driver, '_get_clone_info') as \
+                mock_get_clone_info:
+            mock_get_clone_info.side_effect = [
+                ('fake_pool', 'parent', 'volume-0000000a.clone_snap'),
+                (None, None, None)]
+
+            self.assertEqual(1, self.driver._get_clone_depth(
+                client, self.volume_a.name))
+            self.assertEqual(1, self.driver._get_clone_depth(
+                client, self.volume_a.name))
+            self.assertEqual(0, self.driver._get_clone_depth(
+                client, 'parent'))
+
+            self.assertEqual(2, mock_get_clone_info.call_count)
+            self.assertEqual(2, self.mock_rbd.Image.call_count)
+
+    @common_mocks
+    def test_create_cloned_volume_w_background_flatten(self):
+        self.cfg.rbd_max_clone_depth = 1
+        self.cfg.rbd_flatten_in_background = True
+
+        with mock.patch.object(self.driver, '_get_clone_depth') as \
+                mock_get_clone_depth:
+            mock_get_clone_depth.return_value = 1
+
+            self.driver.create_cloned_volume(self.volume_b, self.volume_a)
+
+            self.assertEqual(
+                1, self.mock_rbd.RBD.return_value.clone.call_count)
+            self.assertFalse(self.mock_rbd.Image.return_value.flatten.called)
+            self.assertFalse(
+                self.mock_rbd.Image.return_value.unprotect_snap.called)
+            self.assertEqual([self.volume_a.name],
+                             list(self.driver._flatten_queue))
+
+    @common_mocks
+    def test_create_cloned_volume_hot_source_queued(self):
+        self.cfg.rbd_max_clone_depth = 5
+        self.cfg.rbd_flatten_in_background = True
+        self.cfg.rbd_flatten_hot_clone_threshold = 2
+
+        with mock.patch.object(self.driver, '_get_clone_depth') as \
+                mock_get_clone_depth:
+            mock_get_clone_depth.return_value = 1
+
+            self.driver.create_cloned_volume(self.volume_b, self.volume_a)
+            self.assertEqual(0, len(self.driver._flatten_queue))
+
+            volume_c = fake_volume.fake_volume_obj(
+                self.context, name=u'volume-0000000c', size=10)
+            self.driver.create_cloned_volume(volume_c, self.volume_a)
+            self.assertEqual([self.volume_a.name],
+                             list(self.driver._flatten_queue))
+
+    @common_mocks
+    def test_process_flatten_queue(self):
+        self.cfg.rbd_background_flatten_batch_size = 1
+        self.driver._queue_flatten(self.volume_a.name)
+        self.driver._queue_flatten(self.volume_b.name)
+        self.driver._clone_tracker.set_parent(self.volume_a.name, 'parent')
+
+        with mock.patch.object(self.driver, '_get_clone_info') as \
+                mock_get_clone_info, \
+                mock.patch.object(self.driver,
+                                  '_delete_clone_parent_refs') as \
+                mock_delete_parent_refs:
+            mock_get_clone_info.return_value = (
+                'fake_pool', 'parent', 'volume-0000000a.clone_snap')
+
+            self.driver._process_flatten_queue()
+
+            self.mock_rbd.Image.return_value.flatten.assert_called_once_with()
+            mock_delete_parent_refs.assert_called_once_with(
+                self.mock_client.return_value.__enter__.return_value,
+                'parent', 'volume-0000000a.clone_snap')
+            self.assertEqual(
+                0, self.driver._clone_tracker.get_depth(self.volume_a.name))
+            self.assertEqual([self.volume_b.name],
+                             list(self.driver._flatten_queue))
+
     @common_mocks
     def test_good_locations(self):
         locations = ['rbd://fsid/pool/image/snap',
@@ -39,6 +39,8 @@ class SanDriverTestCase(test.TestCase):
         self.configuration.ssh_min_pool_conn = 1
         self.configuration.ssh_max_pool_conn = 5
         self.configuration.ssh_conn_timeout = 30
+        self.configuration.ssh_pool_idle_timeout = 600
+        self.configuration.ssh_pool_check_interval = 60
 
     class fake_san_driver(san.SanDriver):
         def initialize_connection():
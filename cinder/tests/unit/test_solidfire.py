@@ -1108,6 +1108,72 @@ class SolidFireVolumeTestCase(test.TestCase):
                 sfv, '_issue_api_request', side_effect=_fake_issue_api_req):
             self.assertEqual(5, sfv._get_sf_volume(test_name, 8)['volumeID'])
 
+    def test_get_sf_volume_mapped(self):
+        sfv = solidfire.SolidFireDriver(configuration=self.configuration)
+        vid = self.mock_volume['id']
+        sf_vol = {'volumeID': 7,
+                  'name': 'UUID-' + vid,
+                  'accountID': 25,
+                  'status': 'active',
+                  'attributes': {}}
+        sfv.volume_map = {vid: 7}
+
+        with mock.patch.object(
+                sfv, '_issue_api_request',
+                return_value={'result': {'volumes': [sf_vol]}}) as api_req:
+            self.assertEqual(sf_vol,
+                             sfv._get_sf_volume(vid, {'accountID': 25}))
+            api_req.assert_called_once_with(
+                'ListActiveVolumes', {'startVolumeID': 7, 'limit': 1})
+
+    def test_get_sf_volume_stale_mapping(self):
+        sfv = solidfire.SolidFireDriver(configuration=self.configuration)
+        vid = self.mock_volume['id']
+        other_vol = {'volumeID': 7,
+                     'name': 'UUID-' + vid[::-1],
+                     'accountID': 25,
+                     'status': 'active',
+                     'attributes': {}}
+        sfv.volume_map = {vid: 7}
+
+        def _fake_issue_api_req(method, params, version=0):
+            if 'startVolumeID' in params:
+                return {'result': {'volumes': [other_vol]}}
+            return self.fake_issue_api_request(method, params)
+
+        with mock.patch.object(
+                sfv, '_issue_api_request', side_effect=_fake_issue_api_req):
+            sf_vol = sfv._get_sf_volume(vid, {'accountID': 25})
+
+        self.assertEqual(5, sf_vol['volumeID'])
+        self.assertEqual({vid: 5}, sfv.volume_map)
+
+    def test_refresh_volume_map(self):
+        sfv = solidfire.SolidFireDriver(configuration=self.configuration)
+        vid_1 = 'c9125d6d-22ff-4cc3-974d-d4e350df9c91'
+        vid_2 = '79883868-6933-47a1-a362-edfbf8d55a18'
+        vid_3 = 'e3caa4fa-485e-45ca-970e-1d3e693a2520'
+        sf_vols = [{'volumeID': 1, 'name': 'UUID-' + vid_1,
+                    'attributes': {}},
+                   {'volumeID': 2, 'name': 'volume-' + vid_2,
+                    'attributes': {'uuid': vid_2}},
+                   {'volumeID': 3, 'name': 'UUID-' + vid_3,
+                    'attributes': {}},
+                   {'volumeID': 4, 'name': 'UUID-' + vid_3,
+                    'attributes': {}},
+                   {'volumeID': 5, 'name': 'existing_volume',
+                    'attributes': {}}]
+        sfv.volume_map = {vid_3: 3}
+
+        with mock.patch.object(
+                sfv, '_issue_api_request',
+                return_value={'result': {'volumes': sf_vols}}) as api_req:
+            sfv._refresh_volume_map()
+            sfv._refresh_volume_map()
+
+        api_req.assert_called_once_with('ListActiveVolumes', {})
+        self.assertEqual({vid_1: 1, vid_2: 2}, sfv.volume_map)
+
     def test_sf_init_conn_with_vag(self):
         # Verify with the _enable_vag conf set that we correctly create a VAG.
         mod_conf = self.configuration
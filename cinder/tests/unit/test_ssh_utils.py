@@ -334,3 +334,54 @@ class SSHPoolTestCase(test.TestCase):
         with sshpool.item() as ssh:
             self.assertTrue(isinstance(ssh.get_policy(),
                                        paramiko.AutoAddPolicy))
+
+    @mock.patch('six.moves.builtins.open')
+    @mock.patch('paramiko.SSHClient')
+    @mock.patch('os.path.isfile', return_value=True)
+    def test_sshpool_evicts_idle_connections(self, mock_isfile,
+                                             mock_sshclient, mock_open):
+        mock_sshclient.side_effect = lambda: FakeSSHClient()
+        sshpool = ssh_utils.SSHPool("127.0.0.1", 22, 10,
+                                    "test",
+                                    password="test",
+                                    min_size=1,
+                                    max_size=3,
+                                    idle_timeout=60)
+        with sshpool.item():
+            with sshpool.item():
+                pass
+        self.assertEqual(2, sshpool.current_size)
+
+        for ssh in sshpool.free_items:
+            sshpool._last_used[ssh] -= 120
+        with sshpool.item():
+            pass
+
+        self.assertEqual(1, sshpool.current_size)
+        self.assertEqual(2, mock_sshclient.call_count)
+
+    @mock.patch('six.moves.builtins.open')
+    @mock.patch('paramiko.SSHClient')
+    @mock.patch('os.path.isfile', return_value=True)
+    def test_sshpool_checks_idle_connection(self, mock_isfile,
+                                            mock_sshclient, mock_open):
+        mock_sshclient.return_value = FakeSSHClient()
+        sshpool = ssh_utils.SSHPool("127.0.0.1", 22, 10,
+                                    "test",
+                                    password="test",
+                                    min_size=1,
+                                    max_size=1,
+                                    check_interval=30)
+        with sshpool.item() as ssh:
+            first_id = ssh.id
+            ssh.transport.open_session = mock.Mock(
+                side_effect=paramiko.SSHException('timeout'))
+
+        with sshpool.item() as ssh:
+            # Recently used connections are not probed.
+            self.assertEqual(first_id, ssh.id)
+
+        sshpool._last_used[ssh] -= 60
+        mock_sshclient.return_value = FakeSSHClient()
+        with sshpool.item() as ssh:
+            self.assertNotEqual(first_id, ssh.id)
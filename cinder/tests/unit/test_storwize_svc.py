@@ -22,6 +22,7 @@ import ddt
 import paramiko
 import random
 import re
+import threading
 import time
 import uuid
 
@@ -2828,7 +2829,10 @@ class StorwizeSVCCommonDriverTestCase(test.TestCase):
             password=self._driver.configuration.san_password,
             privatekey=self._driver.configuration.san_private_key,
             min_size=self._driver.configuration.ssh_min_pool_conn,
-            max_size=self._driver.configuration.ssh_max_pool_conn)
+            max_size=self._driver.configuration.ssh_max_pool_conn,
+            idle_timeout=self._driver.configuration.ssh_pool_idle_timeout,
+            check_interval=(
+                self._driver.configuration.ssh_pool_check_interval))
 
     @mock.patch.object(ssh_utils, 'SSHPool')
     @mock.patch.object(processutils, 'ssh_execute')
@@ -2846,7 +2850,10 @@ class StorwizeSVCCommonDriverTestCase(test.TestCase):
             password=self._driver.configuration.san_password,
             privatekey=self._driver.configuration.san_private_key,
             min_size=self._driver.configuration.ssh_min_pool_conn,
-            max_size=self._driver.configuration.ssh_max_pool_conn)
+            max_size=self._driver.configuration.ssh_max_pool_conn,
+            idle_timeout=self._driver.configuration.ssh_pool_idle_timeout,
+            check_interval=(
+                self._driver.configuration.ssh_pool_check_interval))
 
     @mock.patch.object(random, 'randint', mock.Mock(return_value=0))
     @mock.patch.object(ssh_utils, 'SSHPool')
@@ -2866,7 +2873,10 @@ class StorwizeSVCCommonDriverTestCase(test.TestCase):
             password=self._driver.configuration.san_password,
             privatekey=self._driver.configuration.san_private_key,
             min_size=self._driver.configuration.ssh_min_pool_conn,
-            max_size=self._driver.configuration.ssh_max_pool_conn)
+            max_size=self._driver.configuration.ssh_max_pool_conn,
+            idle_timeout=self._driver.configuration.ssh_pool_idle_timeout,
+            check_interval=(
+                self._driver.configuration.ssh_pool_check_interval))
 
     @mock.patch.object(ssh_utils, 'SSHPool')
     @mock.patch.object(processutils, 'ssh_execute')
@@ -2890,7 +2900,10 @@ class StorwizeSVCCommonDriverTestCase(test.TestCase):
             password=self._driver.configuration.san_password,
             privatekey=self._driver.configuration.san_private_key,
             min_size=self._driver.configuration.ssh_min_pool_conn,
-            max_size=self._driver.configuration.ssh_max_pool_conn)
+            max_size=self._driver.configuration.ssh_max_pool_conn,
+            idle_timeout=self._driver.configuration.ssh_pool_idle_timeout,
+            check_interval=(
+                self._driver.configuration.ssh_pool_check_interval))
 
     @mock.patch.object(ssh_utils, 'SSHPool')
     @mock.patch.object(processutils, 'ssh_execute')
@@ -4935,6 +4948,105 @@ class StorwizeSSHTestCase(test.TestCase):
                               self.storwize_ssh.mkvdiskhostmap,
                               'HOST3', 9999, 511, True)
 
+    @mock.patch.object(time, 'time')
+    def test_cli_cache(self, mock_time):
+        mock_time.return_value = 100
+
+        def _run_ssh(ssh_cmd, check_exit_code=True):
+            if ssh_cmd[0] == 'svctask':
+                return ('', '')
+            return ('id!1\nname!vol1\n', '')
+
+        run_ssh = mock.Mock(side_effect=_run_ssh)
+        ssh = storwize_svc_common.StorwizeSSH(run_ssh, cache_ttl=10)
+
+        ssh.lsvdisk('vol1')
+        ssh.lsvdisk('vol1')
+        self.assertEqual(1, run_ssh.call_count)
+
+        # Changes to other vdisks keep the cached output.
+        ssh.chvdisk('vol2', ['-rate', '50'])
+        ssh.lsvdisk('vol1')
+        self.assertEqual(2, run_ssh.call_count)
+
+        ssh.chvdisk('vol1', ['-rate', '50'])
+        ssh.lsvdisk('vol1')
+        self.assertEqual(4, run_ssh.call_count)
+
+        mock_time.return_value = 111
+        ssh.lsvdisk('vol1')
+        self.assertEqual(5, run_ssh.call_count)
+
+        # FlashCopy mappings are addressed by ID.
+        ssh.rmfcmap('3')
+        ssh.lsvdisk('vol1')
+        self.assertEqual(7, run_ssh.call_count)
+
+    def test_cli_cache_rmvdisk(self):
+        def _run_ssh(ssh_cmd, check_exit_code=True):
+            if ssh_cmd[0] == 'svctask':
+                return ('', '')
+            return ('id!name\n1!vol1\n', '')
+
+        run_ssh = mock.Mock(side_effect=_run_ssh)
+        ssh = storwize_svc_common.StorwizeSSH(run_ssh, cache_ttl=10)
+        reads = (lambda: ssh.lsvdisk('vol2'),
+                 lambda: ssh.lshostvdiskmap('HOST1'),
+                 lambda: ssh.lsvdiskfcmappings('vol2'))
+        for read in reads:
+            read()
+        self.assertEqual(3, run_ssh.call_count)
+
+        # Removing a vdisk with -force removes its host and FlashCopy
+        # mappings, listed for the host and the other vdisk as well.
+        ssh.rmvdisk('vol1')
+        for read in reads:
+            read()
+        self.assertEqual(6, run_ssh.call_count)
+        run_ssh.assert_has_calls([
+            mock.call(['svcinfo', 'lshostvdiskmap', '-delim', '!',
+                       '"HOST1"']),
+            mock.call(['svcinfo', 'lsvdiskfcmappings', '-delim', '!',
+                       'vol2'])])
+
+    def test_cli_cache_disabled(self):
+        run_ssh = mock.Mock(return_value=('name!HOST1\n', ''))
+        ssh = storwize_svc_common.StorwizeSSH(run_ssh)
+
+        ssh.lshost(host='HOST1')
+        ssh.lshost(host='HOST1')
+
+        self.assertEqual(2, run_ssh.call_count)
+
+    def test_cli_cache_coalesces_reads(self):
+        cache = storwize_svc_common.CLICache(10)
+        ssh_cmd = ['svcinfo', 'lshost', '-delim', '!']
+        started = threading.Event()
+        release = threading.Event()
+
+        def _fetch():
+            started.set()
+            release.wait()
+            return ('id!name\n', '')
+
+        fetch = mock.Mock(side_effect=_fetch)
+        results = []
+
+        def _read():
+            results.append(cache.get(tuple(ssh_cmd), ssh_cmd, fetch))
+
+        threads = [threading.Thread(target=_read) for i in range(3)]
+        threads[0].start()
+        started.wait()
+        for thread in threads[1:]:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        fetch.assert_called_once_with()
+        self.assertEqual([('id!name\n', '')] * 3, results)
+
 
 class StorwizeSVCReplicationMirrorTestCase(test.TestCase):
 
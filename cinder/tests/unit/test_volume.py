@@ -388,6 +388,28 @@ class VolumeTestCase(BaseVolumeTestCase):
                                           volume.id)
         self.assertEqual("in-use", volume.status)
 
+    def test_init_host_ensure_exports(self):
+        """init_host sets the volumes it couldn't re-export to error."""
+        vol0 = tests_utils.create_volume(self.context, status='in-use',
+                                         size=0, host=CONF.host)
+        vol1 = tests_utils.create_volume(self.context, status='in-use',
+                                         size=0, host=CONF.host)
+        self.override_config('init_host_export_workers', 2)
+        with mock.patch.object(
+                self.volume.driver, 'ensure_exports',
+                return_value={vol1.id: exception.CinderException()}) as \
+                mock_ensure_exports:
+            self.volume.init_host()
+
+        self.assertEqual(2, mock_ensure_exports.call_count)
+        exported = [v.id for call in mock_ensure_exports.call_args_list
+                    for v in call[0][1]]
+        self.assertEqual(sorted([vol0.id, vol1.id]), sorted(exported))
+        vol0 = objects.Volume.get_by_id(self.context, vol0.id)
+        vol1 = objects.Volume.get_by_id(self.context, vol1.id)
+        self.assertEqual('in-use', vol0.status)
+        self.assertEqual('error', vol1.status)
+
     def test_init_host_resumes_deletes(self):
         """init_host will resume deleting volume in deleting status."""
         volume = tests_utils.create_volume(self.context, status='deleting',
@@ -481,6 +503,49 @@ class VolumeTestCase(BaseVolumeTestCase):
                     self.assertTrue(m_get_stats.called)
                     mock_update.assert_called_once_with(expected)
 
+    @mock.patch.object(vol_manager.VolumeManager,
+                       'update_service_capabilities')
+    def test_report_driver_status_async(self, mock_update):
+        self.override_config('driver_stats_async', True)
+        manager = vol_manager.VolumeManager()
+        manager.driver.set_initialized()
+        with mock.patch.object(manager.driver, 'get_volume_stats',
+                               return_value={'name': 'cinder-volumes'}), \
+                mock.patch.object(manager._tp, 'spawn') as mock_spawn:
+            # Nothing is reported until the first collection is done.
+            manager._report_driver_status(1)
+            self.assertEqual(1, mock_spawn.call_count)
+            self.assertFalse(mock_update.called)
+
+            # A collection in progress is not started again.
+            manager._report_driver_status(1)
+            self.assertEqual(1, mock_spawn.call_count)
+
+            manager._collect_driver_stats()
+            self.assertIsNone(manager._driver_stats_thread)
+            # Don't delay the next collection for the time the last took.
+            manager.driver_stats_duration = 0
+            manager._report_driver_status(1)
+            self.assertEqual(2, mock_spawn.call_count)
+            self.assertEqual('cinder-volumes',
+                             mock_update.call_args[0][0]['name'])
+
+    @mock.patch.object(vol_manager.VolumeManager,
+                       'update_service_capabilities')
+    def test_report_driver_status_async_timeout(self, mock_update):
+        self.override_config('driver_stats_async', True)
+        manager = vol_manager.VolumeManager()
+        manager.driver.set_initialized()
+        stuck_thread = mock.Mock()
+        manager._driver_stats_thread = stuck_thread
+        manager._driver_stats_started_at = (
+            time.time() - manager.configuration.driver_stats_timeout)
+        with mock.patch.object(manager._tp, 'spawn') as mock_spawn:
+            manager._report_driver_status(1)
+
+        stuck_thread.kill.assert_called_once_with()
+        mock_spawn.assert_called_once_with(manager._collect_driver_stats)
+
     def test_is_working(self):
         # By default we have driver mocked to be initialized...
         self.assertTrue(self.volume.is_working())
@@ -4969,7 +5034,7 @@ class VolumeMigrationTestCase(BaseVolumeTestCase):
 
         with mock.patch.object(self.volume.driver, 'retype') as _retype,\
                 mock.patch.object(volume_types, 'volume_types_diff') as _diff,\
-                mock.patch.object(self.volume, 'migrate_volume') as _mig,\
+                mock.patch.object(self.volume, '_migrate_volume') as _mig,\
                 mock.patch.object(db.sqlalchemy.api, 'volume_get') as mock_get:
             mock_get.return_value = volume
             _retype.return_value = driver
@@ -6144,7 +6209,7 @@ class CopyVolumeToImageTestCase(BaseVolumeTestCase):
 
     @mock.patch.object(QUOTAS, 'reserve')
     @mock.patch.object(QUOTAS, 'commit')
-    @mock.patch.object(vol_manager.VolumeManager, 'create_volume')
+    @mock.patch.object(vol_manager.VolumeManager, '_create_volume')
     @mock.patch.object(fake_driver.FakeISCSIDriver, 'copy_volume_to_image')
     def _test_copy_volume_to_image_with_image_volume(
             self, mock_copy, mock_create, mock_quota_commit,
@@ -6726,6 +6791,75 @@ class LVMVolumeDriverTestCase(DriverTestCase):
         self.assertRaises(exception.VolumeBackendAPIException,
                           lvm_driver._delete_volume, volume)
 
+    def test_delete_volume_deferred_clear(self):
+        self.configuration.volume_clear = 'zero'
+        self.configuration.lvm_deferred_clear = True
+        vg_obj = mock.Mock()
+        lvm_driver = lvm.LVMVolumeDriver(configuration=self.configuration,
+                                         vg_obj=vg_obj, db=db)
+
+        with mock.patch.object(volutils, 'clear_volume') as mock_clear:
+            lvm_driver._delete_volume(dict(self.FAKE_VOLUME, size=2))
+
+            self.assertFalse(mock_clear.called)
+        vg_obj.rename_volume.assert_called_once_with('test1', '_clear_test1')
+        self.assertFalse(vg_obj.delete.called)
+        self.assertEqual({'_clear_test1': 2.0},
+                         lvm_driver._deferred_clear_queue)
+
+    def test_clear_deferred_volume(self):
+        self.configuration.volume_clear = 'zero'
+        self.configuration.volume_clear_size = 0
+        vg_obj = mock.Mock()
+        lvm_driver = lvm.LVMVolumeDriver(configuration=self.configuration,
+                                         vg_obj=vg_obj, db=db)
+        lvm_driver._deferred_clear_queue['_clear_test1'] = 2.0
+        lvm_driver._deferred_clear_queue['_clear_test2'] = 1.0
+
+        with mock.patch.object(volutils, 'clear_volume') as mock_clear:
+            lvm_driver._clear_deferred_volume()
+
+            mock_clear.assert_called_once_with(
+                2048, '/dev/mapper/cinder--volumes-_clear_test1',
+                volume_clear='zero', volume_clear_size=0,
+                throttle=lvm_driver._throttle)
+        vg_obj.delete.assert_called_once_with('_clear_test1')
+        self.assertEqual(['_clear_test2'],
+                         list(lvm_driver._deferred_clear_queue))
+
+    def test_clear_deferred_volume_failure_requeues(self):
+        self.configuration.volume_clear = 'zero'
+        vg_obj = mock.Mock()
+        lvm_driver = lvm.LVMVolumeDriver(configuration=self.configuration,
+                                         vg_obj=vg_obj, db=db)
+        lvm_driver._deferred_clear_queue['_clear_test1'] = 2.0
+        lvm_driver._deferred_clear_queue['_clear_test2'] = 1.0
+
+        with mock.patch.object(volutils, 'clear_volume',
+                               side_effect=processutils.ProcessExecutionError):
+            lvm_driver._clear_deferred_volume()
+
+        self.assertFalse(vg_obj.delete.called)
+        self.assertEqual(['_clear_test2', '_clear_test1'],
+                         list(lvm_driver._deferred_clear_queue))
+
+    @mock.patch('oslo_service.loopingcall.FixedIntervalLoopingCall')
+    def test_start_deferred_clear_finds_pending_lvs(self, mock_loop):
+        vg_obj = mock.Mock()
+        vg_obj.get_volumes.return_value = [
+            {'name': 'volume-1', 'size': '1.00', 'vg': 'cinder-volumes'},
+            {'name': '_clear_volume-2', 'size': '3.00',
+             'vg': 'cinder-volumes'}]
+        lvm_driver = lvm.LVMVolumeDriver(configuration=self.configuration,
+                                         vg_obj=vg_obj, db=db)
+
+        lvm_driver._start_deferred_clear()
+
+        self.assertEqual({'_clear_volume-2': 3.0},
+                         lvm_driver._deferred_clear_queue)
+        mock_loop.return_value.start.assert_called_once_with(
+            interval=self.configuration.lvm_deferred_clear_interval)
+
     @mock.patch.object(fake_driver.FakeISCSIDriver, 'create_export')
     def test_delete_volume_thinlvm_snap(self, _mock_create_export):
         self.configuration.volume_clear = 'zero'
@@ -7665,6 +7799,57 @@ class FibreChannelTestCase(DriverTestCase):
                           self.volume.driver.validate_connector, connector)
 
 
+class PoolStatsCacheTestCase(test.TestCase):
+
+    @mock.patch.object(time, 'time')
+    def test_get(self, mock_time):
+        mock_time.return_value = 100
+        cache = driver.PoolStatsCache(ttl=60)
+        collector = mock.Mock(return_value={'free': 10})
+
+        self.assertEqual({'free': 10},
+                         cache.get('pool1', collector, indicator=1))
+        cache.get('pool1', collector, indicator=1)
+        self.assertEqual(1, collector.call_count)
+
+        cache.get('pool2', collector, indicator=1)
+        cache.get('pool1', collector, indicator=2)
+        self.assertEqual(3, collector.call_count)
+
+        mock_time.return_value = 161
+        cache.get('pool1', collector, indicator=2)
+        self.assertEqual(4, collector.call_count)
+
+    @mock.patch.object(time, 'time')
+    def test_get_ttl(self, mock_time):
+        mock_time.return_value = 100
+        cache = driver.PoolStatsCache()
+        collector = mock.Mock(return_value={'free': 10})
+
+        cache.get('pool1', collector)
+        mock_time.return_value = 10000
+        cache.get('pool1', collector)
+        self.assertEqual(1, collector.call_count)
+
+        cache.get('pool1', collector, ttl=60)
+        self.assertEqual(2, collector.call_count)
+
+    def test_invalidate(self):
+        cache = driver.PoolStatsCache()
+        collector = mock.Mock(return_value={'free': 10})
+        cache.get('pool1', collector)
+        cache.get('pool2', collector)
+
+        cache.invalidate('pool1')
+        cache.get('pool1', collector)
+        cache.get('pool2', collector)
+        self.assertEqual(3, collector.call_count)
+
+        cache.invalidate()
+        cache.get('pool2', collector)
+        self.assertEqual(4, collector.call_count)
+
+
 class VolumePolicyTestCase(test.TestCase):
 
     def setUp(self):
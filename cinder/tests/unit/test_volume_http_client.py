@@ -0,0 +1,214 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Tests for the pooled HTTP client of the volume drivers."""
+
+import mock
+import requests
+from requests import adapters
+from requests import cookies
+
+from cinder import test
+from cinder.volume import configuration as conf
+from cinder.volume import driver
+from cinder.volume.drivers.huawei import constants as huawei_constants
+from cinder.volume.drivers.huawei import huawei_driver
+from cinder.volume.drivers.huawei import rest_client
+from cinder.volume.drivers import solidfire
+from cinder.volume.drivers import tintri
+from cinder.volume import http_client
+
+
+class FakeTintriAdapter(adapters.BaseAdapter):
+    """Answers each login with a new JSESSIONID cookie."""
+
+    def __init__(self):
+        super(FakeTintriAdapter, self).__init__()
+        self.sessions = 0
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append((request.path_url,
+                              request.headers.get('Cookie')))
+        set_cookies = []
+        if request.path_url.endswith('/session/login'):
+            self.sessions += 1
+            set_cookies.append('JSESSIONID=s%d; Path=/' % self.sessions)
+
+        def get_headers(name, default=None):
+            return set_cookies if name == 'Set-Cookie' else []
+
+        msg = mock.Mock()
+        msg.get_all.side_effect = msg.getheaders.side_effect = get_headers
+        response = requests.Response()
+        response.status_code = 200
+        response.request = request
+        response.url = request.url
+        response.raw = mock.Mock(_original_response=mock.Mock(msg=msg))
+        response._content = b'{}'
+        cookies.extract_cookies_to_jar(response.cookies, request,
+                                       response.raw)
+        return response
+
+    def close(self):
+        pass
+
+
+class HTTPClientTestCase(test.TestCase):
+
+    def setUp(self):
+        super(HTTPClientTestCase, self).setUp()
+        self.configuration = conf.Configuration(http_client.http_client_opts,
+                                                config_group='backend1')
+
+    def test_session_reused(self):
+        client = http_client.HTTPClient(self.configuration)
+
+        session = client.session
+
+        self.assertIsInstance(session, requests.Session)
+        self.assertIs(session, client.session)
+
+    def test_session_pool(self):
+        self.override_config('http_pool_maxsize', 4, group='backend1')
+        self.override_config('http_max_retries', 2, group='backend1')
+        client = http_client.HTTPClient(self.configuration)
+
+        adapter = client.session.get_adapter('https://10.0.0.1/api')
+
+        self.assertEqual(4, adapter._pool_maxsize)
+        self.assertEqual(2, adapter.max_retries.total)
+        self.assertFalse(adapter.max_retries.read)
+
+    @mock.patch.object(requests.Session, 'request')
+    def test_request(self, mock_request):
+        client = http_client.HTTPClient(self.configuration, timeout=30)
+
+        response = client.post('https://10.0.0.1/api', data='{}')
+
+        self.assertEqual(mock_request.return_value, response)
+        mock_request.assert_called_once_with(
+            'POST', 'https://10.0.0.1/api', data='{}', timeout=30,
+            verify=False)
+
+    @mock.patch.object(requests.Session, 'request')
+    def test_request_configured_timeout(self, mock_request):
+        self.override_config('http_timeout', 10, group='backend1')
+        client = http_client.HTTPClient(self.configuration, timeout=30,
+                                        verify='/etc/ssl/ca.pem')
+
+        client.get('https://10.0.0.1/api', timeout=5)
+        client.get('https://10.0.0.1/api')
+
+        mock_request.assert_has_calls([
+            mock.call('GET', 'https://10.0.0.1/api', timeout=5,
+                      verify='/etc/ssl/ca.pem'),
+            mock.call('GET', 'https://10.0.0.1/api', timeout=10,
+                      verify='/etc/ssl/ca.pem')])
+
+    @mock.patch.object(requests.Session, 'close')
+    def test_close(self, mock_close):
+        client = http_client.HTTPClient()
+        session = client.session
+
+        client.close()
+        client.close()
+
+        mock_close.assert_called_once_with()
+        self.assertIsNot(session, client.session)
+
+
+class DriverHTTPClientTestCase(test.TestCase):
+    """The options are read from the section of the driver backend."""
+
+    def setUp(self):
+        super(DriverHTTPClientTestCase, self).setUp()
+        self.configuration = conf.Configuration(driver.volume_opts,
+                                                config_group='backend2')
+
+    def _assert_backend_options(self, client):
+        self.override_config('http_timeout', 10, group='backend2')
+        self.override_config('http_pool_maxsize', 3, group='backend2')
+
+        adapter = client.session.get_adapter('https://10.0.0.1/api')
+
+        self.assertEqual(10, client.timeout)
+        self.assertEqual(3, adapter._pool_maxsize)
+
+    @mock.patch.multiple(solidfire.SolidFireDriver,
+                         _set_active_cluster_info=mock.DEFAULT,
+                         _update_cluster_status=mock.DEFAULT,
+                         _set_cluster_pairs=mock.DEFAULT)
+    def test_solidfire(self, **mocks):
+        sf_driver = solidfire.SolidFireDriver(
+            configuration=self.configuration)
+
+        self._assert_backend_options(sf_driver.http_client)
+
+    def test_tintri(self):
+        tintri_driver = tintri.TintriDriver(configuration=self.configuration)
+
+        self._assert_backend_options(tintri_driver._http_client)
+
+    def test_tintri_clients_keep_their_sessions(self):
+        tintri_driver = tintri.TintriDriver(configuration=self.configuration)
+        adapter = FakeTintriAdapter()
+        http = tintri_driver._http_client
+        http.session.mount('https://', adapter)
+
+        client1 = tintri.TClient('10.0.0.1', 'user', 'password', http=http)
+        client2 = tintri.TClient('10.0.0.1', 'user', 'password', http=http)
+        client2.logout()
+        client1.get('/v310/datastore')
+        client1.logout()
+
+        # Neither the login of a client nor its calls send the session
+        # cookie of another client.
+        self.assertEqual([('/api/v310/session/login', None),
+                          ('/api/v310/session/login', None),
+                          ('/api/v310/session/logout', 'JSESSIONID=s2'),
+                          ('/api/v310/datastore', 'JSESSIONID=s1'),
+                          ('/api/v310/session/logout', 'JSESSIONID=s1')],
+                         adapter.requests)
+
+    def _get_huawei_client(self):
+        huawei = huawei_driver.HuaweiISCSIDriver(
+            configuration=self.configuration)
+        return rest_client.RestClient(
+            huawei.configuration,
+            ['https://192.0.2.69:8088/deviceManager/rest/'],
+            'admin', 'Admin@storage', storage_pools=[], iscsi_info=[],
+            iscsi_default_target_ip=[])
+
+    def test_huawei(self):
+        client = self._get_huawei_client()
+
+        self.assertTrue(client.http_client.verify)
+        self.assertEqual(huawei_constants.SOCKET_TIMEOUT,
+                         client.http_client.timeout)
+        self._assert_backend_options(client.http_client)
+
+    @mock.patch.object(http_client.HTTPClient, 'request')
+    def test_huawei_do_call_timeout(self, mock_request):
+        self.override_config('driver_ssl_cert_path', '/etc/ssl/ca.pem',
+                             group='backend2')
+        client = self._get_huawei_client()
+        self.override_config('http_timeout', 10, group='backend2')
+        mock_request.return_value.text = '{"error": {"code": 0}}'
+
+        client.do_call('https://192.0.2.69:8088/deviceManager/rest/lun')
+        client.do_call('https://192.0.2.69:8088/deviceManager/rest/lun',
+                       calltimeout=4)
+
+        self.assertEqual('/etc/ssl/ca.pem', client.http_client.verify)
+        self.assertEqual([10, 4], [c[1]['timeout']
+                                   for c in mock_request.call_args_list])
@@ -13,12 +13,14 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-"""Tests for volume copy throttling helpers."""
+"""Tests for volume copy and operation throttling helpers."""
 
+import eventlet
 import mock
 
 from cinder import test
 from cinder import utils
+from cinder.volume import manager
 from cinder.volume import throttling
 
 
@@ -72,3 +74,64 @@ class ThrottleTestCase(test.TestCase):
                 with throttle.subcommand('src_volume2', 'dst_volume2') as cmd:
                     self.assertEqual(['cgexec', '-g', 'blkio:fake_group'],
                                      cmd['prefix'])
+
+
+class OperationLimiterTestCase(test.TestCase):
+
+    def test_unlimited_operation(self):
+        limiter = throttling.OperationLimiter({'delete': 0})
+        with limiter.limit('delete'):
+            with limiter.limit('delete'):
+                pass
+        self.assertEqual({}, limiter.get_stats())
+
+    def test_limit(self):
+        limiter = throttling.OperationLimiter({'image': 1})
+        started = []
+
+        def run(name):
+            with limiter.limit('image'):
+                started.append(name)
+                eventlet.sleep(0)
+
+        with limiter.limit('image'):
+            thread = eventlet.spawn(run, 'second')
+            eventlet.sleep(0)
+            self.assertEqual([], started)
+            self.assertEqual({'limit': 1, 'running': 1, 'waiting': 1,
+                              'last_wait_time': 0.0},
+                             limiter.get_stats()['image'])
+        thread.wait()
+
+        self.assertEqual(['second'], started)
+        stats = limiter.get_stats()['image']
+        self.assertEqual(0, stats['running'])
+        self.assertEqual(0, stats['waiting'])
+
+    def test_spawn_unlimited_runs_in_caller(self):
+        limiter = throttling.OperationLimiter({'delete': 0})
+        self.assertEqual('vol1', limiter.spawn('delete', lambda v: v,
+                                               'vol1'))
+
+    def test_limited_operation_does_not_wait_in_caller(self):
+        inst = mock.Mock(
+            operation_limiter=throttling.OperationLimiter({'delete': 1}))
+        deleted = []
+
+        @manager.limited_operation('delete')
+        def delete_volume(inst, volume_id):
+            deleted.append(volume_id)
+            raise Exception()
+
+        with inst.operation_limiter.limit('delete'):
+            # The caller, an RPC executor thread, returns at once.
+            self.assertIsNone(delete_volume(inst, 'vol2'))
+            eventlet.sleep(0)
+            self.assertEqual([], deleted)
+            self.assertEqual(1, inst.operation_limiter.get_stats()[
+                'delete']['waiting'])
+        inst.operation_limiter._pool.waitall()
+
+        self.assertEqual(['vol2'], deleted)
+        self.assertEqual(0, inst.operation_limiter.get_stats()[
+            'delete']['running'])
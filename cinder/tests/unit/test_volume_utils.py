@@ -463,6 +463,71 @@ class ClearVolumeTestCase(test.TestCase):
                           volume_utils.clear_volume,
                           1024, "volume_path")
 
+    @mock.patch('cinder.utils.execute')
+    @mock.patch('cinder.volume.utils._read_block_device_queue_attr')
+    @mock.patch('cinder.volume.utils.CONF')
+    def test_clear_volume_discard(self, mock_conf, mock_read_attr,
+                                  mock_exec):
+        mock_conf.volume_clear = 'discard'
+        mock_conf.volume_clear_size = 0
+        mock_conf.volume_clear_ionice = None
+        mock_read_attr.side_effect = lambda path, attr: {
+            'discard_max_bytes': 2147450880,
+            'discard_zeroes_data': 1}.get(attr, 0)
+        output = volume_utils.clear_volume(1024, 'volume_path')
+        self.assertIsNone(output)
+        mock_exec.assert_called_once_with(
+            'blkdiscard', '-l', '1073741824', 'volume_path',
+            run_as_root=True)
+
+    @mock.patch('cinder.utils.execute')
+    @mock.patch('cinder.volume.utils._read_block_device_queue_attr')
+    @mock.patch('cinder.volume.utils.CONF')
+    def test_clear_volume_discard_zeroout(self, mock_conf, mock_read_attr,
+                                          mock_exec):
+        mock_conf.volume_clear = 'discard'
+        mock_conf.volume_clear_size = 1
+        mock_conf.volume_clear_ionice = None
+        mock_read_attr.side_effect = lambda path, attr: {
+            'discard_max_bytes': 2147450880,
+            'discard_zeroes_data': 0,
+            'write_zeroes_max_bytes': 33553920}.get(attr, 0)
+        output = volume_utils.clear_volume(1024, 'volume_path')
+        self.assertIsNone(output)
+        mock_exec.assert_called_once_with(
+            'blkdiscard', '-z', '-l', '1048576', 'volume_path',
+            run_as_root=True)
+
+    @mock.patch('cinder.volume.utils.copy_volume', return_value=None)
+    @mock.patch('cinder.volume.utils._read_block_device_queue_attr',
+                return_value=0)
+    @mock.patch('cinder.volume.utils.CONF')
+    def test_clear_volume_discard_unsupported(self, mock_conf,
+                                              mock_read_attr, mock_copy):
+        mock_conf.volume_clear = 'discard'
+        mock_conf.volume_clear_size = 0
+        mock_conf.volume_dd_blocksize = '1M'
+        mock_conf.volume_clear_ionice = None
+        output = volume_utils.clear_volume(1024, 'volume_path')
+        self.assertIsNone(output)
+        mock_copy.assert_called_once_with('/dev/zero', 'volume_path', 1024,
+                                          '1M', sync=True,
+                                          execute=utils.execute, ionice=None,
+                                          throttle=None, sparse=False)
+
+    @mock.patch('os.path.realpath', return_value='/dev/dm-3')
+    def test_read_block_device_queue_attr(self, mock_realpath):
+        with mock.patch('six.moves.builtins.open',
+                        mock.mock_open(read_data='1\n')) as mock_file:
+            self.assertEqual(1, volume_utils._read_block_device_queue_attr(
+                '/dev/mapper/vg-lv', 'discard_zeroes_data'))
+        mock_file.assert_called_once_with(
+            '/sys/block/dm-3/queue/discard_zeroes_data')
+
+        with mock.patch('six.moves.builtins.open', side_effect=IOError):
+            self.assertEqual(0, volume_utils._read_block_device_queue_attr(
+                '/dev/mapper/vg-lv', 'write_zeroes_max_bytes'))
+
 
 class CopyVolumeTestCase(test.TestCase):
     @mock.patch('cinder.volume.utils._calculate_count',
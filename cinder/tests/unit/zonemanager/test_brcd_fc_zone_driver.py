@@ -17,6 +17,8 @@
 
 """Unit tests for Brocade fc zone driver."""
 
+import copy
+
 import mock
 from oslo_config import cfg
 from oslo_utils import importutils
@@ -27,6 +29,8 @@ from cinder import exception
 from cinder import test
 from cinder.volume import configuration as conf
 from cinder.zonemanager.drivers.brocade import brcd_fc_zone_driver as driver
+from cinder.zonemanager import fc_zone_manager
+from cinder.zonemanager import utils as zm_utils
 
 _active_cfg_before_add = {}
 _active_cfg_before_delete = {
@@ -140,6 +144,24 @@ class TestBrcdFcZoneDriver(BrcdFcZoneDriverBaseTest, test.TestCase):
         self.driver.add_connection('BRCD_FAB_1', _initiator_target_map)
         self.assertTrue(_zone_name in GlobalVars._zone_state)
 
+    @mock.patch.object(driver.BrcdFCZoneDriver, '_get_southbound_client')
+    def test_add_connection_cleans_up_connection(self,
+                                                 get_southbound_client_mock):
+        GlobalVars._is_normal_test = True
+        GlobalVars._active_cfg = {'zones': {'t_zone': ['1,0']},
+                                  'active_zone_config': 'cfg1'}
+        client = mock.Mock(wraps=self.get_client("HTTPS"))
+        get_southbound_client_mock.return_value = client
+
+        self.driver.add_connection('BRCD_FAB_1', _initiator_target_map)
+        self.driver.add_connection('BRCD_FAB_1', _initiator_target_map)
+
+        self.assertTrue(_zone_name in GlobalVars._zone_state)
+        self.assertEqual(2, get_southbound_client_mock.call_count)
+        self.assertEqual(2, client.get_active_zone_set.call_count)
+        self.assertEqual(1, client.add_zones.call_count)
+        self.assertEqual(2, client.cleanup.call_count)
+
     @mock.patch.object(driver.BrcdFCZoneDriver, '_get_southbound_client')
     def test_delete_connection(self, get_southbound_client_mock):
         GlobalVars._is_normal_test = True
@@ -191,6 +213,53 @@ class TestBrcdFcZoneDriver(BrcdFcZoneDriverBaseTest, test.TestCase):
                           _initiator_target_map)
 
 
+class TestBrcdFcZoneDriverThroughZoneManager(test.TestCase):
+
+    def setUp(self):
+        super(TestBrcdFcZoneDriverThroughZoneManager, self).setUp()
+        self.override_config('zoning_mode', 'fabric')
+        self.override_config('zone_driver',
+                             'cinder.zonemanager.drivers.brocade.'
+                             'brcd_fc_zone_driver.BrcdFCZoneDriver',
+                             'fc-zone-manager')
+        self.override_config('fc_fabric_names', 'BRCD_FAB_1',
+                             'fc-zone-manager')
+        self.mock_object(fc_zone_manager.ZoneManager, '_instance',
+                         object.__new__(fc_zone_manager.ZoneManager),
+                         create=True)
+
+        zone_set = {'zones': {'t_zone': ['1,0']},
+                    'active_zone_config': 'cfg1'}
+        self.client = mock.Mock()
+        self.client.get_nameserver_info.return_value = [
+            '20:24:00:02:ac:00:0a:50']
+        self.client.get_active_zone_set.side_effect = (
+            lambda: copy.deepcopy(zone_set))
+        self.client.add_zones.side_effect = (
+            lambda zones, activate, active_zone_set:
+            zone_set['zones'].update(zones))
+        self.connect = self.mock_object(driver.BrcdFCZoneDriver,
+                                        '_get_southbound_client',
+                                        return_value=self.client)
+
+    def test_add_fc_zone_reuses_driver(self):
+        @zm_utils.AddFCZone
+        def initialize_connection(self):
+            return {'driver_volume_type': 'fibre_channel',
+                    'data': {'initiator_target_map': _initiator_target_map}}
+
+        initialize_connection(None)
+        zone_driver = fc_zone_manager.ZoneManager._instance.driver
+        initialize_connection(None)
+
+        self.assertIsInstance(zone_driver, driver.BrcdFCZoneDriver)
+        self.assertIs(zone_driver,
+                      fc_zone_manager.ZoneManager._instance.driver)
+        self.assertEqual(1, self.client.add_zones.call_count)
+        self.assertEqual(4, self.connect.call_count)
+        self.assertEqual(4, self.client.cleanup.call_count)
+
+
 class FakeClient(object):
     def get_active_zone_set(self):
         return GlobalVars._active_cfg
@@ -157,10 +157,12 @@ class FakeCiscoFCZoneClientCLI(object):
     def get_active_zone_set(self):
         return GlobalVars._active_cfg
 
-    def add_zones(self, zones, isActivate):
+    def add_zones(self, zones, isActivate, fabric_vsan, active_zone_set,
+                  zone_status):
         GlobalVars._zone_state.extend(zones.keys())
 
-    def delete_zones(self, zone_names, isActivate):
+    def delete_zones(self, zone_names, isActivate, fabric_vsan,
+                     active_zone_set, zone_status):
         zone_list = zone_names.split(';')
         GlobalVars._zone_state = [
             x for x in GlobalVars._zone_state if x not in zone_list]
@@ -57,6 +57,10 @@ class TestFCZoneManager(test.TestCase):
 
         self.stubs.Set(fc_zone_manager.ZoneManager, '_build_driver',
                        fake_build_driver)
+        # Start every test with a new zone manager singleton.
+        self.mock_object(fc_zone_manager.ZoneManager, '_instance',
+                         object.__new__(fc_zone_manager.ZoneManager),
+                         create=True)
 
         self.zm = fc_zone_manager.ZoneManager(configuration=config)
         self.configuration = conf.Configuration(None)
@@ -66,6 +70,13 @@ class TestFCZoneManager(test.TestCase):
     def __init__(self, *args, **kwargs):
         super(TestFCZoneManager, self).__init__(*args, **kwargs)
 
+    @mock.patch('oslo_config.cfg._is_opt_registered', return_value=False)
+    def test_driver_built_once(self, opt_mock):
+        driver = self.zm.driver
+        zm = fc_zone_manager.ZoneManager(configuration=self.configuration)
+        self.assertIs(self.zm, zm)
+        self.assertIs(driver, zm.driver)
+
     @mock.patch('oslo_config.cfg._is_opt_registered', return_value=False)
     def test_add_connection(self, opt_mock):
         with mock.patch.object(self.zm.driver, 'add_connection')\
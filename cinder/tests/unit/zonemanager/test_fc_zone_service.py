@@ -0,0 +1,180 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+#
+
+
+"""Unit tests for the fabric zoning service."""
+
+import mock
+
+from cinder import exception
+from cinder import test
+from cinder.zonemanager import fc_zone_service
+
+_zone1 = 'openstack10008c7cff523b0120240002ac000a50'
+_zone2 = 'openstack10008c7cff523b0220240002ac000a50'
+_members1 = ['10:00:8c:7c:ff:52:3b:01', '20:24:00:02:ac:00:0a:50']
+_members2 = ['10:00:8c:7c:ff:52:3b:02', '20:24:00:02:ac:00:0a:50']
+
+
+def _add(zone_name, members):
+    return lambda zone_set: ({zone_name: members}, [])
+
+
+def _delete(zone_name):
+    return lambda zone_set: ({}, [zone_name])
+
+
+class TestFabricZoneService(test.TestCase):
+
+    def setUp(self):
+        super(TestFabricZoneService, self).setUp()
+        self.client = mock.Mock()
+        self.connect = mock.Mock(return_value=self.client)
+        self.zone_set = {'zones': {}, 'active_zone_config': 'cfg1'}
+        self.get_zone_set = mock.Mock(
+            side_effect=lambda client: dict(self.zone_set))
+        self.apply_changes = mock.Mock()
+        self.service = fc_zone_service.FabricZoneService(
+            'fab1', self.connect, self.get_zone_set, self.apply_changes,
+            'test', cache_ttl=30)
+
+    def test_submit(self):
+        self.service.submit(_add(_zone1, _members1))
+
+        self.connect.assert_called_once_with()
+        self.apply_changes.assert_called_once_with(
+            self.client, self.zone_set, {_zone1: _members1}, [])
+        self.client.cleanup.assert_called_once_with()
+        self.assertIsNone(self.service._client)
+        self.assertEqual(2, self.service.version)
+
+    def test_submit_coalesces_queued_requests(self):
+        queued = fc_zone_service._ZoneRequest(_add(_zone2, _members2))
+        self.service._pending.append(queued)
+
+        self.service.submit(_add(_zone1, _members1))
+
+        self.apply_changes.assert_called_once_with(
+            self.client, self.zone_set,
+            {_zone1: _members1, _zone2: _members2}, [])
+        self.assertTrue(queued.done)
+        self.assertIsNone(queued.error)
+        self.assertEqual([], self.service._pending)
+
+    def test_submit_composes_requests(self):
+        self.zone_set['zones'] = {_zone1: _members1}
+        queued = fc_zone_service._ZoneRequest(_add(_zone2, _members2))
+        self.service._pending.append(queued)
+
+        self.service.submit(_delete(_zone2))
+
+        self.assertFalse(self.apply_changes.called)
+        self.assertTrue(queued.done)
+
+    def test_submit_unchanged_uses_cache(self):
+        self.service.submit(_add(_zone1, _members1))
+        self.service.submit(_add(_zone1, [m.replace(':', '')
+                                          for m in _members1]))
+
+        self.get_zone_set.assert_called_once_with(self.client)
+        self.assertEqual(1, self.apply_changes.call_count)
+
+    def test_submit_unchanged_without_cache(self):
+        service = fc_zone_service.FabricZoneService(
+            'fab1', self.connect, self.get_zone_set, self.apply_changes,
+            'test')
+        service.submit(_add(_zone1, _members1))
+        self.zone_set['zones'] = {}
+        service.submit(_add(_zone1, _members1))
+
+        self.assertEqual(2, self.get_zone_set.call_count)
+        self.assertEqual(2, self.apply_changes.call_count)
+
+    def test_submit_refreshes_zone_set_before_changes(self):
+        self.service.submit(_add(_zone1, _members1))
+        self.zone_set['zones'] = {_zone1: _members1}
+        self.service.submit(_delete(_zone1))
+
+        self.assertEqual(2, self.connect.call_count)
+        self.assertEqual(2, self.get_zone_set.call_count)
+        self.apply_changes.assert_called_with(
+            self.client, self.zone_set, {}, [_zone1])
+        # The last zone is gone, the new active config is not known.
+        self.assertIsNone(self.service._zone_set)
+
+    def test_submit_cleans_up_connection(self):
+        self.client.cleanup.side_effect = Exception('logout failed')
+
+        self.service.submit(_add(_zone1, _members1))
+        self.service.submit(_add(_zone2, _members2))
+
+        self.assertEqual(2, self.connect.call_count)
+        self.assertEqual(2, self.client.cleanup.call_count)
+        self.assertEqual(2, self.apply_changes.call_count)
+        self.assertIsNone(self.service._client)
+
+    def test_submit_failure(self):
+        self.apply_changes.side_effect = (
+            exception.FCZoneDriverException('failed'))
+        queued = fc_zone_service._ZoneRequest(_add(_zone2, _members2))
+        self.service._pending.append(queued)
+
+        self.assertRaises(exception.FCZoneDriverException,
+                          self.service.submit, _add(_zone1, _members1))
+        self.assertIsInstance(queued.error, exception.FCZoneDriverException)
+        self.apply_changes.assert_called_once_with(
+            self.client, self.zone_set,
+            {_zone1: _members1, _zone2: _members2}, [])
+        self.client.cleanup.assert_called_once_with()
+        self.assertIsNone(self.service._client)
+        self.assertIsNone(self.service._zone_set)
+
+    def test_submit_build_failure(self):
+        def _build_changes(zone_set):
+            raise exception.FCZoneDriverException('invalid policy')
+
+        queued = fc_zone_service._ZoneRequest(_build_changes)
+        self.service._pending.append(queued)
+
+        self.service.submit(_add(_zone1, _members1))
+
+        self.apply_changes.assert_called_once_with(
+            self.client, self.zone_set, {_zone1: _members1}, [])
+        self.assertIsInstance(queued.error, exception.FCZoneDriverException)
+
+    def test_submit_not_applied(self):
+        self.apply_changes.return_value = False
+
+        self.service.submit(_add(_zone1, _members1))
+
+        self.assertIsNone(self.service._zone_set)
+
+    def test_execute(self):
+        func = mock.Mock(return_value=['20:24:00:02:ac:00:0a:50'])
+
+        self.assertEqual(func.return_value, self.service.execute(func))
+        self.assertEqual(func.return_value, self.service.execute(func))
+
+        self.assertEqual(2, self.connect.call_count)
+        self.assertEqual(2, self.client.cleanup.call_count)
+        func.assert_called_with(self.client)
+
+    def test_execute_failure(self):
+        self.service.submit(_add(_zone1, _members1))
+        func = mock.Mock(side_effect=exception.FCZoneDriverException('fail'))
+
+        self.assertRaises(exception.FCZoneDriverException,
+                          self.service.execute, func)
+        self.assertEqual(2, self.client.cleanup.call_count)
+        self.assertIsNone(self.service._client)
+        self.assertIsNone(self.service._zone_set)
@@ -34,7 +34,10 @@ class TestVolumeDriver(test.TestCase):
     def setUp(self):
         super(TestVolumeDriver, self).setUp()
         self.driver = fake_driver.FakeFibreChannelDriver()
-        brcd_fc_zone_driver.BrcdFCZoneDriver = mock.Mock()
+        self.mock_object(brcd_fc_zone_driver, 'BrcdFCZoneDriver')
+        self.mock_object(fc_zone_manager.ZoneManager, '_instance',
+                         object.__new__(fc_zone_manager.ZoneManager),
+                         create=True)
         self.addCleanup(self._cleanup)
 
     def _cleanup(self):
@@ -473,11 +473,7 @@ class API(base.Base):
         LOG.info(_LI("Volume info retrieved successfully."), resource=volume)
         return volume
 
-    def get_all(self, context, marker=None, limit=None, sort_keys=None,
-                sort_dirs=None, filters=None, viewable_admin_meta=False,
-                offset=None):
-        check_policy(context, 'get_all')
-
+    def _get_all_params(self, context, limit, filters):
         if filters is None:
             filters = {}
 
@@ -503,6 +499,16 @@ class API(base.Base):
         if filters:
             LOG.debug("Searching by: %s.", six.text_type(filters))
 
+        return limit, filters, allTenants
+
+    def get_all(self, context, marker=None, limit=None, sort_keys=None,
+                sort_dirs=None, filters=None, viewable_admin_meta=False,
+                offset=None):
+        check_policy(context, 'get_all')
+
+        limit, filters, allTenants = self._get_all_params(context, limit,
+                                                          filters)
+
         if context.is_admin and allTenants:
             # Need to remove all_tenants to pass the filtering below.
             del filters['all_tenants']
@@ -522,6 +528,47 @@ class API(base.Base):
         LOG.info(_LI("Get all volumes completed successfully."))
         return volumes
 
+    def get_generation(self, context, filters=None):
+        """Get the change token of the volumes get_all lists."""
+        check_policy(context, 'get_all')
+
+        filters = filters or {}
+        if context.is_admin and utils.get_bool_param('all_tenants', filters):
+            project_id = None
+        else:
+            project_id = context.project_id
+        return self.db.volume_get_generation(context, project_id)
+
+    def get_all_summary(self, context, marker=None, limit=None,
+                        sort_keys=None, sort_dirs=None, filters=None,
+                        offset=None):
+        """Get the id and name of the volumes get_all would return.
+
+        The volumes are plain dictionaries read straight from the database,
+        meant for listings that need nothing else.
+        """
+        check_policy(context, 'get_all')
+
+        limit, filters, allTenants = self._get_all_params(context, limit,
+                                                          filters)
+
+        if context.is_admin and allTenants:
+            # Need to remove all_tenants to pass the filtering below.
+            del filters['all_tenants']
+            project_id = None
+        else:
+            project_id = context.project_id
+            context = context.elevated()
+        volumes = self.db.volume_get_all_summary(context, marker, limit,
+                                                 sort_keys=sort_keys,
+                                                 sort_dirs=sort_dirs,
+                                                 filters=filters,
+                                                 offset=offset,
+                                                 project_id=project_id)
+
+        LOG.info(_LI("Get all volumes completed successfully."))
+        return volumes
+
     def get_snapshot(self, context, snapshot_id):
         check_policy(context, 'get_snapshot')
         snapshot = objects.Snapshot.get_by_id(context, snapshot_id)
@@ -539,6 +586,17 @@ class API(base.Base):
         LOG.info(_LI("Volume retrieved successfully."), resource=volume)
         return volume
 
+    def get_snapshots_generation(self, context, search_opts=None):
+        """Get the change token of the snapshots get_all_snapshots lists."""
+        check_policy(context, 'get_all_snapshots')
+
+        search_opts = search_opts or {}
+        if context.is_admin and 'all_tenants' in search_opts:
+            project_id = None
+        else:
+            project_id = context.project_id
+        return self.db.snapshot_get_generation(context, project_id)
+
     def get_all_snapshots(self, context, search_opts=None, marker=None,
                           limit=None, sort_keys=None, sort_dirs=None,
                           offset=None):
@@ -77,8 +77,11 @@ volume_opts = [
                      'running. Otherwise, it will fallback to single path.'),
     cfg.StrOpt('volume_clear',
                default='zero',
-               choices=['none', 'zero', 'shred'],
-               help='Method used to wipe old volumes'),
+               choices=['none', 'zero', 'shred', 'discard'],
+               help='Method used to wipe old volumes. discard uses '
+                    'blkdiscard when the device guarantees that discarded '
+                    'or offloaded zeroed blocks read back as zeroes, and '
+                    'falls back to zero otherwise.'),
     cfg.IntOpt('volume_clear_size',
                default=0,
                help='Size in MiB to wipe at start of old volumes. 0 => all'),
@@ -278,6 +281,57 @@ CONF.register_opts(volume_opts)
 CONF.register_opts(iser_opts)
 
 
+class PoolStatsCache(object):
+    """Keeps the expensive parts of per-pool volume stats between updates.
+
+    Drivers building their pool list on every stats refresh collect the
+    stats needing extra array calls through get(). They are collected
+    again when the change indicator of the pool differs from the one they
+    were collected with, or when they are older than their TTL. Change
+    indicators are cheap values the driver reads anyway, like the usage
+    counters of the pool, that change whenever the cached stats may have
+    changed.
+
+    Cached stats are shared with the caller and must not be modified.
+    """
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl
+        self._entries = {}
+
+    def get(self, pool, collector, indicator=None, ttl=None):
+        """Return the stats of a pool, calling collector when stale.
+
+        :param pool: pool name, or any key of the cached stats
+        :param collector: callable returning the stats
+        :param indicator: value changing whenever the stats may change
+        :param ttl: seconds the stats are reused, defaults to the TTL of the
+                    cache. When neither is set the stats are reused until
+                    the indicator changes.
+        """
+        if ttl is None:
+            ttl = self.ttl
+        now = time.time()
+        entry = self._entries.get(pool)
+        if (entry is not None and entry['indicator'] == indicator and
+                (ttl is None or now - entry['updated_at'] < ttl)):
+            return entry['stats']
+
+        LOG.debug("Collecting stats of pool %s.", pool)
+        stats = collector()
+        self._entries[pool] = {'stats': stats,
+                               'indicator': indicator,
+                               'updated_at': now}
+        return stats
+
+    def invalidate(self, pool=None):
+        """Collect the stats of a pool, or of all pools, on the next get."""
+        if pool is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(pool, None)
+
+
 @six.add_metaclass(abc.ABCMeta)
 class BaseVD(object):
     """Executes commands relating to Volumes.
@@ -1459,6 +1513,25 @@ class BaseVD(object):
         """Synchronously recreates an export for a volume."""
         return
 
+    def ensure_exports(self, context, volumes):
+        """Synchronously recreates the exports for a list of volumes.
+
+        Drivers that can recreate several exports at once more cheaply than
+        one at a time should override this.
+
+        :returns: Dictionary of the ids of the volumes whose export could not
+                  be recreated to the exception raised
+        """
+        failed = {}
+        for volume in volumes:
+            try:
+                self.ensure_export(context, volume)
+            except Exception as e:
+                LOG.exception(_LE("Failed to re-export volume %s."),
+                              volume['id'])
+                failed[volume['id']] = e
+        return failed
+
     @abc.abstractmethod
     def create_export(self, context, volume, connector):
         """Exports the volume.
@@ -18,6 +18,7 @@ import os.path
 
 from oslo_config import cfg
 from oslo_log import log as logging
+from oslo_utils import excutils
 from oslo_utils import units
 import six
 
@@ -117,6 +118,8 @@ class EMCVMAXCommon(object):
         self.url = None
         self.user = None
         self.passwd = None
+        self.ecomUseSSL = None
+        self.ecom_connections = {}
         self.masking = emc_vmax_masking.EMCVMAXMasking(prtcl)
         self.utils = emc_vmax_utils.EMCVMAXUtils(prtcl)
         self.fast = emc_vmax_fast.EMCVMAXFast(prtcl)
@@ -623,6 +626,13 @@ class EMCVMAXCommon(object):
 
     def update_volume_stats(self):
         """Retrieve stats info."""
+        try:
+            return self._update_volume_stats()
+        except Exception:
+            with excutils.save_and_reraise_exception():
+                self._reset_ecom_connection()
+
+    def _update_volume_stats(self):
         pools = []
         backendName = self.pool_info['backend_name']
         for arrayInfo in self.pool_info['arrays_info']:
@@ -1282,6 +1292,39 @@ class EMCVMAXCommon(object):
     def _get_ecom_connection(self):
         """Get the ecom connection.
 
+        One connection is kept per ecom server and reused by all operations
+        on its arrays until it is reset.
+
+        :returns: pywbem.WBEMConnection -- conn, the ecom connection
+        :raises: VolumeBackendAPIException
+        """
+        key = self._get_ecom_connection_key()
+        conn = self.ecom_connections.get(key)
+        if conn is None:
+            conn = self._create_ecom_connection()
+            self.ecom_connections[key] = conn
+        return conn
+
+    def _get_ecom_connection_key(self):
+        # Connections keep the credentials they were created with
+        return self.url, self.user, self.passwd, self.ecomUseSSL
+
+    def _reset_ecom_connection(self):
+        """Drop the current ecom connection and the paths cached on it.
+
+        The next call to _get_ecom_connection connects again.
+        """
+        conn = self.ecom_connections.pop(self._get_ecom_connection_key(),
+                                         None)
+        if conn is not None:
+            LOG.debug("Resetting connection to ecom server %(url)s.",
+                      {'url': self.url})
+            self.utils.clear_cim_cache(conn)
+        self.conn = None
+
+    def _create_ecom_connection(self):
+        """Create a new ecom connection.
+
         :returns: pywbem.WBEMConnection -- conn, the ecom connection
         :raises: VolumeBackendAPIException
         """
@@ -1741,6 +1784,7 @@ class EMCVMAXCommon(object):
                 # V2 extra specs
                 extraSpecs = self._set_v2_extra_specs(extraSpecs, poolRecord)
         except Exception:
+            self._reset_ecom_connection()
             import sys
             exceptionMessage = (_(
                 "Unable to get configuration information necessary to "
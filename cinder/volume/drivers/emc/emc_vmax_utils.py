@@ -17,6 +17,7 @@ import datetime
 import hashlib
 import random
 import re
+import weakref
 from xml.dom import minidom
 
 from oslo_log import log as logging
@@ -57,6 +58,29 @@ CIM_ERR_NOT_FOUND = 6
 VOLUME_ELEMENT_NAME_PREFIX = 'OS-'
 SYNCHRONIZED = 4
 
+# Instance names of the array services, keyed by ecom connection. They do not
+# change while the ecom server is up, a new connection starts a new cache.
+_cim_cache = weakref.WeakKeyDictionary()
+
+
+def cim_cached(func):
+    """Cache the result of a lookup of an immutable CIM path.
+
+    The decorated method takes the ecom connection followed by the string
+    arguments identifying the path.
+    """
+    @six.wraps(func)
+    def func_cached(self, conn, *args):
+        try:
+            cache = _cim_cache.setdefault(conn, {})
+        except TypeError:
+            return func(self, conn, *args)
+        key = (func.__name__,) + args
+        if key not in cache:
+            cache[key] = func(self, conn, *args)
+        return cache[key]
+    return func_cached
+
 
 class EMCVMAXUtils(object):
     """Utility class for SMI-S based EMC volume drivers.
@@ -75,6 +99,14 @@ class EMCVMAXUtils(object):
                 "Install PyWBEM using the python-pywbem package."))
         self.protocol = prtcl
 
+    def clear_cim_cache(self, conn):
+        """Forget the CIM paths looked up through a connection.
+
+        :param conn: the connection to the ecom server
+        """
+        _cim_cache.pop(conn, None)
+
+    @cim_cached
     def find_storage_configuration_service(self, conn, storageSystemName):
         """Get storage configuration service with given storage system name.
 
@@ -103,6 +135,7 @@ class EMCVMAXUtils(object):
 
         return foundConfigService
 
+    @cim_cached
     def find_controller_configuration_service(self, conn, storageSystemName):
         """Get the controller config by using the storage service name.
 
@@ -134,6 +167,7 @@ class EMCVMAXUtils(object):
 
         return foundConfigService
 
+    @cim_cached
     def find_element_composition_service(self, conn, storageSystemName):
         """Given the storage system name, get the element composition service.
 
@@ -163,6 +197,7 @@ class EMCVMAXUtils(object):
 
         return foundElementCompositionService
 
+    @cim_cached
     def find_storage_relocation_service(self, conn, storageSystemName):
         """Given the storage system name, get the storage relocation service.
 
@@ -192,6 +227,7 @@ class EMCVMAXUtils(object):
 
         return foundStorageRelocationService
 
+    @cim_cached
     def find_storage_hardwareid_service(self, conn, storageSystemName):
         """Given the storage system name, get the storage hardware service.
 
@@ -220,6 +256,7 @@ class EMCVMAXUtils(object):
 
         return foundHardwareService
 
+    @cim_cached
     def find_replication_service(self, conn, storageSystemName):
         """Given the storage system name, get the replication service.
 
@@ -1457,6 +1494,7 @@ class EMCVMAXUtils(object):
             pass
         return poolnameStr
 
+    @cim_cached
     def find_storageSystem(self, conn, arrayStr):
         """Find an array instance name by the array name.
 
@@ -1665,6 +1703,7 @@ class EMCVMAXUtils(object):
                 data=exceptionMessage)
         return instance
 
+    @cim_cached
     def find_replication_service_capabilities(self, conn, storageSystemName):
         """Find the replication service capabilities instance name.
 
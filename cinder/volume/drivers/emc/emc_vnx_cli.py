@@ -20,6 +20,7 @@ import math
 import os
 import random
 import re
+import threading
 import time
 import types
 
@@ -122,7 +123,22 @@ loc_opts = [
     cfg.BoolOpt('ignore_pool_full_threshold',
                 default=False,
                 help='Force LUN creation even if '
-                'the full threshold of pool is reached.')
+                'the full threshold of pool is reached.'),
+    cfg.IntOpt('naviseccli_max_processes',
+               default=8,
+               min=0,
+               help='Maximum number of naviseccli processes a volume '
+               'service runs at the same time against one VNX system. '
+               'The limit is shared by the back ends using the same '
+               'system. Set to 0 for no limit.'),
+    cfg.IntOpt('naviseccli_query_cache_ttl',
+               default=0,
+               min=0,
+               help='Number of seconds the output of non-polling storage '
+               'pool, port, enabler and array serial queries is reused. '
+               'The output is shared by the back ends of a volume service '
+               'using the same VNX system, so they run the queries once '
+               'per stats period. Set to 0 to run every query.')
 ]
 
 CONF.register_opts(loc_opts)
@@ -684,6 +700,108 @@ class VNXPoolFeatureProperties(VNXCliParser):
     default = [MAX_POOL_LUNS, TOTAL_POOL_LUNS]
 
 
+# Queries returning the same output to every back end of an array.
+CACHEABLE_QUERIES = (('storagepool', '-list'),
+                     ('storagepool', '-feature', '-info'),
+                     ('connection', '-getport'),
+                     ('port', '-list'),
+                     ('ndu', '-list'),
+                     ('getagent', '-serial'))
+
+QUERY_OPTIONS = ('-list', '-info', '-getport', '-serial')
+
+
+class _PendingQuery(object):
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+class ArrayCLIState(object):
+    """naviseccli state shared by the back ends using one VNX system.
+
+    Limits the number of naviseccli processes run against the system and
+    keeps the output of the queries in CACHEABLE_QUERIES. A query issued
+    while the same query is running waits for its output.
+    """
+
+    _states = {}
+    _states_lock = threading.Lock()
+
+    def __init__(self, max_processes=0, query_ttl=0):
+        self.semaphore = (threading.Semaphore(max_processes)
+                          if max_processes else None)
+        self.query_ttl = query_ttl
+        self._queries = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get(cls, addresses, max_processes=0, query_ttl=0):
+        """Return the state of the system managed through addresses.
+
+        The settings of the first back end of a system are used.
+        """
+        key = tuple(sorted(ip for ip in addresses if ip))
+        with cls._states_lock:
+            state = cls._states.get(key)
+            if state is None:
+                state = cls._states[key] = cls(max_processes, query_ttl)
+            return state
+
+    def execute(self, func, *args, **kwargs):
+        if self.semaphore is None:
+            return func(*args, **kwargs)
+        with self.semaphore:
+            return func(*args, **kwargs)
+
+    @staticmethod
+    def is_cacheable(command):
+        return any(command[:len(query)] == query
+                   for query in CACHEABLE_QUERIES)
+
+    def query(self, command, poll, func):
+        """Run a query, reusing the output of a recent non-polling run.
+
+        Polling queries always run and refresh the kept output. Failed
+        queries are not kept.
+        """
+        if not self.query_ttl:
+            return func()
+        key = command
+        with self._lock:
+            cached = self._queries.get(key)
+            if not poll and cached and cached[0] > time.time():
+                return cached[1]
+            pending = None if poll else self._pending.get(key)
+            if pending is None:
+                owner = _PendingQuery()
+                if not poll:
+                    self._pending[key] = owner
+        if pending is not None:
+            pending.done.wait()
+            if pending.result is not None:
+                return pending.result
+            return func()
+        try:
+            owner.result = func()
+            if owner.result[1] == 0:
+                with self._lock:
+                    self._queries[key] = (time.time() + self.query_ttl,
+                                          owner.result)
+            return owner.result
+        finally:
+            with self._lock:
+                if self._pending.get(key) is owner:
+                    del self._pending[key]
+            owner.done.set()
+
+    def invalidate(self):
+        """Drop the kept output after a change to the system."""
+        with self._lock:
+            self._queries.clear()
+
+
 @decorate_all_methods(log_enter_exit)
 class CommandLineHelper(object):
     # extra spec constants
@@ -754,6 +872,11 @@ class CommandLineHelper(object):
                          "home directory will be used for authentication "
                          "if present."))
 
+        self.array_state = ArrayCLIState.get(
+            (self.primary_storage_ip, self.secondary_storage_ip),
+            max_processes=configuration.naviseccli_max_processes,
+            query_ttl=configuration.naviseccli_query_cache_ttl)
+
         self.iscsi_initiator_map = None
         if configuration.iscsi_initiators:
             self.iscsi_initiator_map = \
@@ -2044,7 +2167,17 @@ class CommandLineHelper(object):
         retry_disable = kwargs.pop('retry_disable', False)
         # get active ip before execute command
         current_ip = self.active_storage_ip
-        out, rc = self._command_execute_on_active_ip(*command, **kwargs)
+        query = tuple(opt for opt in command if opt != '-np')
+        if ArrayCLIState.is_cacheable(query):
+            poll = kwargs.get('poll', True) and '-np' not in command
+            out, rc = self.array_state.query(
+                query, poll,
+                lambda: self._command_execute_on_active_ip(*command,
+                                                           **kwargs))
+        else:
+            out, rc = self._command_execute_on_active_ip(*command, **kwargs)
+            if not set(QUERY_OPTIONS).intersection(query[:3]):
+                self.array_state.invalidate()
         if not retry_disable and self._is_sp_unavailable_error(out):
             # When active sp is unavailable, switch to another sp
             # and set it to active and force a poll
@@ -2069,7 +2202,8 @@ class CommandLineHelper(object):
 
         try:
             active_ip = (self.active_storage_ip,)
-            out, err = utils.execute(
+            out, err = self.array_state.execute(
+                utils.execute,
                 *(self.command
                   + active_ip
                   + self.credentials
@@ -262,7 +262,9 @@ class DellEQLSanISCSIDriver(san.SanISCSIDriver):
                 password=password,
                 privatekey=privatekey,
                 min_size=min_size,
-                max_size=max_size)
+                max_size=max_size,
+                idle_timeout=self.configuration.ssh_pool_idle_timeout,
+                check_interval=self.configuration.ssh_pool_check_interval)
         try:
             total_attempts = attempts
             with self.sshpool.item() as ssh:
@@ -62,6 +62,7 @@ from cinder import exception
 from cinder import flow_utils
 from cinder.i18n import _, _LE, _LI, _LW
 from cinder.objects import fields
+from cinder.volume import driver
 from cinder.volume import qos_specs
 from cinder.volume import utils as volume_utils
 from cinder.volume import volume_types
@@ -77,6 +78,12 @@ FLASH_CACHE_API_VERSION = 30201200
 SRSTATLD_API_VERSION = 30201200
 REMOTE_COPY_API_VERSION = 30202290
 
+# Seconds the daily CPG performance history of the last week is reused.
+CPG_STAT_DATA_CACHE_TTL = 3600
+# Seconds the usable free space of a CPG is reused while neither its usage
+# nor the free capacity of the system changed.
+CPG_SPACE_CACHE_TTL = 600
+
 hpe3par_opts = [
     cfg.StrOpt('hpe3par_api_url',
                default='',
@@ -235,10 +242,11 @@ class HPE3PARCommon(object):
         3.0.17 - Don't fail on clearing 3PAR object volume key. bug #1546392
         3.0.18 - create_cloned_volume account for larger size.  bug #1554740
         3.0.19 - Remove metadata that tracks the instance ID. bug #1572665
+        3.0.20 - Reuse CPG stat data and available space in volume stats
 
     """
 
-    VERSION = "3.0.19"
+    VERSION = "3.0.20"
 
     stats = {}
 
@@ -292,9 +300,10 @@ class HPE3PARCommon(object):
     hpe3par_valid_keys = ['cpg', 'snap_cpg', 'provisioning', 'persona', 'vvs',
                           'flash_cache']
 
-    def __init__(self, config, active_backend_id=None):
+    def __init__(self, config, active_backend_id=None, pool_stats=None):
         self.config = config
         self.client = None
+        self._pool_stats = pool_stats or driver.PoolStatsCache()
         self.uuid = uuid.uuid4()
         self._client_conf = {}
         self._replication_targets = []
@@ -1244,9 +1253,12 @@ class HPE3PARCommon(object):
                 if (self.API_VERSION >= SRSTATLD_API_VERSION):
                     interval = 'daily'
                     history = '7d'
-                    stat_capabilities = self.client.getCPGStatData(cpg_name,
-                                                                   interval,
-                                                                   history)
+                    stat_capabilities = self._pool_stats.get(
+                        (cpg_name, 'stat_data'),
+                        lambda: self.client.getCPGStatData(cpg_name,
+                                                           interval,
+                                                           history),
+                        ttl=CPG_STAT_DATA_CACHE_TTL)
                 else:
                     stat_capabilities = {
                         THROUGHPUT: None,
@@ -1267,8 +1279,14 @@ class HPE3PARCommon(object):
 
                 if 'limitMiB' not in cpg['SDGrowth']:
                     # cpg usable free space
-                    cpg_avail_space = (
-                        self.client.getCPGAvailableSpace(cpg_name))
+                    usage = (info.get('freeCapacityMiB'),
+                             cpg['UsrUsage'].get('usedMiB'),
+                             cpg['SDUsage'].get('usedMiB'),
+                             cpg['SAUsage'].get('usedMiB'))
+                    cpg_avail_space = self._pool_stats.get(
+                        (cpg_name, 'available_space'),
+                        lambda: self.client.getCPGAvailableSpace(cpg_name),
+                        indicator=usage, ttl=CPG_SPACE_CACHE_TTL)
                     free_capacity = int(
                         cpg_avail_space['usableFreeMiB'] * const)
                     # total_capacity is the best we can do for a limitless cpg
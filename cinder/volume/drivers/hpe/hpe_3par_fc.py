@@ -111,11 +111,13 @@ class HPE3PARFCDriver(driver.TransferVD,
         self._active_backend_id = kwargs.get('active_backend_id', None)
         self.configuration.append_config_values(hpecommon.hpe3par_opts)
         self.configuration.append_config_values(san.san_opts)
+        self._pool_stats = driver.PoolStatsCache()
         self.lookup_service = fczm_utils.create_lookup_service()
 
     def _init_common(self):
         return hpecommon.HPE3PARCommon(self.configuration,
-                                       self._active_backend_id)
+                                       self._active_backend_id,
+                                       pool_stats=self._pool_stats)
 
     def _login(self, timeout=None):
         common = self._init_common()
@@ -608,6 +610,8 @@ class HPE3PARFCDriver(driver.TransferVD,
             active_backend_id, volume_updates = common.failover_host(
                 context, volumes, secondary_id)
             self._active_backend_id = active_backend_id
+            # The cached pool stats are the ones of the previous array.
+            self._pool_stats.invalidate()
             return active_backend_id, volume_updates
         finally:
             self._logout(common)
@@ -36,6 +36,7 @@ from cinder.volume.drivers.huawei import hypermetro
 from cinder.volume.drivers.huawei import replication
 from cinder.volume.drivers.huawei import rest_client
 from cinder.volume.drivers.huawei import smartx
+from cinder.volume import http_client
 from cinder.volume import utils as volume_utils
 from cinder.volume import volume_types
 from cinder.zonemanager import utils as fczm_utils
@@ -67,6 +68,7 @@ class HuaweiBaseDriver(driver.VolumeDriver):
         self.active_backend_id = kwargs.get('active_backend_id')
 
         self.configuration.append_config_values(huawei_opts)
+        self.configuration.append_config_values(http_client.http_client_opts)
         self.huawei_conf = huawei_conf.HuaweiConf(self.configuration)
         self.metro_flag = False
         self.replica = None
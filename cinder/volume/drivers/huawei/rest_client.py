@@ -17,18 +17,16 @@ import ast
 import json
 import re
 import six
-import socket
 import time
 
 from oslo_log import log as logging
 from oslo_utils import excutils
-from six.moves import http_cookiejar
-from six.moves import urllib
 
 from cinder import exception
 from cinder.i18n import _, _LE, _LI, _LW
 from cinder import utils
 from cinder.volume.drivers.huawei import constants
+from cinder.volume import http_client
 
 LOG = logging.getLogger(__name__)
 
@@ -42,6 +40,11 @@ class RestClient(object):
         self.san_address = san_address
         self.san_user = san_user
         self.san_password = san_password
+        # The array certificate is validated like urlopen did, against the
+        # CA bundle in driver_ssl_cert_path or the system CAs.
+        verify = configuration.safe_get('driver_ssl_cert_path') or True
+        self.http_client = http_client.HTTPClient(
+            configuration, timeout=constants.SOCKET_TIMEOUT, verify=verify)
         self.init_http_head()
         self.storage_pools = kwargs.get('storage_pools',
                                         self.configuration.storage_pools)
@@ -52,7 +55,8 @@ class RestClient(object):
             self.configuration.iscsi_default_target_ip)
 
     def init_http_head(self):
-        self.cookie = http_cookiejar.CookieJar()
+        # Start a new session, dropping the cookies of the previous login.
+        self.http_client.close()
         self.url = None
         self.device_id = None
         self.headers = {
@@ -60,28 +64,29 @@ class RestClient(object):
             "Content-Type": "application/json",
         }
 
-    def do_call(self, url=None, data=None, method=None,
-                calltimeout=constants.SOCKET_TIMEOUT):
+    def do_call(self, url=None, data=None, method=None, calltimeout=None):
         """Send requests to Huawei storage server.
 
         Send HTTPS call, get response in JSON.
         Convert response into Python Object and return it.
+        Calls use http_timeout, or constants.SOCKET_TIMEOUT when it is not
+        set, unless calltimeout is given.
         """
         if self.url:
             url = self.url + url
-        handler = urllib.request.HTTPCookieProcessor(self.cookie)
-        opener = urllib.request.build_opener(handler)
-        urllib.request.install_opener(opener)
         res_json = None
 
         try:
-            socket.setdefaulttimeout(calltimeout)
             if data:
                 data = json.dumps(data)
-            req = urllib.request.Request(url, data, self.headers)
-            if method:
-                req.get_method = lambda: method
-            res = urllib.request.urlopen(req).read().decode("utf-8")
+            if not method:
+                method = 'POST' if data else 'GET'
+            req = self.http_client.request(method, url, data=data,
+                                           headers=self.headers,
+                                           timeout=(calltimeout or
+                                                    self.http_client.timeout))
+            req.raise_for_status()
+            res = req.text
 
             if "xx/sessions" not in url:
                 LOG.info(_LI('\n\n\n\nRequest URL: %(url)s\n\n'
@@ -19,6 +19,7 @@ import paramiko
 import random
 import re
 import string
+import threading
 import time
 import unicodedata
 
@@ -115,16 +116,201 @@ storwize_svc_opts = [
                help='Specifies the Storwize FlashCopy copy rate to be used '
                'when creating a full volume copy. The default is rate '
                'is 50, and the valid rates are 1-100.'),
+    cfg.IntOpt('storwize_svc_cli_cache_ttl',
+               default=0,
+               min=0,
+               help='Number of seconds the output of read-only CLI commands '
+                    'such as lsvdisk, lshost or lsmdiskgrp is reused. '
+                    'Cached output is dropped when a CLI command changing '
+                    'the same object is run by the driver, the system '
+                    'configuration is kept ten times longer. Set to 0 to '
+                    'run every command on the storage system.'),
 ]
 
 CONF = cfg.CONF
 CONF.register_opts(storwize_svc_opts)
 
 
+# Read-only commands whose output may be cached, with their time to live as
+# a multiple of storwize_svc_cli_cache_ttl.
+CLI_CACHE_TTL_FACTORS = {'lssystem': 10, 'lslicense': 10,
+                         'lsguicapabilities': 10, 'lsnode': 10,
+                         'lsiogrp': 10, 'lsportip': 10, 'lsportfc': 10,
+                         'lsmdiskgrp': 1, 'lsvdisk': 1, 'lsvdiskhostmap': 1,
+                         'lshostvdiskmap': 1, 'lsvdiskfcmappings': 1,
+                         'lshost': 1, 'lsiscsiauth': 1, 'lsfabric': 1}
+
+_VDISK_READS = ('lsvdisk', 'lsmdiskgrp', 'lsvdiskhostmap')
+_HOST_READS = ('lshost', 'lsiscsiauth', 'lsfabric', 'lshostvdiskmap')
+_HOSTMAP_READS = ('lsvdisk', 'lshost', 'lsvdiskhostmap', 'lshostvdiskmap')
+_FCMAP_READS = ('lsvdisk', 'lsvdiskfcmappings')
+_MAPPED_READS = ('lshostvdiskmap', 'lsvdiskfcmappings')
+
+# Cached commands whose output a mutating command may change. Mutating
+# commands not listed here drop the whole cache.
+CLI_CACHE_INVALIDATIONS = {
+    'mkvdisk': _VDISK_READS, 'rmvdisk': _VDISK_READS + _MAPPED_READS,
+    'chvdisk': _VDISK_READS, 'movevdisk': _VDISK_READS,
+    'expandvdisksize': _VDISK_READS, 'addvdiskcopy': _VDISK_READS,
+    'rmvdiskcopy': _VDISK_READS, 'addvdiskaccess': _VDISK_READS,
+    'rmvdiskaccess': _VDISK_READS,
+    'mkhost': _HOST_READS, 'addhostport': _HOST_READS,
+    'chhost': _HOST_READS, 'rmhost': _HOST_READS,
+    'mkvdiskhostmap': _HOSTMAP_READS, 'rmvdiskhostmap': _HOSTMAP_READS,
+    'mkfcmap': _FCMAP_READS, 'prestartfcmap': _FCMAP_READS,
+    'startfcmap': _FCMAP_READS, 'stopfcmap': _FCMAP_READS,
+    'chfcmap': _FCMAP_READS, 'rmfcmap': _FCMAP_READS,
+    'mkfcconsistgrp': _FCMAP_READS, 'rmfcconsistgrp': _FCMAP_READS,
+    'prestartfcconsistgrp': _FCMAP_READS,
+    'startfcconsistgrp': _FCMAP_READS, 'stopfcconsistgrp': _FCMAP_READS,
+    'mkrcrelationship': ('lsvdisk',), 'rmrcrelationship': ('lsvdisk',),
+    'switchrcrelationship': ('lsvdisk',),
+    'startrcrelationship': ('lsvdisk',), 'stoprcrelationship': ('lsvdisk',),
+    'mkippartnership': (), 'mkfcpartnership': (), 'chpartnership': (),
+}
+
+# Mutating commands addressing their objects by ID, which can't be matched
+# against the vdisk and host names of the cached commands.
+_CLI_CACHE_BY_ID = ('prestartfcmap', 'startfcmap', 'stopfcmap', 'chfcmap',
+                    'rmfcmap', 'prestartfcconsistgrp', 'startfcconsistgrp',
+                    'stopfcconsistgrp', 'rmfcconsistgrp')
+
+# Cached commands reporting on objects other than the one they are run for.
+_CLI_CACHE_AGGREGATES = ('lsmdiskgrp',)
+
+# Cached commands a mutating command may change for any object: rmvdisk
+# -force removes the host and FlashCopy mappings of the vdisk, which are
+# listed for its hosts and FlashCopy peers too.
+_CLI_CACHE_ALL_OBJECTS = {'rmvdisk': _MAPPED_READS}
+
+
+class _CLIRead(object):
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class CLICache(object):
+    """Read-through cache of the output of read-only CLI commands.
+
+    Entries are keyed by the command line and expire after the TTL of their
+    command. Identical reads issued while one is running wait for its
+    result instead of running the command again.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._entries = {}
+        self._inflight = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def cacheable(self, ssh_cmd):
+        return (self.ttl > 0 and len(ssh_cmd) > 1 and
+                ssh_cmd[0] == 'svcinfo' and
+                ssh_cmd[1] in CLI_CACHE_TTL_FACTORS)
+
+    def get(self, key, ssh_cmd, fetch, store=None):
+        """Return the cached result of ssh_cmd, running fetch on a miss.
+
+        :param store: optional callable deciding whether a result is cached
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.time():
+                return entry[1]
+            read = self._inflight.get(key)
+            running = read is not None
+            if not running:
+                read = self._inflight[key] = _CLIRead()
+                generation = self._generation
+        if running:
+            read.event.wait()
+            if read.error is not None:
+                raise read.error
+            return read.result
+
+        try:
+            read.result = fetch()
+        except Exception as ex:
+            read.error = ex
+            raise
+        else:
+            ttl = self.ttl * CLI_CACHE_TTL_FACTORS[ssh_cmd[1]]
+            with self._lock:
+                # Don't keep output read while the object may have changed.
+                if (generation == self._generation and
+                        (store is None or store(read.result))):
+                    self._entries[key] = (time.time() + ttl, read.result,
+                                          tuple(ssh_cmd))
+            return read.result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            read.event.set()
+
+    @staticmethod
+    def _object(ssh_cmd):
+        # The object a listing is run for is its last, unflagged argument.
+        if len(ssh_cmd) < 4 or ssh_cmd[-2].startswith('-'):
+            return None
+        return ssh_cmd[-1]
+
+    def invalidate(self, ssh_cmd):
+        """Drop the cached output a mutating command may have changed."""
+        if self.ttl <= 0:
+            return
+        command = ssh_cmd[1] if len(ssh_cmd) > 1 else None
+        reads = CLI_CACHE_INVALIDATIONS.get(command)
+        with self._lock:
+            self._generation += 1
+            if reads is None:
+                self._entries.clear()
+                return
+            for key, (expires, result, cached_cmd) in list(
+                    self._entries.items()):
+                if cached_cmd[1] not in reads:
+                    continue
+                obj = self._object(cached_cmd)
+                if (obj is None or obj in ssh_cmd or
+                        command in _CLI_CACHE_BY_ID or
+                        cached_cmd[1] in _CLI_CACHE_AGGREGATES or
+                        cached_cmd[1] in _CLI_CACHE_ALL_OBJECTS.get(
+                            command, ())):
+                    del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
 class StorwizeSSH(object):
     """SSH interface to IBM Storwize family and SVC storage systems."""
-    def __init__(self, run_ssh):
-        self._ssh = run_ssh
+    def __init__(self, run_ssh, cache_ttl=0):
+        self._ssh_cmd = run_ssh
+        self.cache = CLICache(cache_ttl)
+
+    def _execute(self, ssh_cmd, check_exit_code):
+        if check_exit_code:
+            return self._ssh_cmd(ssh_cmd)
+        return self._ssh_cmd(ssh_cmd, check_exit_code=False)
+
+    def _ssh(self, ssh_cmd, check_exit_code=True):
+        if self.cache.cacheable(ssh_cmd):
+            # Errors are only returned when the exit code is not checked,
+            # they are never cached.
+            return self.cache.get(
+                (tuple(ssh_cmd), check_exit_code), ssh_cmd,
+                lambda: self._execute(ssh_cmd, check_exit_code),
+                store=lambda result: not result[1])
+        try:
+            return self._execute(ssh_cmd, check_exit_code)
+        finally:
+            if ssh_cmd and ssh_cmd[0] == 'svctask':
+                self.cache.invalidate(ssh_cmd)
 
     def _run_ssh(self, ssh_cmd):
         try:
@@ -539,8 +725,8 @@ class StorwizeHelpers(object):
                                      'param': 'rate',
                                      'type': int}}
 
-    def __init__(self, run_ssh):
-        self.ssh = StorwizeSSH(run_ssh)
+    def __init__(self, run_ssh, cache_ttl=0):
+        self.ssh = StorwizeSSH(run_ssh, cache_ttl=cache_ttl)
         self.check_fcmapping_interval = 3
 
     @staticmethod
@@ -1859,7 +2045,9 @@ class StorwizeSVCCommonDriver(san.SanDriver,
         self._backend_name = self.configuration.safe_get('volume_backend_name')
         self.active_ip = self.configuration.san_ip
         self.inactive_ip = self.configuration.storwize_san_secondary_ip
-        self._helpers = StorwizeHelpers(self._run_ssh)
+        self._helpers = StorwizeHelpers(
+            self._run_ssh,
+            cache_ttl=self.configuration.storwize_svc_cli_cache_ttl)
         self._vdiskcopyops = {}
         self._vdiskcopyops_loop = None
         self.protocol = None
@@ -2077,7 +2265,9 @@ class StorwizeSVCCommonDriver(san.SanDriver,
             password=password,
             privatekey=privatekey,
             min_size=min_size,
-            max_size=max_size)
+            max_size=max_size,
+            idle_timeout=self.configuration.ssh_pool_idle_timeout,
+            check_interval=self.configuration.ssh_pool_check_interval)
 
         return sshpool
 
@@ -15,6 +15,7 @@ Driver for Linux servers running LVM.
 
 """
 
+import collections
 import math
 import os
 import socket
@@ -22,6 +23,7 @@ import socket
 from oslo_concurrency import processutils
 from oslo_config import cfg
 from oslo_log import log as logging
+from oslo_service import loopingcall
 from oslo_utils import excutils
 from oslo_utils import importutils
 from oslo_utils import units
@@ -68,9 +70,25 @@ volume_opts = [
                  help='max_over_subscription_ratio setting for the LVM '
                       'driver.  If set, this takes precedence over the '
                       'general max_over_subscription_ratio option.  If '
-                      'None, the general option is used.')
+                      'None, the general option is used.'),
+    cfg.BoolOpt('lvm_deferred_clear',
+                default=False,
+                help='Clear deleted thick volumes from a background task. '
+                     'When enabled, deleting a volume only renames its LV and '
+                     'the LV is cleared according to volume_clear and '
+                     'removed later, one at a time. Has no effect if '
+                     'volume_clear is none.'),
+    cfg.IntOpt('lvm_deferred_clear_interval',
+               default=60,
+               help='Interval, in seconds, between runs of the task that '
+                    'clears deleted volumes when lvm_deferred_clear is '
+                    'enabled.'),
 ]
 
+# Deleted LVs waiting to be cleared are renamed with this prefix, so they
+# can be found again after a restart.
+DEFERRED_CLEAR_PREFIX = '_clear_'
+
 CONF = cfg.CONF
 CONF.register_opts(volume_opts)
 
@@ -108,6 +126,9 @@ class LVMVolumeDriver(driver.VolumeDriver):
             executor=self._execute)
         self.protocol = self.target_driver.protocol
         self._sparse_copy_volume = False
+        # LV name : size in GiB, for LVs waiting to be cleared and removed
+        self._deferred_clear_queue = collections.OrderedDict()
+        self._deferred_clear_loop = None
 
         if self.configuration.lvm_max_over_subscription_ratio is not None:
             self.configuration.max_over_subscription_ratio = \
@@ -123,6 +144,9 @@ class LVMVolumeDriver(driver.VolumeDriver):
         """Deletes a logical volume."""
         if self.configuration.volume_clear != 'none' and \
                 self.configuration.lvm_type != 'thin':
+            if self.configuration.lvm_deferred_clear and not is_snapshot:
+                self._defer_clear_volume(volume)
+                return
             self._clear_volume(volume, is_snapshot)
 
         name = volume['name']
@@ -169,6 +193,58 @@ class LVMVolumeDriver(driver.VolumeDriver):
             volume_clear=self.configuration.volume_clear,
             volume_clear_size=self.configuration.volume_clear_size)
 
+    def _defer_clear_volume(self, volume):
+        """Hands a volume over to the background clearing task."""
+        size_in_g = volume.get('size')
+        if size_in_g is None:
+            msg = (_("Size for volume: %s not found, cannot secure delete.")
+                   % volume['id'])
+            LOG.error(msg)
+            raise exception.InvalidParameterValue(msg)
+
+        clear_name = DEFERRED_CLEAR_PREFIX + volume['name']
+        self.vg.rename_volume(volume['name'], clear_name)
+        self._deferred_clear_queue[clear_name] = float(size_in_g)
+        LOG.info(_LI('Volume %(name)s renamed to %(clear_name)s, it will be '
+                     'cleared and removed in the background.'),
+                 {'name': volume['name'], 'clear_name': clear_name})
+
+    def _start_deferred_clear(self):
+        """Queues LVs left to clear by a previous run and starts the task."""
+        for lv in self.vg.get_volumes():
+            if (lv['name'].startswith(DEFERRED_CLEAR_PREFIX) and
+                    lv['name'] not in self._deferred_clear_queue):
+                self._deferred_clear_queue[lv['name']] = float(lv['size'])
+
+        if self._deferred_clear_queue:
+            LOG.info(_LI('Found %d deleted volumes still to be cleared.'),
+                     len(self._deferred_clear_queue))
+
+        if self._deferred_clear_loop is None:
+            self._deferred_clear_loop = loopingcall.FixedIntervalLoopingCall(
+                self._clear_deferred_volume)
+            self._deferred_clear_loop.start(
+                interval=self.configuration.lvm_deferred_clear_interval)
+
+    def _clear_deferred_volume(self):
+        """Clears and removes the oldest LV waiting to be cleared."""
+        if not self._deferred_clear_queue:
+            return
+
+        name, size_in_g = self._deferred_clear_queue.popitem(last=False)
+        try:
+            if self.vg.get_volume(name) is not None:
+                volutils.clear_volume(
+                    size_in_g * units.Ki, self.local_path({'name': name}),
+                    volume_clear=self.configuration.volume_clear,
+                    volume_clear_size=self.configuration.volume_clear_size,
+                    throttle=self._throttle)
+                self.vg.delete(name)
+        except Exception:
+            LOG.exception(_LE('Failed to clear deleted volume %s, will '
+                              'retry.'), name)
+            self._deferred_clear_queue[name] = size_in_g
+
     def _escape_snapshot(self, snapshot_name):
         # Linux LVM reserves name that starts with snapshot, so that
         # such volume name can't be created. Mangle it.
@@ -236,8 +312,10 @@ class LVMVolumeDriver(driver.VolumeDriver):
         thin_enabled = self.configuration.lvm_type == 'thin'
 
         # Calculate the total volumes used by the VG group.
-        # This includes volumes and snapshots.
-        total_volumes = len(self.vg.get_volumes())
+        # This includes volumes and snapshots. The LVs listed while
+        # updating the VG info above are reused rather than listed again.
+        lvs = self.vg.get_cached_volumes()
+        total_volumes = len(lvs)
 
         # Skip enabled_pools setting, treat the whole backend as one pool
         # XXX FIXME if multipool support is added to LVM driver.
@@ -259,6 +337,12 @@ class LVMVolumeDriver(driver.VolumeDriver):
             goodness_function=self.get_goodness_function(),
             multiattach=True
         ))
+        if self.configuration.lvm_deferred_clear:
+            # Space held by deleted volumes that are still to be cleared.
+            pending = [float(lv['size']) for lv in lvs
+                       if lv['name'].startswith(DEFERRED_CLEAR_PREFIX)]
+            single_pool['deferred_clear_volumes'] = len(pending)
+            single_pool['deferred_clear_capacity_gb'] = round(sum(pending), 2)
         data["pools"].append(single_pool)
 
         # Check availability of sparse volume copy.
@@ -336,6 +420,10 @@ class LVMVolumeDriver(driver.VolumeDriver):
             # Enable sparse copy since lvm_type is 'thin'
             self._sparse_copy_volume = True
 
+        if (self.configuration.lvm_deferred_clear and
+                self.configuration.volume_clear != 'none'):
+            self._start_deferred_clear()
+
     def create_volume(self, volume):
         """Creates a logical volume."""
         mirror_count = 0
@@ -747,6 +835,13 @@ class LVMVolumeDriver(driver.VolumeDriver):
             self.target_driver.ensure_export(context, volume, volume_path)
         return model_update
 
+    def ensure_exports(self, context, volumes):
+        volume_paths = [(volume,
+                         "/dev/%s/%s" % (self.configuration.volume_group,
+                                         volume['name']))
+                        for volume in volumes]
+        return self.target_driver.ensure_exports(context, volume_paths)
+
     def create_export(self, context, volume, connector, vg=None):
         if vg is None:
             vg = self.configuration.volume_group
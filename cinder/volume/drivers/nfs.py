@@ -289,11 +289,15 @@ class NfsDriver(driver.ExtendVD, remotefs.RemoteFSDriver):
         total_available = block_size * blocks_avail
         total_size = block_size * blocks_total
 
+        total_allocated = float(self._get_share_allocated(
+            nfs_share, mount_point, scan=self._scan_share_apparent_size))
+        return total_size, total_available, total_allocated
+
+    def _scan_share_apparent_size(self, nfs_share, mount_point):
         du, _ = self._execute('du', '-sb', '--apparent-size', '--exclude',
                               '*snapshot*', mount_point,
-                              run_as_root=run_as_root)
-        total_allocated = float(du.split()[0])
-        return total_size, total_available, total_allocated
+                              run_as_root=self._execute_as_root)
+        return int(du.split()[0])
 
     def _get_mount_point_base(self):
         return self.base
@@ -314,6 +318,8 @@ class NfsDriver(driver.ExtendVD, remotefs.RemoteFSDriver):
         if not self._is_file_size_equal(path, new_size):
             raise exception.ExtendVolumeError(
                 reason='Resizing image file failed.')
+        self._update_share_allocated(volume['provider_location'],
+                                     extend_by * units.Gi)
 
     def _is_file_size_equal(self, path, size):
         """Checks if file size at path is equal to size."""
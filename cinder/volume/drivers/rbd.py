@@ -14,6 +14,7 @@
 """RADOS Block Device Driver"""
 
 from __future__ import absolute_import
+import collections
 import io
 import json
 import math
@@ -21,8 +22,10 @@ import os
 import tempfile
 
 from eventlet import tpool
+from oslo_concurrency import lockutils
 from oslo_config import cfg
 from oslo_log import log as logging
+from oslo_service import loopingcall
 from oslo_utils import fileutils
 from oslo_utils import units
 from six.moves import urllib
@@ -73,6 +76,27 @@ rbd_opts = [
                help='Maximum number of nested volume clones that are '
                     'taken before a flatten occurs. Set to 0 to disable '
                     'cloning.'),
+    cfg.BoolOpt('rbd_flatten_in_background',
+                default=False,
+                help='When rbd_max_clone_depth is reached, clone the source '
+                     'volume straight away and flatten it from a background '
+                     'task instead of flattening it before the clone is '
+                     'taken.'),
+    cfg.IntOpt('rbd_background_flatten_interval',
+               default=60,
+               help='Interval, in seconds, between runs of the background '
+                    'flatten task.'),
+    cfg.IntOpt('rbd_background_flatten_batch_size',
+               default=1,
+               help='Maximum number of volumes flattened by each run of the '
+                    'background flatten task.'),
+    cfg.IntOpt('rbd_flatten_hot_clone_threshold',
+               default=0,
+               help='Number of clones taken from a volume that is itself a '
+                    'clone after which it is queued for background '
+                    'flattening, regardless of its clone depth. Only used '
+                    'when rbd_flatten_in_background is enabled. Set to 0 to '
+                    'disable.'),
     cfg.IntOpt('rbd_store_chunk_size', default=4,
                help=_('Volumes will be chunked into objects of this size '
                       '(in megabytes).')),
@@ -261,6 +285,54 @@ class RADOSClient(object):
         return int(features)
 
 
+class RBDCloneChainTracker(object):
+    """Caches the parent of each rbd image involved in a clone chain.
+
+    Cinder only ever sets the parent of an image when it is created and
+    only ever removes it by flattening, so a cached link can never make a
+    chain look shorter than it is and no expiry is needed.
+    """
+    def __init__(self):
+        self._parents = {}
+        self._clone_counts = collections.defaultdict(int)
+
+    def get_depth(self, name):
+        """Return the clone depth of name or None if it is not known."""
+        depth = 0
+        while name in self._parents:
+            name = self._parents[name]
+            if name is None:
+                return depth
+            depth += 1
+        return None
+
+    def set_parent(self, name, parent):
+        self._parents[name] = parent
+
+    def add_clone(self, name, parent):
+        """Record a new clone and return the number taken from parent."""
+        self._parents[name] = parent
+        self._clone_counts[parent] += 1
+        return self._clone_counts[parent]
+
+    def flattened(self, name):
+        self._parents[name] = None
+        self._clone_counts.pop(name, None)
+
+    def rename(self, old_name, new_name):
+        if old_name in self._parents:
+            self._parents[new_name] = self._parents.pop(old_name)
+        if old_name in self._clone_counts:
+            self._clone_counts[new_name] = self._clone_counts.pop(old_name)
+        for name, parent in self._parents.items():
+            if parent == old_name:
+                self._parents[name] = new_name
+
+    def forget(self, name):
+        self._parents.pop(name, None)
+        self._clone_counts.pop(name, None)
+
+
 class RBDDriver(driver.TransferVD, driver.ExtendVD,
                 driver.CloneableImageVD, driver.SnapshotVD,
                 driver.MigrateVD, driver.BaseVD):
@@ -275,6 +347,11 @@ class RBDDriver(driver.TransferVD, driver.ExtendVD,
         # allow overrides for testing
         self.rados = kwargs.get('rados', rados)
         self.rbd = kwargs.get('rbd', rbd)
+        self._clone_tracker = RBDCloneChainTracker()
+        # Volumes waiting to be flattened by the background task, kept in
+        # the order they were queued.
+        self._flatten_queue = collections.OrderedDict()
+        self._flatten_loop = None
 
         # All string args used with librbd must be None or utf-8 otherwise
         # librbd will break.
@@ -284,6 +361,16 @@ class RBDDriver(driver.TransferVD, driver.ExtendVD,
             if val is not None:
                 setattr(self.configuration, attr, utils.convert_str(val))
 
+    def do_setup(self, context):
+        """Start the background flatten task if it is enabled."""
+        if self.configuration.rbd_flatten_in_background:
+            self._flatten_loop = loopingcall.FixedIntervalLoopingCall(
+                self._process_flatten_queue)
+            self._flatten_loop.start(
+                interval=self.configuration.rbd_background_flatten_interval,
+                initial_delay=(
+                    self.configuration.rbd_background_flatten_interval))
+
     def check_for_setup_error(self):
         """Returns an error if prerequisites aren't met."""
         if rados is None:
@@ -426,6 +513,10 @@ class RBDDriver(driver.TransferVD, driver.ExtendVD,
 
     def _get_clone_depth(self, client, volume_name, depth=0):
         """Returns the number of ancestral clones of the given volume."""
+        known_depth = self._clone_tracker.get_depth(volume_name)
+        if known_depth is not None:
+            return depth + known_depth
+
         parent_volume = self.rbd.Image(client.ioctx, volume_name)
         try:
             _pool, parent, _snap = self._get_clone_info(parent_volume,
@@ -433,6 +524,7 @@ class RBDDriver(driver.TransferVD, driver.ExtendVD,
         finally:
             parent_volume.close()
 
+        self._clone_tracker.set_parent(volume_name, parent)
         if not parent:
             return depth
 
@@ -453,11 +545,15 @@ class RBDDriver(driver.TransferVD, driver.ExtendVD,
         The user has the option to limit how long a volume's clone chain can be
         by setting rbd_max_clone_depth. If a clone is made of another clone
         and that clone has rbd_max_clone_depth clones behind it, the source
-        volume will be flattened.
+        volume will be flattened. If rbd_flatten_in_background is set the
+        clone is taken straight away and the source volume is flattened later
+        by a background task; it is only flattened inline if it is cloned
+        again before that task gets to it.
         """
         src_name = utils.convert_str(src_vref.name)
         dest_name = utils.convert_str(volume.name)
         flatten_parent = False
+        background = self.configuration.rbd_flatten_in_background
 
         # Do full copy if requested
         if self.configuration.rbd_max_clone_depth <= 0:
@@ -472,28 +568,41 @@ class RBDDriver(driver.TransferVD, driver.ExtendVD,
             # If source volume is a clone and rbd_max_clone_depth reached,
             # flatten the source before cloning. Zero rbd_max_clone_depth means
             # infinite is allowed.
-            if depth == self.configuration.rbd_max_clone_depth:
+            if background and (depth ==
+                               self.configuration.rbd_max_clone_depth):
+                LOG.debug("maximum clone depth (%d) has been reached - "
+                          "queueing source volume for flattening",
+                          self.configuration.rbd_max_clone_depth)
+                self._queue_flatten(src_name)
+            elif depth >= self.configuration.rbd_max_clone_depth:
                 LOG.debug("maximum clone depth (%d) has been reached - "
                           "flattening source volume",
                           self.configuration.rbd_max_clone_depth)
                 flatten_parent = True
+                self._flatten_queue.pop(src_name, None)
 
             src_volume = self.rbd.Image(client.ioctx, src_name)
             try:
                 # First flatten source volume if required.
                 if flatten_parent:
-                    _pool, parent, snap = self._get_clone_info(src_volume,
-                                                               src_name)
-                    # Flatten source volume
-                    LOG.debug("flattening source volume %s", src_name)
-                    src_volume.flatten()
-                    # Delete parent clone snap
-                    parent_volume = self.rbd.Image(client.ioctx, parent)
-                    try:
-                        parent_volume.unprotect_snap(snap)
-                        parent_volume.remove_snap(snap)
-                    finally:
-                        parent_volume.close()
+                    with self._flatten_lock(src_name):
+                        _pool, parent, snap = self._get_clone_info(src_volume,
+                                                                   src_name)
+                        # The background task may have got there first.
+                        if parent:
+                            # Flatten source volume
+                            LOG.debug("flattening source volume %s", src_name)
+                            src_volume.flatten()
+                            # Delete parent clone snap
+                            parent_volume = self.rbd.Image(client.ioctx,
+                                                           parent)
+                            try:
+                                parent_volume.unprotect_snap(snap)
+                                parent_volume.remove_snap(snap)
+                            finally:
+                                parent_volume.close()
+                        self._clone_tracker.flattened(src_name)
+                        depth = 0
 
                 # Create new snapshot of source volume
                 clone_snap = "%s.clone_snap" % dest_name
@@ -521,6 +630,15 @@ class RBDDriver(driver.TransferVD, driver.ExtendVD,
             finally:
                 src_volume.close()
 
+        clone_count = self._clone_tracker.add_clone(dest_name, src_name)
+        hot_threshold = self.configuration.rbd_flatten_hot_clone_threshold
+        if (background and depth and hot_threshold and
+                clone_count >= hot_threshold):
+            LOG.debug("%(count)d clones taken from %(src)s - queueing it "
+                      "for flattening", {'count': clone_count,
+                                         'src': src_name})
+            self._queue_flatten(src_name)
+
         if volume.size != src_vref.size:
             LOG.debug("resize volume '%(dst_vol)s' from %(src_size)d to "
                       "%(dst_size)d",
@@ -546,6 +664,55 @@ class RBDDriver(driver.TransferVD, driver.ExtendVD,
                                    order,
                                    old_format=False,
                                    features=client.features)
+        self._clone_tracker.set_parent(utils.convert_str(volume.name), None)
+
+    def _queue_flatten(self, volume_name):
+        if volume_name not in self._flatten_queue:
+            self._flatten_queue[volume_name] = None
+
+    def _process_flatten_queue(self):
+        """Flatten a batch of the volumes queued for background flattening.
+
+        Once a volume has been flattened the clone snapshot it was created
+        from is no longer needed, so it is removed along with any deleted
+        ancestors that only remained because of it.
+        """
+        batch_size = self.configuration.rbd_background_flatten_batch_size
+        for _i in range(min(batch_size, len(self._flatten_queue))):
+            volume_name, _ = self._flatten_queue.popitem(last=False)
+            try:
+                self._flatten_clone(volume_name)
+            except Exception:
+                LOG.exception(_LE("Background flatten of %s failed."),
+                              volume_name)
+
+    def _flatten_lock(self, volume_name):
+        return lockutils.lock('rbd-flatten-%s' % volume_name,
+                              lock_file_prefix='cinder-')
+
+    def _flatten_clone(self, volume_name):
+        with self._flatten_lock(volume_name), RADOSClient(self) as client:
+            try:
+                rbd_image = self.rbd.Image(client.ioctx, volume_name)
+            except self.rbd.ImageNotFound:
+                LOG.debug("volume %s no longer exists, not flattening",
+                          volume_name)
+                self._clone_tracker.forget(volume_name)
+                return
+
+            try:
+                _pool, parent, parent_snap = self._get_clone_info(
+                    rbd_image, volume_name)
+                if parent:
+                    LOG.debug("flattening volume %s in background",
+                              volume_name)
+                    tpool.Proxy(rbd_image).flatten()
+            finally:
+                rbd_image.close()
+
+            self._clone_tracker.flattened(volume_name)
+            if parent:
+                self._delete_clone_parent_refs(client, parent, parent_snap)
 
     def _flatten(self, pool, volume_name):
         LOG.debug('flattening %(pool)s/%(img)s',
@@ -663,6 +830,8 @@ class RBDDriver(driver.TransferVD, driver.ExtendVD,
         if (not parent_has_snaps) and parent_name.endswith('.deleted'):
             LOG.debug("deleting parent %s", parent_name)
             self.RBDProxy().remove(client.ioctx, parent_name)
+            self._flatten_queue.pop(parent_name, None)
+            self._clone_tracker.forget(parent_name)
 
             # Now move up to grandparent if there is one
             if g_parent:
@@ -733,6 +902,9 @@ class RBDDriver(driver.TransferVD, driver.ExtendVD,
                                  "operation to proceed."), volume_name)
                     return
 
+                self._flatten_queue.pop(volume_name, None)
+                self._clone_tracker.forget(volume_name)
+
                 # If it is a clone, walk back up the parent chain deleting
                 # references.
                 if parent:
@@ -744,6 +916,10 @@ class RBDDriver(driver.TransferVD, driver.ExtendVD,
                 # will be deleted when it's snapshot and clones are deleted.
                 new_name = "%s.deleted" % (volume_name)
                 self.RBDProxy().rename(client.ioctx, volume_name, new_name)
+                self._clone_tracker.rename(volume_name, new_name)
+                if volume_name in self._flatten_queue:
+                    del self._flatten_queue[volume_name]
+                    self._queue_flatten(new_name)
 
     def create_snapshot(self, snapshot):
         """Creates an rbd snapshot."""
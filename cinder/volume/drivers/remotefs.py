@@ -83,6 +83,14 @@ nas_opts = [
     cfg.StrOpt('nas_mount_options',
                help=('Options used to mount the storage backend file system '
                      'where Cinder volumes are stored.')),
+    cfg.IntOpt('nas_allocation_reconcile_interval',
+               default=600,
+               help=('Interval, in seconds, after which the space allocated '
+                     'on a share is recalculated by walking the share. In '
+                     'between, it is tracked from the volumes created, '
+                     'extended and deleted by the driver. Set to 0 to walk '
+                     'the share every time the allocated space is needed, '
+                     'volume creation included.')),
 ]
 
 old_vol_type_opts = [cfg.DeprecatedOpt('glusterfs_sparsed_volumes'),
@@ -147,6 +155,9 @@ class RemoteFSDriver(driver.LocalVD, driver.TransferVD, driver.BaseVD):
         self._mounted_shares = []
         self._execute_as_root = True
         self._is_voldb_empty_at_startup = kwargs.pop('is_vol_db_empty', None)
+        # (share, scan method name) : [allocated bytes, time of the last
+        # walk of the share]
+        self._share_allocated = {}
 
         if self.configuration:
             self.configuration.append_config_values(nas_opts)
@@ -202,12 +213,43 @@ class RemoteFSDriver(driver.LocalVD, driver.TransferVD, driver.BaseVD):
         """
         provisioned_size = 0.0
         for share in self.shares.keys():
-            mount_path = self._get_mount_point_for_share(share)
-            out, _ = self._execute('du', '--bytes', mount_path,
-                                   run_as_root=True)
-            provisioned_size += int(out.split()[0])
+            provisioned_size += self._get_share_allocated(share)
         return round(provisioned_size / units.Gi, 2)
 
+    def _scan_share_allocated(self, share, mount_point):
+        """Returns the number of bytes allocated on a share by walking it."""
+        out, _ = self._execute('du', '--bytes', mount_point,
+                               run_as_root=True)
+        return int(out.split()[0])
+
+    def _get_share_allocated(self, share, mount_point=None, scan=None):
+        """Returns the number of bytes allocated on a share.
+
+        The share is walked with scan, _scan_share_allocated by default,
+        the first time and again once the value is older than
+        nas_allocation_reconcile_interval. In between, the value is kept
+        up to date by _update_share_allocated.
+        """
+        scan = scan or self._scan_share_allocated
+        key = (share, scan.__name__)
+        interval = self.configuration.nas_allocation_reconcile_interval
+        tracked = self._share_allocated.get(key)
+        if (tracked is not None and interval > 0 and
+                time.time() - tracked[1] < interval):
+            return tracked[0]
+
+        if mount_point is None:
+            mount_point = self._get_mount_point_for_share(share)
+        allocated = scan(share, mount_point)
+        self._share_allocated[key] = [allocated, time.time()]
+        return allocated
+
+    def _update_share_allocated(self, share, delta):
+        """Adjusts the space tracked for a share by delta bytes."""
+        for (tracked_share, _scan), tracked in self._share_allocated.items():
+            if tracked_share == share:
+                tracked[0] = max(0, tracked[0] + delta)
+
     def _get_mount_point_base(self):
         """Returns the mount point base for the remote fs.
 
@@ -236,6 +278,8 @@ class RemoteFSDriver(driver.LocalVD, driver.TransferVD, driver.BaseVD):
         LOG.info(_LI('casted to %s'), volume['provider_location'])
 
         self._do_create_volume(volume)
+        self._update_share_allocated(volume['provider_location'],
+                                     volume['size'] * units.Gi)
 
         return {'provider_location': volume['provider_location']}
 
@@ -290,6 +334,8 @@ class RemoteFSDriver(driver.LocalVD, driver.TransferVD, driver.BaseVD):
         mounted_path = self.local_path(volume)
 
         self._delete(mounted_path)
+        self._update_share_allocated(volume['provider_location'],
+                                     -volume['size'] * units.Gi)
 
     def ensure_export(self, ctx, volume):
         """Synchronously recreates an export for a logical volume."""
@@ -71,6 +71,19 @@ san_opts = [
     cfg.IntOpt('ssh_max_pool_conn',
                default=5,
                help='Maximum ssh connections in the pool'),
+    cfg.IntOpt('ssh_pool_idle_timeout',
+               default=600,
+               min=0,
+               help='Seconds after which unused ssh connections above '
+                    'ssh_min_pool_conn are closed. Set to 0 to keep them '
+                    'open.'),
+    cfg.IntOpt('ssh_pool_check_interval',
+               default=60,
+               min=0,
+               help='Seconds an ssh connection may stay unused in the pool '
+                    'before it is probed with a new channel when it is '
+                    'taken from the pool. Set to 0 to only check the state '
+                    'of the transport.'),
 ]
 
 CONF = cfg.CONF
@@ -117,7 +130,9 @@ class SanDriver(driver.BaseVD):
                 password=password,
                 privatekey=privatekey,
                 min_size=min_size,
-                max_size=max_size)
+                max_size=max_size,
+                idle_timeout=self.configuration.ssh_pool_idle_timeout,
+                check_interval=self.configuration.ssh_pool_check_interval)
         last_exception = None
         try:
             with self.sshpool.item() as ssh:
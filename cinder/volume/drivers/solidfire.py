@@ -37,6 +37,7 @@ from cinder.i18n import _, _LE, _LW
 from cinder.image import image_utils
 from cinder.objects import fields
 from cinder.volume.drivers.san import san
+from cinder.volume import http_client
 from cinder.volume import qos_specs
 from cinder.volume.targets import iscsi as iscsi_driver
 from cinder.volume import volume_types
@@ -87,6 +88,16 @@ sf_opts = [
                      'memory, very large deployments may want to consider '
                      'setting to False.'),
 
+    cfg.IntOpt('sf_volume_mapping_refresh_interval',
+               default=3600,
+               min=0,
+               help='Interval in seconds at which the internal mapping of '
+                    'volume IDs is reconciled with the volume list of the '
+                    'cluster when volume stats are refreshed. Between '
+                    'reconciliations the mapping is updated as volumes are '
+                    'created and deleted. Set to 0 to disable the periodic '
+                    'reconciliation.'),
+
     cfg.PortOpt('sf_api_port',
                 default=443,
                 help='SolidFire API port. Useful if the device api is behind '
@@ -149,6 +160,8 @@ class SolidFireDriver(san.SanISCSIDriver):
         2.0.4 - Implement volume replication
         2.0.5 - Try and deal with the stupid retry/clear issues from objects
                 and tflow
+        2.0.6 - Reuse keep-alive connections for API calls
+        2.0.7 - Look up volumes through the volume ID mapping
     """
 
     VERSION = '2.0.2'
@@ -183,14 +196,19 @@ class SolidFireDriver(san.SanISCSIDriver):
         self.failed_over_id = kwargs.get('active_backend_id', None)
         self.active_cluster_info = {}
         self.configuration.append_config_values(sf_opts)
+        self.configuration.append_config_values(
+            http_client.http_client_opts)
         self.template_account_id = None
         self.max_volumes_per_account = 1990
         self.volume_map = {}
+        self.volume_map_updated_at = None
         self.cluster_pairs = []
         self.replication_enabled = False
         self.failed_over = False
         self.target_driver = SolidFireISCSI(solidfire_driver=self,
                                             configuration=self.configuration)
+        self.http_client = http_client.HTTPClient(self.configuration,
+                                                  timeout=30)
         if self.failed_over_id:
             remote_info = self._get_remote_info_by_id(self.failed_over_id)
             if remote_info:
@@ -301,6 +319,8 @@ class SolidFireDriver(san.SanISCSIDriver):
                 'GetClusterInfo',
                 {})['result']['clusterInfo'].items():
             self.active_cluster_info[k] = v
+        # NOTE: volume IDs are only unique within a cluster
+        self._reset_volume_map()
 
         # Add a couple extra things that are handy for us
         self.active_cluster_info['clusterAPIVersion'] = (
@@ -338,11 +358,100 @@ class SolidFireDriver(san.SanISCSIDriver):
                          'provider_id': id_string})
         return updates
 
+    def _reset_volume_map(self):
+        self.volume_map = {}
+        self.volume_map_updated_at = None
+
+    def _build_volume_map(self, sf_vols):
+        """Map cinder IDs to SolidFire volumeIDs for a list of volumes.
+
+        Volumes are keyed on their uuid attribute or, failing that, on their
+        name without the volume prefix. IDs matching more than one volume
+        are left out so that lookups of them scan the cluster and report the
+        duplicates.
+        """
+        if not self.configuration.sf_enable_volume_mapping:
+            return
+        prefix = self.configuration.sf_volume_prefix
+        volume_map = {}
+        duplicates = set()
+        for v in sf_vols:
+            meta = v.get('attributes')
+            uuid = meta.get('uuid') if meta else None
+            if not uuid and v['name'].startswith(prefix):
+                uuid = v['name'][len(prefix):]
+            if not uuid:
+                continue
+            if uuid in volume_map:
+                duplicates.add(uuid)
+            volume_map[uuid] = v['volumeID']
+        for uuid in duplicates:
+            del volume_map[uuid]
+        self.volume_map = volume_map
+        self.volume_map_updated_at = time.time()
+        LOG.debug("Mapped %(count)s SolidFire volumes to cinder IDs.",
+                  {'count': len(volume_map)})
+
+    def _refresh_volume_map(self):
+        interval = self.configuration.sf_volume_mapping_refresh_interval
+        if (not self.configuration.sf_enable_volume_mapping or
+                not interval or (self.volume_map_updated_at and
+                                 time.time() - self.volume_map_updated_at <
+                                 interval)):
+            return
+        sf_vols = self._issue_api_request('ListActiveVolumes',
+                                          {})['result']['volumes']
+        self._build_volume_map(sf_vols)
+
+    def _map_sf_volume(self, uuid, sf_volume_id):
+        if self.configuration.sf_enable_volume_mapping:
+            self.volume_map[uuid] = int(sf_volume_id)
+
+    def _unmap_sf_volume(self, uuid):
+        self.volume_map.pop(uuid, None)
+
+    def _get_mapped_sf_volume(self, uuid, account_ids=None):
+        """Fetch a single volume using the volume ID mapping.
+
+        Returns None when the volume is not mapped or no longer matches the
+        mapping, the caller is then expected to search for it.
+        """
+        if not self.configuration.sf_enable_volume_mapping:
+            return None
+        sf_volume_id = self.volume_map.get(uuid)
+        if sf_volume_id is None:
+            return None
+        params = {'startVolumeID': sf_volume_id, 'limit': 1}
+        vols = self._issue_api_request('ListActiveVolumes',
+                                       params)['result']['volumes']
+        sf_vol = vols[0] if vols else None
+        if (sf_vol is None or sf_vol['volumeID'] != sf_volume_id or
+                not self._sf_volume_matches(sf_vol, uuid)):
+            LOG.debug("Mapping of cinder ID %(uuid)s to SolidFire volumeID "
+                      "%(volume_id)s is stale.",
+                      {'uuid': uuid, 'volume_id': sf_volume_id})
+            self._unmap_sf_volume(uuid)
+            return None
+        if account_ids and sf_vol['accountID'] not in account_ids:
+            return None
+        return sf_vol
+
+    @staticmethod
+    def _sf_volume_matches(sf_vol, uuid):
+        # NOTE(jdg): In the case of "name" we can't
+        # update that on manage/import, so we use
+        # the uuid attribute
+        meta = sf_vol.get('attributes')
+        alt_id = ''
+        if meta:
+            alt_id = meta.get('uuid', '')
+        return uuid in sf_vol['name'] or uuid in alt_id
+
     def _init_volume_mappings(self, vrefs):
         updates = []
         sf_vols = self._issue_api_request('ListActiveVolumes',
                                           {})['result']['volumes']
-        self.volume_map = {}
+        self._build_volume_map(sf_vols)
         for v in vrefs:
             seek_name = '%s%s' % (self.configuration.sf_volume_prefix, v['id'])
             sfvol = next(
@@ -412,11 +521,10 @@ class SolidFireDriver(san.SanISCSIDriver):
         url = '%s/json-rpc/%s/' % (endpoint['url'], version)
         with warnings.catch_warnings():
             warnings.simplefilter("ignore", exceptions.InsecureRequestWarning)
-            req = requests.post(url,
-                                data=json.dumps(payload),
-                                auth=(endpoint['login'], endpoint['passwd']),
-                                verify=False,
-                                timeout=30)
+            req = self.http_client.post(
+                url,
+                data=json.dumps(payload),
+                auth=(endpoint['login'], endpoint['passwd']))
         response = req.json()
         req.close()
         if (('error' in response) and
@@ -613,6 +721,7 @@ class SolidFireDriver(san.SanISCSIDriver):
 
         params['attributes'] = attributes
         data = self._issue_api_request('ModifyVolume', params)
+        self._map_sf_volume(vref['id'], sf_volume_id)
 
         model_update = self._get_model_info(sf_account, sf_volume_id)
         if model_update is None:
@@ -639,6 +748,11 @@ class SolidFireDriver(san.SanISCSIDriver):
         params['accountID'] = sf_account['accountID']
         sf_volid = self._issue_api_request(
             'CreateVolume', params, endpoint=endpoint)['result']['volumeID']
+        attributes = params.get('attributes') or {}
+        # NOTE: migration targets are named after their source volume
+        if (endpoint is None and 'uuid' in attributes and
+                'migration_uuid' not in attributes):
+            self._map_sf_volume(attributes['uuid'], sf_volid)
         return self._get_model_info(sf_account, sf_volid, endpoint=endpoint)
 
     def _do_snapshot_create(self, params):
@@ -696,6 +810,13 @@ class SolidFireDriver(san.SanISCSIDriver):
         return qos
 
     def _get_sf_volume(self, uuid, params=None):
+        account_ids = None
+        if isinstance(params, dict) and 'accountID' in params:
+            account_ids = [params['accountID']]
+        sf_volref = self._get_mapped_sf_volume(uuid, account_ids)
+        if sf_volref:
+            return sf_volref
+
         if params:
             vols = self._issue_api_request(
                 'ListVolumesForAccount', params)['result']['volumes']
@@ -704,17 +825,8 @@ class SolidFireDriver(san.SanISCSIDriver):
                 'ListActiveVolumes', params)['result']['volumes']
 
         found_count = 0
-        sf_volref = None
         for v in vols:
-            # NOTE(jdg): In the case of "name" we can't
-            # update that on manage/import, so we use
-            # the uuid attribute
-            meta = v.get('attributes')
-            alt_id = ''
-            if meta:
-                alt_id = meta.get('uuid', '')
-
-            if uuid in v['name'] or uuid in alt_id:
+            if self._sf_volume_matches(v, uuid):
                 found_count += 1
                 sf_volref = v
                 LOG.debug("Mapped SolidFire volumeID %(volume_id)s "
@@ -733,6 +845,8 @@ class SolidFireDriver(san.SanISCSIDriver):
                        'uuid': uuid})
             raise exception.DuplicateSfVolumeNames(vol_name=uuid)
 
+        if sf_volref and sf_volref.get('status', 'active') == 'active':
+            self._map_sf_volume(uuid, sf_volref['volumeID'])
         return sf_volref
 
     def _get_sf_snapshots(self, sf_volid=None):
@@ -1205,6 +1319,7 @@ class SolidFireDriver(san.SanISCSIDriver):
             with excutils.save_and_reraise_exception():
                 sf_volid = int(model_update['provider_id'].split()[0])
                 self._issue_api_request('DeleteVolume', {'volumeID': sf_volid})
+                self._unmap_sf_volume(volume['id'])
         return model_update
 
     def _retrieve_replication_settings(self, volume):
@@ -1301,7 +1416,6 @@ class SolidFireDriver(san.SanISCSIDriver):
          volumeID is what's guaranteed unique.
 
         """
-        sf_vol = None
         accounts = self._get_sfaccounts_for_tenant(volume['project_id'])
         if accounts is None:
             LOG.error(_LE("Account for Volume ID %s was not found on "
@@ -1311,12 +1425,15 @@ class SolidFireDriver(san.SanISCSIDriver):
                           "successfully created."))
             return
 
-        for acc in accounts:
-            vols = self._get_volumes_for_account(acc['accountID'],
-                                                 volume['id'])
-            if vols:
-                sf_vol = vols[0]
-                break
+        sf_vol = self._get_mapped_sf_volume(
+            volume['id'], [acc['accountID'] for acc in accounts])
+        if sf_vol is None:
+            for acc in accounts:
+                vols = self._get_volumes_for_account(acc['accountID'],
+                                                     volume['id'])
+                if vols:
+                    sf_vol = vols[0]
+                    break
 
         if sf_vol is not None:
             for vp in sf_vol.get('volumePairs', []):
@@ -1335,6 +1452,7 @@ class SolidFireDriver(san.SanISCSIDriver):
             if sf_vol['status'] == 'active':
                 params = {'volumeID': sf_vol['volumeID']}
                 self._issue_api_request('DeleteVolume', params)
+            self._unmap_sf_volume(volume['id'])
             if volume.get('multiattach'):
                 self._remove_volume_from_vags(sf_vol['volumeID'])
         else:
@@ -1587,6 +1705,11 @@ class SolidFireDriver(san.SanISCSIDriver):
                 self._update_cluster_status()
             except exception.SolidFireAPIException:
                 pass
+            try:
+                self._refresh_volume_map()
+            except exception.SolidFireAPIException:
+                LOG.warning(_LW("Failed to refresh the SolidFire volume "
+                                "mapping."))
 
         return self.cluster_stats
 
@@ -1812,6 +1935,7 @@ class SolidFireDriver(san.SanISCSIDriver):
 
         self._issue_api_request('ModifyVolume',
                                 params, version='5.0')
+        self._map_sf_volume(volume['id'], sf_ref['volumeID'])
 
         return self._get_model_info(sfaccount, sf_ref['volumeID'])
 
@@ -1855,6 +1979,7 @@ class SolidFireDriver(san.SanISCSIDriver):
 
         self._issue_api_request('ModifyVolume',
                                 params, version='5.0')
+        self._unmap_sf_volume(volume['id'])
 
     def _failover_volume(self, remote_vol, remote):
         """Modify remote volume to R/W mode."""
@@ -1929,6 +2054,7 @@ class SolidFireDriver(san.SanISCSIDriver):
         # but for now that's going to be the trade off of using replciation
         self.active_cluster_info = remote
         self.failed_over = True
+        self._reset_volume_map()
         return remote['mvip'], volume_updates
 
     def freeze_backend(self, context):
@@ -27,7 +27,6 @@ from oslo_config import cfg
 from oslo_log import log as logging
 from oslo_service import loopingcall
 from oslo_utils import units
-import requests
 from six.moves import urllib
 
 from cinder import exception
@@ -36,6 +35,7 @@ from cinder.i18n import _, _LE, _LI, _LW
 from cinder.image import image_utils
 from cinder.volume import driver
 from cinder.volume.drivers import nfs
+from cinder.volume import http_client
 
 LOG = logging.getLogger(__name__)
 default_api_version = 'v310'
@@ -80,6 +80,7 @@ class TintriDriver(driver.ManageableVD,
                 -- Retype
                 -- Image cache clean up
                 -- Direct image clone fix
+                -- Reuse keep-alive connections for REST calls
     """
 
     VENDOR = 'Tintri'
@@ -93,8 +94,13 @@ class TintriDriver(driver.ManageableVD,
         super(TintriDriver, self).__init__(*args, **kwargs)
         self._execute_as_root = True
         self.configuration.append_config_values(tintri_opts)
+        self.configuration.append_config_values(http_client.http_client_opts)
         self.cache_cleanup = False
         self._mounted_image_shares = []
+        # NOTE: The client is shared by the TClients of the driver, which
+        # send their own session cookie.
+        self._http_client = http_client.HTTPClient(self.configuration,
+                                                   cookies=False)
 
     def do_setup(self, context):
         self._image_shares_config = getattr(self.configuration,
@@ -122,7 +128,7 @@ class TintriDriver(driver.ManageableVD,
     def _get_client(self):
         """Returns a Tintri REST client connection."""
         return TClient(self._hostname, self._username, self._password,
-                       self._api_version)
+                       self._api_version, http=self._http_client)
 
     def create_snapshot(self, snapshot):
         """Creates a snapshot."""
@@ -818,10 +824,11 @@ class TClient(object):
     """REST client for Tintri storage."""
 
     def __init__(self, hostname, username, password,
-                 api_version=default_api_version):
+                 api_version=default_api_version, http=None):
         """Initializes a connection to Tintri server."""
         self.api_url = 'https://' + hostname + '/api'
         self.api_version = api_version
+        self.http = http or http_client.HTTPClient(cookies=False)
         self.session_id = self.login(username, password)
         self.headers = {'content-type': 'application/json',
                         'cookie': 'JSESSIONID=' + self.session_id}
@@ -838,25 +845,24 @@ class TClient(object):
     def get_query(self, api, query):
         url = self.api_url + api
 
-        return requests.get(url, headers=self.headers,
-                            params=query, verify=False)
+        return self.http.get(url, headers=self.headers, params=query)
 
     def delete(self, api):
         url = self.api_url + api
 
-        return requests.delete(url, headers=self.headers, verify=False)
+        return self.http.delete(url, headers=self.headers)
 
     def put(self, api, payload):
         url = self.api_url + api
 
-        return requests.put(url, data=json.dumps(payload),
-                            headers=self.headers, verify=False)
+        return self.http.put(url, data=json.dumps(payload),
+                             headers=self.headers)
 
     def post(self, api, payload):
         url = self.api_url + api
 
-        return requests.post(url, data=json.dumps(payload),
-                             headers=self.headers, verify=False)
+        return self.http.post(url, data=json.dumps(payload),
+                              headers=self.headers)
 
     def login(self, username, password):
         # Payload, header and URL for login
@@ -869,8 +875,7 @@ class TClient(object):
                              'RestApiCredentials'}
         url = self.api_url + '/' + self.api_version + '/session/login'
 
-        r = requests.post(url, data=json.dumps(payload),
-                          headers=headers, verify=False)
+        r = self.http.post(url, data=json.dumps(payload), headers=headers)
 
         if r.status_code != 200:
             msg = _('Failed to login for user %s.') % username
@@ -881,7 +886,7 @@ class TClient(object):
     def logout(self):
         url = self.api_url + '/' + self.api_version + '/session/logout'
 
-        requests.get(url, headers=self.headers, verify=False)
+        self.http.get(url, headers=self.headers)
 
     @staticmethod
     def _remove_prefix(volume_path, prefix):
@@ -0,0 +1,141 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Pooled keep-alive HTTP client for REST based volume drivers."""
+
+
+import threading
+
+from oslo_config import cfg
+from oslo_log import log as logging
+import requests
+from requests import adapters
+from six.moves import http_cookiejar
+
+
+LOG = logging.getLogger(__name__)
+
+http_client_opts = [
+    cfg.IntOpt('http_pool_maxsize',
+               default=10,
+               min=1,
+               help='Maximum number of keep-alive connections a volume '
+                    'backend keeps open to each of its HTTP API '
+                    'endpoints.'),
+    cfg.IntOpt('http_timeout',
+               min=1,
+               help='Timeout in seconds of HTTP API requests to a volume '
+                    'backend. When not set the default of the volume driver '
+                    'is used.'),
+    cfg.IntOpt('http_max_retries',
+               default=0,
+               min=0,
+               help='Number of times an HTTP API request to a volume backend '
+                    'is retried when the connection to the endpoint cannot '
+                    'be established. Requests are never resent once they '
+                    'reached the endpoint.'),
+    cfg.FloatOpt('http_retry_backoff',
+                 default=0.5,
+                 min=0,
+                 help='Backoff factor in seconds between the connection '
+                      'retries of HTTP API requests.'),
+]
+
+CONF = cfg.CONF
+CONF.register_opts(http_client_opts)
+
+
+class HTTPClient(object):
+    """HTTP client keeping the connections to a backend open.
+
+    Each instance owns a requests.Session whose connections are pooled per
+    endpoint and reused across calls, so consecutive API calls don't pay for
+    a new TCP connection and TLS handshake. The session, including its
+    cookies, is not shared with other instances.
+
+    Clients sending their own session cookie, and sharing one instance
+    between several API sessions, pass cookies=False so that the cookies
+    set by the endpoint are never kept and sent back by the session.
+    """
+
+    def __init__(self, configuration=None, timeout=None, verify=False,
+                 cookies=True):
+        self.configuration = configuration
+        self.verify = verify
+        self.cookies = cookies
+        self._timeout = timeout
+        self._session = None
+        self._lock = threading.Lock()
+
+    def _get_opt(self, name):
+        value = None
+        if self.configuration is not None:
+            value = self.configuration.safe_get(name)
+        return CONF[name] if value is None else value
+
+    @property
+    def timeout(self):
+        return self._get_opt('http_timeout') or self._timeout
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._create_session()
+        return self._session
+
+    def _create_session(self):
+        pool_maxsize = self._get_opt('http_pool_maxsize')
+        retries = adapters.Retry(
+            total=self._get_opt('http_max_retries'), read=False,
+            backoff_factor=self._get_opt('http_retry_backoff'))
+        LOG.debug("Creating HTTP session with a pool of %(size)s "
+                  "connections per endpoint.", {'size': pool_maxsize})
+        session = requests.Session()
+        if not self.cookies:
+            session.cookies.set_policy(
+                http_cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+        adapter = adapters.HTTPAdapter(pool_maxsize=pool_maxsize,
+                                       max_retries=retries)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def request(self, method, url, **kwargs):
+        """Send a request on a pooled connection.
+
+        Takes the arguments of requests.request, the timeout and
+        certificate verification of the client are used unless given.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        kwargs.setdefault('verify', self.verify)
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request('PUT', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+    def close(self):
+        """Close the pooled connections."""
+        with self._lock:
+            session, self._session = self._session, None
+        if session is not None:
+            session.close()
@@ -36,9 +36,12 @@ intact.
 
 """
 
+import copy
+import functools
 import requests
 import time
 
+from eventlet import greenpool
 from oslo_config import cfg
 from oslo_log import log as logging
 import oslo_messaging as messaging
@@ -71,6 +74,7 @@ from cinder.volume.flows.manager import create_volume
 from cinder.volume.flows.manager import manage_existing
 from cinder.volume.flows.manager import manage_existing_snapshot
 from cinder.volume import rpcapi as volume_rpcapi
+from cinder.volume import throttling
 from cinder.volume import utils as vol_utils
 from cinder.volume import volume_types
 
@@ -116,6 +120,39 @@ volume_manager_opts = [
     cfg.BoolOpt('suppress_requests_ssl_warnings',
                 default=False,
                 help='Suppress requests library SSL certificate warnings.'),
+    cfg.BoolOpt('driver_stats_async',
+                default=False,
+                help='Collect the driver stats in a separate green thread. '
+                     'The last collected stats are reported to the '
+                     'schedulers while a collection is in progress, and a '
+                     'new collection is not started until at least as long '
+                     'as the previous one took has passed.'),
+    cfg.IntOpt('driver_stats_timeout',
+               default=600,
+               help='Seconds after which an asynchronous driver stats '
+                    'collection is abandoned and a new one started.'),
+    cfg.IntOpt('init_host_export_workers',
+               default=1,
+               help='Number of green threads recreating the exports of the '
+                    'in-use volumes when the volume service starts.'),
+    cfg.IntOpt('max_concurrent_image_operations',
+               default=0,
+               help='Maximum number of volume creations from an image and '
+                    'uploads of a volume to an image that run at the same '
+                    'time. Further ones wait for a running one to finish. '
+                    '0 means unlimited.'),
+    cfg.IntOpt('max_concurrent_volume_creates',
+               default=0,
+               help='Maximum number of volume creations, other than from an '
+                    'image, that run at the same time. 0 means unlimited.'),
+    cfg.IntOpt('max_concurrent_volume_deletes',
+               default=0,
+               help='Maximum number of volume deletions that run at the '
+                    'same time. 0 means unlimited.'),
+    cfg.IntOpt('max_concurrent_volume_migrations',
+               default=0,
+               help='Maximum number of volume migrations that run at the '
+                    'same time. 0 means unlimited.'),
 ]
 
 CONF = cfg.CONF
@@ -149,6 +186,25 @@ MAPPING = {
 }
 
 
+def limited_operation(operation):
+    """Limit decorator for volume manager RPC casts.
+
+    When a limit is configured for the given class of operations, the
+    operation is queued in a greenthread of the operation limiter and runs
+    once fewer operations of the class than the limit are running. The RPC
+    executor thread is released at once and nothing is returned, so only
+    casts are decorated. Internal callers needing the operation to be done
+    when the call returns use the undecorated implementation.
+    """
+    def decorator(f):
+        @functools.wraps(f)
+        def wrapper(inst, *args, **kwargs):
+            return inst.operation_limiter.spawn(operation, f, inst,
+                                                *args, **kwargs)
+        return wrapper
+    return decorator
+
+
 def locked_volume_operation(f):
     """Lock decorator for volume operations.
 
@@ -237,6 +293,19 @@ class VolumeManager(manager.SchedulerDependentManager):
         self.configuration = config.Configuration(volume_manager_opts,
                                                   config_group=service_name)
         self.stats = {}
+        # State of the asynchronous driver stats collection.
+        self._driver_stats = None
+        self._driver_stats_thread = None
+        self._driver_stats_started_at = None
+        self._driver_stats_finished_at = None
+        # Seconds taken by the last driver stats collection.
+        self.driver_stats_duration = None
+        self.operation_limiter = throttling.OperationLimiter({
+            'image': self.configuration.max_concurrent_image_operations,
+            'create': self.configuration.max_concurrent_volume_creates,
+            'delete': self.configuration.max_concurrent_volume_deletes,
+            'migrate': self.configuration.max_concurrent_volume_migrations,
+        })
 
         if not volume_driver:
             # Get from configuration, which will get the default
@@ -359,6 +428,33 @@ class VolumeManager(manager.SchedulerDependentManager):
         self.stats['pools'][pool]['allocated_capacity_gb'] = pool_sum
         self.stats['allocated_capacity_gb'] += volume['size']
 
+    def _ensure_exports(self, ctxt, volumes):
+        """Recreates the exports of the volumes on init_host.
+
+        The volumes are split between init_host_export_workers green
+        threads, each handing its share to the driver's ensure_exports.
+
+        :returns: Dictionary of the ids of the volumes whose export could not
+                  be recreated to the exception raised
+        """
+        if not volumes:
+            return {}
+        workers = max(1, self.configuration.init_host_export_workers)
+        batches = [volumes[i::workers] for i in range(workers)]
+
+        def ensure_batch(batch):
+            try:
+                return self.driver.ensure_exports(ctxt, batch)
+            except Exception as e:
+                LOG.exception(_LE("Failed to re-export volumes."))
+                return {volume.id: e for volume in batch}
+
+        failed = {}
+        pool = greenpool.GreenPool(workers)
+        for result in pool.imap(ensure_batch, [b for b in batches if b]):
+            failed.update(result)
+        return failed
+
     def _set_voldb_empty_at_startup_indicator(self, ctxt):
         """Determine if the Cinder volume DB is empty.
 
@@ -443,21 +539,16 @@ class VolumeManager(manager.SchedulerDependentManager):
         try:
             self.stats['pools'] = {}
             self.stats.update({'allocated_capacity_gb': 0})
+            to_export = []
+            to_error = []
             for volume in volumes:
                 # available volume should also be counted into allocated
                 if volume['status'] in ['in-use', 'available']:
                     # calculate allocated capacity for driver
                     self._count_allocated_capacity(ctxt, volume)
 
-                    try:
-                        if volume['status'] in ['in-use']:
-                            self.driver.ensure_export(ctxt, volume)
-                    except Exception:
-                        LOG.exception(_LE("Failed to re-export volume, "
-                                          "setting to ERROR."),
-                                      resource=volume)
-                        volume.status = 'error'
-                        volume.save()
+                    if volume['status'] in ['in-use']:
+                        to_export.append(volume)
                 elif volume['status'] in ('downloading', 'creating'):
                     LOG.warning(_LW("Detected volume stuck "
                                     "in %(curr_status)s "
@@ -467,21 +558,35 @@ class VolumeManager(manager.SchedulerDependentManager):
 
                     if volume['status'] == 'downloading':
                         self.driver.clear_download(ctxt, volume)
-                    volume.status = 'error'
-                    volume.save()
+                    to_error.append(volume)
                 elif volume.status == 'uploading':
                         # Set volume status to available or in-use.
                         self.db.volume_update_status_based_on_attachment(
                             ctxt, volume.id)
                 else:
                     pass
+
+            failed = self._ensure_exports(ctxt, to_export)
+            for volume in to_export:
+                if volume.id in failed:
+                    LOG.error(_LE("Failed to re-export volume, "
+                                  "setting to ERROR."), resource=volume)
+                    to_error.append(volume)
+
+            # Apply the status corrections in a single update.
+            self.db.volume_update_all(ctxt, [v.id for v in to_error],
+                                      {'status': 'error'})
+            for volume in to_error:
+                volume.status = 'error'
+                volume.obj_reset_changes(['status'])
+
             snapshots = objects.SnapshotList.get_by_host(
                 ctxt, self.host, {'status': 'creating'})
             for snapshot in snapshots:
                 LOG.warning(_LW("Detected snapshot stuck in creating "
                             "status, setting to ERROR."), resource=snapshot)
-                snapshot.status = 'error'
-                snapshot.save()
+            self.db.snapshot_update_all(ctxt, [s.id for s in snapshots],
+                                        {'status': 'error'})
         except Exception:
             LOG.exception(_LE("Error during re-export on driver init."),
                           resource=volume)
@@ -557,6 +662,16 @@ class VolumeManager(manager.SchedulerDependentManager):
                       filter_properties=None, allow_reschedule=True,
                       volume=None):
         """Creates the volume."""
+        image_id = request_spec and request_spec.get('image_id')
+        return self.operation_limiter.spawn(
+            'image' if image_id else 'create', self._create_volume,
+            context, volume_id, request_spec=request_spec,
+            filter_properties=filter_properties,
+            allow_reschedule=allow_reschedule, volume=volume)
+
+    def _create_volume(self, context, volume_id, request_spec=None,
+                       filter_properties=None, allow_reschedule=True,
+                       volume=None):
         # FIXME(thangp): Remove this in v2.0 of RPC API.
         if volume is None:
             # For older clients, mimic the old behavior and look up the volume
@@ -655,6 +770,7 @@ class VolumeManager(manager.SchedulerDependentManager):
         LOG.info(_LI("Created volume successfully."), resource=vol_ref)
         return vol_ref.id
 
+    @limited_operation('delete')
     @locked_volume_operation
     def delete_volume(self, context, volume_id,
                       unmanage_only=False,
@@ -1203,8 +1319,8 @@ class VolumeManager(manager.SchedulerDependentManager):
                       project_id=new_vol_values['project_id'])
 
         try:
-            self.create_volume(ctx, image_volume.id,
-                               allow_reschedule=False)
+            self._create_volume(ctx, image_volume.id,
+                                allow_reschedule=False)
             image_volume = self.db.volume_get(ctx, image_volume.id)
             if image_volume.status != 'available':
                 raise exception.InvalidVolume(_('Volume is not available.'))
@@ -1274,6 +1390,7 @@ class VolumeManager(manager.SchedulerDependentManager):
                                        False)
         return True
 
+    @limited_operation('image')
     def copy_volume_to_image(self, context, volume_id, image_meta):
         """Uploads the specified volume to Glance.
 
@@ -1918,9 +2035,16 @@ class VolumeManager(manager.SchedulerDependentManager):
                  resource=volume)
         return volume.id
 
+    @limited_operation('migrate')
     def migrate_volume(self, ctxt, volume_id, host, force_host_copy=False,
                        new_type_id=None, volume=None):
         """Migrate the volume to the specified host (called on source host)."""
+        return self._migrate_volume(ctxt, volume_id, host,
+                                    force_host_copy=force_host_copy,
+                                    new_type_id=new_type_id, volume=volume)
+
+    def _migrate_volume(self, ctxt, volume_id, host, force_host_copy=False,
+                        new_type_id=None, volume=None):
         # FIXME(thangp): Remove this in v2.0 of RPC API.
         if volume is None:
             # For older clients, mimic the old behavior and look up the volume
@@ -1998,7 +2122,13 @@ class VolumeManager(manager.SchedulerDependentManager):
                         resource={'type': 'driver',
                                   'id': self.driver.__class__.__name__})
         else:
-            volume_stats = self.driver.get_volume_stats(refresh=True)
+            if self.configuration.driver_stats_async:
+                self._refresh_driver_stats_async()
+                if self._driver_stats is None:
+                    return
+                volume_stats = copy.deepcopy(self._driver_stats)
+            else:
+                volume_stats = self._get_driver_stats()
             if self.extra_capabilities:
                 volume_stats.update(self.extra_capabilities)
             if volume_stats:
@@ -2009,9 +2139,64 @@ class VolumeManager(manager.SchedulerDependentManager):
                 volume_stats = (
                     self._append_filter_goodness_functions(volume_stats))
 
+                # Report the running and waiting limited operations
+                operation_stats = self.operation_limiter.get_stats()
+                if operation_stats:
+                    volume_stats['operation_limits'] = operation_stats
+
                 # queue it to be sent to the Schedulers.
                 self.update_service_capabilities(volume_stats)
 
+    def _get_driver_stats(self):
+        start = time.time()
+        volume_stats = self.driver.get_volume_stats(refresh=True)
+        self.driver_stats_duration = time.time() - start
+        LOG.debug("Driver %(driver)s took %(duration).2f seconds to collect "
+                  "its stats.",
+                  {'driver': self.driver.__class__.__name__,
+                   'duration': self.driver_stats_duration})
+        return volume_stats
+
+    def _refresh_driver_stats_async(self):
+        """Start collecting the driver stats unless already in progress."""
+        now = time.time()
+        if self._driver_stats_thread is not None:
+            timeout = self.configuration.driver_stats_timeout
+            if now - self._driver_stats_started_at < timeout:
+                LOG.debug("Driver stats collection still in progress, "
+                          "reporting the previous stats.")
+                return
+            LOG.warning(_LW("Driver %(driver)s did not collect its stats "
+                            "within %(timeout)s seconds, abandoning it."),
+                        {'driver': self.driver.__class__.__name__,
+                         'timeout': timeout})
+            self._driver_stats_thread.kill()
+            self._driver_stats_thread = None
+        elif (self._driver_stats_finished_at is not None and
+                self.driver_stats_duration and
+                now - self._driver_stats_finished_at <
+                self.driver_stats_duration):
+            # Slow drivers are given at least as much time between two
+            # collections as the last one took.
+            LOG.debug("Delaying the driver stats collection, the last one "
+                      "took %.2f seconds.", self.driver_stats_duration)
+            return
+
+        self._driver_stats_started_at = now
+        self._driver_stats_thread = self._tp.spawn(
+            self._collect_driver_stats)
+
+    def _collect_driver_stats(self):
+        thread = self._driver_stats_thread
+        try:
+            self._driver_stats = self._get_driver_stats()
+        except Exception:
+            LOG.exception(_LE("Failed to collect the driver stats."))
+        finally:
+            self._driver_stats_finished_at = time.time()
+            if self._driver_stats_thread is thread:
+                self._driver_stats_thread = None
+
     def _append_volume_stats(self, vol_stats):
         pools = vol_stats.get('pools', None)
         if pools and isinstance(pools, list):
@@ -2301,8 +2486,8 @@ class VolumeManager(manager.SchedulerDependentManager):
             volume.save()
 
             try:
-                self.migrate_volume(context, volume.id, host,
-                                    new_type_id=new_type_id)
+                self._migrate_volume(context, volume.id, host,
+                                     new_type_id=new_type_id)
             except Exception:
                 with excutils.save_and_reraise_exception():
                     _retype_error(context, volume, old_reservations,
@@ -13,9 +13,13 @@
 import abc
 
 from oslo_config import cfg
+from oslo_log import log as logging
 import six
 
+from cinder.i18n import _LE
+
 CONF = cfg.CONF
+LOG = logging.getLogger(__name__)
 
 
 @six.add_metaclass(abc.ABCMeta)
@@ -44,6 +48,23 @@ class Target(object):
         """Synchronously recreates an export for a volume."""
         pass
 
+    def ensure_exports(self, context, volumes):
+        """Synchronously recreates the exports for a list of volumes.
+
+        :param volumes: List of (volume, volume_path) tuples
+        :returns: Dictionary of the ids of the volumes whose export could not
+                  be recreated to the exception raised
+        """
+        failed = {}
+        for volume, volume_path in volumes:
+            try:
+                self.ensure_export(context, volume, volume_path)
+            except Exception as e:
+                LOG.exception(_LE("Failed to re-export volume %s."),
+                              volume['id'])
+                failed[volume['id']] = e
+        return failed
+
     @abc.abstractmethod
     def create_export(self, context, volume, volume_path):
         """Exports a Target/Volume.
@@ -10,8 +10,11 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import threading
+
 from oslo_concurrency import processutils as putils
 from oslo_log import log as logging
+import six
 
 from cinder import exception
 from cinder.i18n import _LE, _LI, _LW
@@ -31,6 +34,12 @@ class LioAdm(iscsi.ISCSITarget):
         self.iscsi_target_prefix =\
             self.configuration.safe_get('iscsi_target_prefix')
 
+        # Configuration saves are coalesced: a save that starts after a
+        # change was requested persists it for every waiting caller.
+        self._save_lock = threading.Lock()
+        self._save_requests = 0
+        self._saved_requests = 0
+
         self._verify_rtstool()
 
     def _verify_rtstool(self):
@@ -51,17 +60,30 @@ class LioAdm(iscsi.ISCSITarget):
         """
         return utils.execute(*args, **kwargs)
 
-    def _get_target(self, iqn):
-        (out, err) = self._execute('cinder-rtstool',
-                                   'get-targets',
-                                   run_as_root=True)
-        lines = out.split('\n')
-        for line in lines:
+    def _execute_batch(self, *commands):
+        """Runs several cinder-rtstool commands in a single process."""
+        process_input = '\n'.join(
+            ' '.join(six.moves.shlex_quote(six.text_type(arg))
+                     for arg in command)
+            for command in commands)
+        return self._execute('cinder-rtstool', 'batch',
+                             process_input=process_input,
+                             run_as_root=True)
+
+    @staticmethod
+    def _find_target(targets, iqn):
+        for line in targets.split('\n'):
             if iqn in line:
                 return line
 
         return None
 
+    def _get_target(self, iqn):
+        (out, err) = self._execute('cinder-rtstool',
+                                   'get-targets',
+                                   run_as_root=True)
+        return self._find_target(out, iqn)
+
     def _get_targets(self):
         (out, err) = self._execute('cinder-rtstool',
                                    'get-targets',
@@ -77,15 +99,23 @@ class LioAdm(iscsi.ISCSITarget):
         return iscsi_target, lun
 
     def _persist_configuration(self, vol_id):
-        try:
-            self._execute('cinder-rtstool', 'save', run_as_root=True)
-
-        # On persistence failure we don't raise an exception, as target has
-        # been successfully created.
-        except putils.ProcessExecutionError:
-            LOG.warning(_LW("Failed to save iscsi LIO configuration when "
-                            "modifying volume id: %(vol_id)s."),
-                        {'vol_id': vol_id})
+        self._save_requests += 1
+        request = self._save_requests
+        with self._save_lock:
+            # A save started after our change already persisted it.
+            if self._saved_requests >= request:
+                return
+            pending = self._save_requests
+            try:
+                self._execute('cinder-rtstool', 'save', run_as_root=True)
+                self._saved_requests = pending
+
+            # On persistence failure we don't raise an exception, as target
+            # has been successfully created.
+            except putils.ProcessExecutionError:
+                LOG.warning(_LW("Failed to save iscsi LIO configuration when "
+                                "modifying volume id: %(vol_id)s."),
+                            {'vol_id': vol_id})
 
     def _restore_configuration(self):
         try:
@@ -117,14 +147,14 @@ class LioAdm(iscsi.ISCSITarget):
             optional_args.append('-a' + ','.join(kwargs['portals_ips']))
 
         try:
-            command_args = ['cinder-rtstool',
-                            'create',
+            command_args = ['create',
                             path,
                             name,
                             chap_auth_userid,
                             chap_auth_password,
                             self.iscsi_protocol == 'iser'] + optional_args
-            self._execute(*command_args, run_as_root=True)
+            # The new target is looked up by the same cinder-rtstool process
+            (out, err) = self._execute_batch(command_args, ['get-targets'])
         except putils.ProcessExecutionError:
             LOG.exception(_LE("Failed to create iscsi target for volume "
                               "id:%s."), vol_id)
@@ -132,7 +162,7 @@ class LioAdm(iscsi.ISCSITarget):
             raise exception.ISCSITargetCreateFailed(volume_id=vol_id)
 
         iqn = '%s%s' % (self.iscsi_target_prefix, vol_id)
-        tid = self._get_target(iqn)
+        tid = self._find_target(out, iqn)
         if tid is None:
             LOG.error(_LE("Failed to create iscsi target for volume "
                           "id:%s."), vol_id)
@@ -214,3 +244,18 @@ class LioAdm(iscsi.ISCSITarget):
             return
 
         LOG.info(_LI("Skipping ensure_export. Found existing iSCSI target."))
+
+    def ensure_exports(self, context, volumes):
+        """Recreate exports for a list of logical volumes.
+
+        The saved configuration holds every target, so it is restored at
+        most once for the whole list instead of once per volume.
+        """
+        if not volumes:
+            return {}
+        try:
+            self.ensure_export(context, *volumes[0])
+        except Exception as e:
+            LOG.exception(_LE("Failed to restore iSCSI targets."))
+            return {volume['id']: e for volume, volume_path in volumes}
+        return {}
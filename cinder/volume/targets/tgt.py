@@ -114,6 +114,42 @@ class TgtAdm(iscsi.ISCSITarget):
         iscsi_target = 0  # NOTE(jdg): Not used by tgtadm
         return iscsi_target, lun
 
+    def _get_targets_status(self):
+        """Map the iqn of every target tgtd knows of to its status.
+
+        Each value is a (tid, backing_lun) tuple, where backing_lun tells
+        whether LUN 1 is present, so that a whole set of targets can be
+        verified with a single 'tgt-admin --show'.
+        """
+        (out, err) = utils.execute('tgt-admin', '--show', run_as_root=True)
+        targets = {}
+        iqn = None
+        for line in out.split('\n'):
+            if line.startswith('Target '):
+                parsed = line.split()
+                iqn = parsed[2]
+                targets[iqn] = (parsed[1][:-1], False)
+            elif iqn is not None and line == '        LUN: 1':
+                targets[iqn] = (targets[iqn][0], True)
+        return targets
+
+    def _get_volume_conf(self, name, path, chap_auth=None):
+        write_cache = self.configuration.get('iscsi_write_cache', 'on')
+        driver = self.iscsi_protocol
+        chap_str = ''
+
+        if chap_auth is not None:
+            chap_str = 'incominguser %s %s' % chap_auth
+
+        target_flags = self.configuration.get('iscsi_target_flags', '')
+        if target_flags:
+            target_flags = 'bsoflags ' + target_flags
+
+        return self.VOLUME_CONF % {
+            'name': name, 'path': path, 'driver': driver,
+            'chap_auth': chap_str, 'target_flags': target_flags,
+            'write_cache': write_cache}
+
     @utils.retry(putils.ProcessExecutionError)
     def _do_tgt_update(self, name):
         (out, err) = utils.execute('tgt-admin', '--update', name,
@@ -142,21 +178,7 @@ class TgtAdm(iscsi.ISCSITarget):
         fileutils.ensure_tree(self.volumes_dir)
 
         vol_id = name.split(':')[1]
-        write_cache = self.configuration.get('iscsi_write_cache', 'on')
-        driver = self.iscsi_protocol
-        chap_str = ''
-
-        if chap_auth is not None:
-            chap_str = 'incominguser %s %s' % chap_auth
-
-        target_flags = self.configuration.get('iscsi_target_flags', '')
-        if target_flags:
-            target_flags = 'bsoflags ' + target_flags
-
-        volume_conf = self.VOLUME_CONF % {
-            'name': name, 'path': path, 'driver': driver,
-            'chap_auth': chap_str, 'target_flags': target_flags,
-            'write_cache': write_cache}
+        volume_conf = self._get_volume_conf(name, path, chap_auth)
 
         LOG.debug('Creating iscsi_target for Volume ID: %s', vol_id)
         volumes_dir = self.volumes_dir
@@ -247,6 +269,55 @@ class TgtAdm(iscsi.ISCSITarget):
 
         return tid
 
+    def ensure_exports(self, context, volumes):
+        """Recreates the exports for a list of logical volumes.
+
+        All the persistence files are written first and tgtd is then
+        updated with a single 'tgt-admin --update ALL'.  Only the targets
+        that are still missing or lack their backing lun afterwards go
+        through the per volume create_iscsi_target path.
+        """
+        if not volumes:
+            return {}
+
+        fileutils.ensure_tree(self.volumes_dir)
+        portals_config = self._get_portals_config()
+        pending = []
+        for volume, volume_path in volumes:
+            iscsi_name = "%s%s" % (self.configuration.iscsi_target_prefix,
+                                   volume['name'])
+            chap_auth = self._get_target_chap_auth(context, iscsi_name)
+            volume_conf = self._get_volume_conf(iscsi_name, volume_path,
+                                                chap_auth)
+            utils.robust_file_write(self.volumes_dir,
+                                    iscsi_name.split(':')[1], volume_conf)
+            pending.append((volume, volume_path, iscsi_name, chap_auth))
+
+        try:
+            self._do_tgt_update('ALL')
+        except putils.ProcessExecutionError as e:
+            # Some of the targets may still have been created, the ones
+            # that were not are handled one by one below.
+            LOG.warning(_LW('Failed to update all iscsi targets at once: '
+                            '%s'), e)
+
+        targets = self._get_targets_status()
+        failed = {}
+        for volume, volume_path, iscsi_name, chap_auth in pending:
+            if targets.get(iscsi_name, (None, False))[1]:
+                continue
+            try:
+                iscsi_target, lun = self._get_target_and_lun(context, volume)
+                self.create_iscsi_target(
+                    iscsi_name, iscsi_target, lun, volume_path,
+                    chap_auth, check_exit_code=False,
+                    old_name=None, **portals_config)
+            except Exception as e:
+                LOG.exception(_LE("Failed to re-export volume %s."),
+                              volume['id'])
+                failed[volume['id']] = e
+        return failed
+
     def remove_iscsi_target(self, tid, lun, vol_id, vol_name, **kwargs):
         LOG.info(_LI('Removing iscsi_target for Volume ID: %s'), vol_id)
         vol_uuid_file = vol_name
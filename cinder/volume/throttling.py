@@ -13,11 +13,15 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-"""Volume copy throttling helpers."""
+"""Volume copy and operation throttling helpers."""
 
 
 import contextlib
+import copy
+import time
 
+from eventlet import greenpool
+from eventlet import semaphore
 from oslo_concurrency import processutils
 from oslo_log import log as logging
 
@@ -129,3 +133,74 @@ class BlkioCgroup(Throttle):
             yield {'prefix': ['cgexec', '-g', 'blkio:%s' % self.cgroup]}
         finally:
             self._dec_device(srcdev, dstdev)
+
+
+class OperationLimiter(object):
+    """Limits the number of operations of a class running at the same time.
+
+    Operations beyond the limit of their class wait for a running one to
+    finish, blocking the greenthread that runs them. Classes without a
+    positive limit are not limited.
+    """
+
+    def __init__(self, limits):
+        self._pool = greenpool.GreenPool()
+        self._semaphores = {}
+        self._stats = {}
+        for operation, limit in limits.items():
+            if limit and limit > 0:
+                self._semaphores[operation] = semaphore.Semaphore(limit)
+                self._stats[operation] = {'limit': limit,
+                                          'running': 0,
+                                          'waiting': 0,
+                                          'last_wait_time': 0.0}
+
+    @contextlib.contextmanager
+    def limit(self, operation):
+        sem = self._semaphores.get(operation)
+        if sem is None:
+            yield
+            return
+
+        stats = self._stats[operation]
+        stats['waiting'] += 1
+        start = time.time()
+        try:
+            sem.acquire()
+        finally:
+            stats['waiting'] -= 1
+        waited = time.time() - start
+        stats['last_wait_time'] = round(waited, 3)
+        if waited >= 1:
+            LOG.debug("Operation %(op)s waited %(time).2f seconds to run.",
+                      {'op': operation, 'time': waited})
+
+        stats['running'] += 1
+        try:
+            yield
+        finally:
+            stats['running'] -= 1
+            sem.release()
+
+    def spawn(self, operation, func, *args, **kwargs):
+        """Runs func once an operation of its class may start.
+
+        Operations of a limited class wait for their turn in a greenthread
+        of the limiter's own pool, so the caller returns at once and gets
+        None back. Other operations run in the caller, which gets their
+        result.
+        """
+        if operation not in self._semaphores:
+            return func(*args, **kwargs)
+        self._pool.spawn_n(self._run, operation, func, *args, **kwargs)
+
+    def _run(self, operation, func, *args, **kwargs):
+        try:
+            with self.limit(operation):
+                func(*args, **kwargs)
+        except Exception:
+            LOG.exception(_LE("Limited operation %s failed."), operation)
+
+    def get_stats(self):
+        """Get the limit, running and waiting counts of each class."""
+        return copy.deepcopy(self._stats)
@@ -17,6 +17,7 @@
 
 import ast
 import math
+import os
 import re
 import time
 import uuid
@@ -469,6 +470,40 @@ def copy_volume(src, dest, size_in_m, blocksize, sync=False,
         _copy_volume_with_file(src, dest, size_in_m)
 
 
+def _read_block_device_queue_attr(device_path, attr):
+    """Returns an integer queue attribute of a block device from sysfs."""
+    dev_name = os.path.basename(os.path.realpath(device_path))
+    try:
+        with open('/sys/block/%s/queue/%s' % (dev_name, attr)) as f:
+            return int(f.read().strip())
+    except (IOError, OSError, ValueError):
+        return 0
+
+
+def get_discard_clear_cmd(device_path, volume_clear_size=None):
+    """Returns the command clearing a device by discarding its blocks.
+
+    Discarding is only used if the device guarantees that discarded blocks
+    read back as zeroes. Otherwise, if the device can zero blocks itself
+    (WRITE SAME or WRITE ZEROES), blkdiscard is asked to zero them. Returns
+    None if the device can do neither.
+    """
+    if (_read_block_device_queue_attr(device_path, 'discard_max_bytes') and
+            _read_block_device_queue_attr(device_path,
+                                          'discard_zeroes_data')):
+        clear_cmd = ['blkdiscard']
+    elif _read_block_device_queue_attr(device_path,
+                                       'write_zeroes_max_bytes'):
+        clear_cmd = ['blkdiscard', '-z']
+    else:
+        return None
+
+    if volume_clear_size:
+        clear_cmd.extend(['-l', '%d' % (volume_clear_size * units.Mi)])
+    clear_cmd.append(device_path)
+    return clear_cmd
+
+
 def clear_volume(volume_size, volume_path, volume_clear=None,
                  volume_clear_size=None, volume_clear_ionice=None,
                  throttle=None):
@@ -487,6 +522,13 @@ def clear_volume(volume_size, volume_path, volume_clear=None,
 
     LOG.info(_LI("Performing secure delete on volume: %s"), volume_path)
 
+    if volume_clear == 'discard':
+        clear_cmd = get_discard_clear_cmd(volume_path, volume_clear_size)
+        if clear_cmd is None:
+            LOG.info(_LI("Device %s cannot be cleared by discarding it, "
+                         "zeroing it instead."), volume_path)
+            volume_clear = 'zero'
+
     # We pass sparse=False explicitly here so that zero blocks are not
     # skipped in order to clear the volume.
     if volume_clear == 'zero':
@@ -499,12 +541,12 @@ def clear_volume(volume_size, volume_path, volume_clear=None,
         clear_cmd = ['shred', '-n3']
         if volume_clear_size:
             clear_cmd.append('-s%dMiB' % volume_clear_size)
-    else:
+        clear_cmd.append(volume_path)
+    elif volume_clear != 'discard':
         raise exception.InvalidConfigurationValue(
             option='volume_clear',
             value=volume_clear)
 
-    clear_cmd.append(volume_path)
     start_time = timeutils.utcnow()
     utils.execute(*clear_cmd, run_as_root=True)
     duration = timeutils.delta_seconds(start_time, timeutils.utcnow())
@@ -56,6 +56,7 @@ def create(context,
         LOG.exception(_LE('DB error:'))
         raise exception.VolumeTypeCreateFailed(name=name,
                                                extra_specs=extra_specs)
+    QUOTAS.invalidate_resources()
     return type_ref
 
 
@@ -79,6 +80,7 @@ def update(context, id, name, description, is_public=None):
                 QUOTAS.update_quota_resource(elevated,
                                              old_type_name,
                                              name)
+                QUOTAS.invalidate_resources()
     except db_exc.DBError:
         LOG.exception(_LE('DB error:'))
         raise exception.VolumeTypeUpdateFailed(id=id)
@@ -93,6 +95,7 @@ def destroy(context, id):
     else:
         elevated = context if context.is_admin else context.elevated()
         db.volume_type_destroy(elevated, id)
+        QUOTAS.invalidate_resources()
 
 
 def get_all_types(context, inactive=0, filters=None, marker=None,
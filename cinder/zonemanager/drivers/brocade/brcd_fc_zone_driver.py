@@ -28,7 +28,8 @@ add_connection and delete_connection interfaces.
 """
 
 
-from oslo_concurrency import lockutils
+import functools
+
 from oslo_config import cfg
 from oslo_log import log as logging
 from oslo_utils import excutils
@@ -42,6 +43,7 @@ from cinder.zonemanager.drivers.brocade import brcd_fabric_opts as fabric_opts
 from cinder.zonemanager.drivers.brocade import fc_zone_constants
 from cinder.zonemanager.drivers import driver_utils
 from cinder.zonemanager.drivers import fc_zone_driver
+from cinder.zonemanager import fc_zone_service
 from cinder.zonemanager import utils
 
 LOG = logging.getLogger(__name__)
@@ -69,16 +71,20 @@ class BrcdFCZoneDriver(fc_zone_driver.FCZoneDriver):
         1.2 - Added support for friendly zone name
         1.3 - Added HTTP connector support
         1.4 - Adds support to zone in Virtual Fabrics
+        1.5 - Coalesces zoning requests per fabric and reuses connections
     """
 
-    VERSION = "1.4"
+    VERSION = "1.5"
 
     def __init__(self, **kwargs):
         super(BrcdFCZoneDriver, self).__init__(**kwargs)
         self.sb_conn_map = {}
+        self.zone_services = {}
         self.configuration = kwargs.get('configuration', None)
         if self.configuration:
             self.configuration.append_config_values(brcd_opts)
+            self.configuration.append_config_values(
+                fc_zone_service.zone_service_opts)
             # Adding a hack to handle parameters from super classes
             # in case configured with multiple back ends.
             fabric_names = self.configuration.safe_get('fc_fabric_names')
@@ -104,7 +110,6 @@ class BrcdFCZoneDriver(fc_zone_driver.FCZoneDriver):
                 self.fabric_configs = fabric_opts.load_fabric_configurations(
                     fabric_names)
 
-    @lockutils.synchronized('brcd', 'fcfabric-', True)
     def add_connection(self, fabric, initiator_target_map, host_name=None,
                        storage_system=None):
         """Concrete implementation of add_connection.
@@ -113,7 +118,8 @@ class BrcdFCZoneDriver(fc_zone_driver.FCZoneDriver):
         members are created and pushed to the fabric to add zones. The
         new zones created or zones updated are activated based on isActivate
         flag set in cinder.conf returned by volume driver after attach
-        operation.
+        operation. Requests for the same fabric are coalesced by the fabric
+        zone service and applied with a single activation.
 
         :param fabric: Fabric name from cinder.conf file
         :param initiator_target_map: Mapping of initiator to list of targets
@@ -127,8 +133,6 @@ class BrcdFCZoneDriver(fc_zone_driver.FCZoneDriver):
             'zoning_policy')
         zone_name_prefix = self.fabric_configs[fabric].safe_get(
             'zone_name_prefix')
-        zone_activate = self.fabric_configs[fabric].safe_get(
-            'zone_activate')
         if zoning_policy_fab:
             zoning_policy = zoning_policy_fab
         LOG.info(_LI("Zoning policy for Fabric %(policy)s"),
@@ -139,22 +143,42 @@ class BrcdFCZoneDriver(fc_zone_driver.FCZoneDriver):
                          "no zoning will be performed."))
             return
 
-        client = self._get_southbound_client(fabric)
-        cfgmap_from_fabric = self._get_active_zone_set(client)
-
-        zone_names = []
-        if cfgmap_from_fabric.get('zones'):
-            zone_names = cfgmap_from_fabric['zones'].keys()
-        # based on zoning policy, create zone member list and
-        # push changes to fabric.
-        for initiator_key in initiator_target_map.keys():
+        def _build_changes(cfgmap_from_fabric):
+            zone_names = []
+            if cfgmap_from_fabric.get('zones'):
+                zone_names = cfgmap_from_fabric['zones'].keys()
+            # based on zoning policy, create zone member list and
+            # push changes to fabric.
             zone_map = {}
-            initiator = initiator_key.lower()
-            target_list = initiator_target_map[initiator_key]
-            if zoning_policy == 'initiator-target':
-                for target in target_list:
-                    zone_members = [utils.get_formatted_wwn(initiator),
-                                    utils.get_formatted_wwn(target)]
+            for initiator_key in initiator_target_map.keys():
+                initiator = initiator_key.lower()
+                target_list = initiator_target_map[initiator_key]
+                if zoning_policy == 'initiator-target':
+                    for target in target_list:
+                        zone_members = [utils.get_formatted_wwn(initiator),
+                                        utils.get_formatted_wwn(target)]
+                        zone_name = driver_utils.get_friendly_zone_name(
+                            zoning_policy,
+                            initiator,
+                            target,
+                            host_name,
+                            storage_system,
+                            zone_name_prefix,
+                            SUPPORTED_CHARS)
+                        if (len(cfgmap_from_fabric) == 0 or (
+                                zone_name not in zone_names)):
+                            zone_map[zone_name] = zone_members
+                        else:
+                            # This is I-T zoning, skip if zone already
+                            # exists.
+                            LOG.info(_LI("Zone exists in I-T mode. Skipping "
+                                         "zone creation for %(zonename)s"),
+                                     {'zonename': zone_name})
+                elif zoning_policy == 'initiator':
+                    zone_members = [utils.get_formatted_wwn(initiator)]
+                    for target in target_list:
+                        zone_members.append(utils.get_formatted_wwn(target))
+
                     zone_name = driver_utils.get_friendly_zone_name(
                         zoning_policy,
                         initiator,
@@ -163,62 +187,31 @@ class BrcdFCZoneDriver(fc_zone_driver.FCZoneDriver):
                         storage_system,
                         zone_name_prefix,
                         SUPPORTED_CHARS)
-                    if (len(cfgmap_from_fabric) == 0 or (
-                            zone_name not in zone_names)):
-                        zone_map[zone_name] = zone_members
-                    else:
-                        # This is I-T zoning, skip if zone already exists.
-                        LOG.info(_LI("Zone exists in I-T mode. Skipping "
-                                     "zone creation for %(zonename)s"),
-                                 {'zonename': zone_name})
-            elif zoning_policy == 'initiator':
-                zone_members = [utils.get_formatted_wwn(initiator)]
-                for target in target_list:
-                    zone_members.append(utils.get_formatted_wwn(target))
-
-                zone_name = driver_utils.get_friendly_zone_name(
-                    zoning_policy,
-                    initiator,
-                    target,
-                    host_name,
-                    storage_system,
-                    zone_name_prefix,
-                    SUPPORTED_CHARS)
-
-                if len(zone_names) > 0 and (zone_name in zone_names):
-                    zone_members = zone_members + filter(
-                        lambda x: x not in zone_members,
-                        cfgmap_from_fabric['zones'][zone_name])
-
-                zone_map[zone_name] = zone_members
+
+                    if len(zone_names) > 0 and (zone_name in zone_names):
+                        zone_members = zone_members + filter(
+                            lambda x: x not in zone_members,
+                            cfgmap_from_fabric['zones'][zone_name])
+
+                    zone_map[zone_name] = zone_members
 
             LOG.info(_LI("Zone map to add: %(zonemap)s"),
                      {'zonemap': zone_map})
+            return zone_map, []
+
+        self._get_zone_service(fabric).submit(_build_changes)
+        LOG.debug("Zones added successfully for I-T map: %(i_t_map)s",
+                  {'i_t_map': initiator_target_map})
 
-            if len(zone_map) > 0:
-                try:
-                    client.add_zones(
-                        zone_map, zone_activate,
-                        cfgmap_from_fabric)
-                except (exception.BrocadeZoningCliException,
-                        exception.BrocadeZoningHttpException) as brocade_ex:
-                    raise exception.FCZoneDriverException(brocade_ex)
-                except Exception:
-                    msg = _("Failed to add zoning configuration.")
-                    LOG.exception(msg)
-                    raise exception.FCZoneDriverException(msg)
-                LOG.debug("Zones added successfully: %(zonemap)s",
-                          {'zonemap': zone_map})
-            client.cleanup()
-
-    @lockutils.synchronized('brcd', 'fcfabric-', True)
     def delete_connection(self, fabric, initiator_target_map, host_name=None,
                           storage_system=None):
         """Concrete implementation of delete_connection.
 
         Based on zoning policy and state of each I-T pair, list of zones
         are created for deletion. The zones are either updated deleted based
-        on the policy and attach/detach state of each I-T pair.
+        on the policy and attach/detach state of each I-T pair. Requests for
+        the same fabric are coalesced by the fabric zone service and applied
+        with a single activation.
 
         :param fabric: Fabric name from cinder.conf file
         :param initiator_target_map: Mapping of initiator to list of targets
@@ -232,34 +225,54 @@ class BrcdFCZoneDriver(fc_zone_driver.FCZoneDriver):
             'zoning_policy')
         zone_name_prefix = self.fabric_configs[fabric].safe_get(
             'zone_name_prefix')
-        zone_activate = self.fabric_configs[fabric].safe_get(
-            'zone_activate')
         if zoning_policy_fab:
             zoning_policy = zoning_policy_fab
         LOG.info(_LI("Zoning policy for fabric %(policy)s"),
                  {'policy': zoning_policy})
-        conn = self._get_southbound_client(fabric)
-        cfgmap_from_fabric = self._get_active_zone_set(conn)
-
-        zone_names = []
-        if cfgmap_from_fabric.get('zones'):
-            zone_names = cfgmap_from_fabric['zones'].keys()
-
-        # Based on zoning policy, get zone member list and push changes to
-        # fabric. This operation could result in an update for zone config
-        # with new member list or deleting zones from active cfg.
-        LOG.debug("zone config from Fabric: %(cfgmap)s",
-                  {'cfgmap': cfgmap_from_fabric})
-        for initiator_key in initiator_target_map.keys():
-            initiator = initiator_key.lower()
-            formatted_initiator = utils.get_formatted_wwn(initiator)
+
+        def _build_changes(cfgmap_from_fabric):
+            zone_names = []
+            if cfgmap_from_fabric.get('zones'):
+                zone_names = cfgmap_from_fabric['zones'].keys()
+
+            # Based on zoning policy, get zone member list and push changes
+            # to fabric. This operation could result in an update for zone
+            # config with new member list or deleting zones from active cfg.
+            LOG.debug("zone config from Fabric: %(cfgmap)s",
+                      {'cfgmap': cfgmap_from_fabric})
             zone_map = {}
             zones_to_delete = []
-            t_list = initiator_target_map[initiator_key]
-            if zoning_policy == 'initiator-target':
-                # In this case, zone needs to be deleted.
-                for t in t_list:
-                    target = t.lower()
+            for initiator_key in initiator_target_map.keys():
+                initiator = initiator_key.lower()
+                formatted_initiator = utils.get_formatted_wwn(initiator)
+                t_list = initiator_target_map[initiator_key]
+                if zoning_policy == 'initiator-target':
+                    # In this case, zone needs to be deleted.
+                    for t in t_list:
+                        target = t.lower()
+                        zone_name = driver_utils.get_friendly_zone_name(
+                            zoning_policy,
+                            initiator,
+                            target,
+                            host_name,
+                            storage_system,
+                            zone_name_prefix,
+                            SUPPORTED_CHARS)
+                        LOG.debug("Zone name to delete: %(zonename)s",
+                                  {'zonename': zone_name})
+                        if len(zone_names) > 0 and (zone_name in zone_names):
+                            # delete zone.
+                            LOG.debug("Added zone to delete to list: "
+                                      "%(zonename)s",
+                                      {'zonename': zone_name})
+                            zones_to_delete.append(zone_name)
+
+                elif zoning_policy == 'initiator':
+                    zone_members = [formatted_initiator]
+                    for t in t_list:
+                        target = t.lower()
+                        zone_members.append(utils.get_formatted_wwn(target))
+
                     zone_name = driver_utils.get_friendly_zone_name(
                         zoning_policy,
                         initiator,
@@ -268,90 +281,40 @@ class BrcdFCZoneDriver(fc_zone_driver.FCZoneDriver):
                         storage_system,
                         zone_name_prefix,
                         SUPPORTED_CHARS)
-                    LOG.debug("Zone name to delete: %(zonename)s",
-                              {'zonename': zone_name})
-                    if len(zone_names) > 0 and (zone_name in zone_names):
-                        # delete zone.
-                        LOG.debug("Added zone to delete to list: %(zonename)s",
-                                  {'zonename': zone_name})
-                        zones_to_delete.append(zone_name)
-
-            elif zoning_policy == 'initiator':
-                zone_members = [formatted_initiator]
-                for t in t_list:
-                    target = t.lower()
-                    zone_members.append(utils.get_formatted_wwn(target))
-
-                zone_name = driver_utils.get_friendly_zone_name(
-                    zoning_policy,
-                    initiator,
-                    target,
-                    host_name,
-                    storage_system,
-                    zone_name_prefix,
-                    SUPPORTED_CHARS)
-
-                if (zone_names and (zone_name in zone_names)):
-                    filtered_members = filter(
-                        lambda x: x not in zone_members,
-                        cfgmap_from_fabric['zones'][zone_name])
-
-                    # The assumption here is that initiator is always there
-                    # in the zone as it is 'initiator' policy. We find the
-                    # filtered list and if it is non-empty, add initiator
-                    # to it and update zone if filtered list is empty, we
-                    # remove that zone.
-                    LOG.debug("Zone delete - initiator mode: "
-                              "filtered targets: %(targets)s",
-                              {'targets': filtered_members})
-                    if filtered_members:
-                        filtered_members.append(formatted_initiator)
-                        LOG.debug("Filtered zone members to update: "
-                                  "%(members)s", {'members': filtered_members})
-                        zone_map[zone_name] = filtered_members
-                        LOG.debug("Filtered zone map to update: %(zonemap)s",
-                                  {'zonemap': zone_map})
-                    else:
-                        zones_to_delete.append(zone_name)
-            else:
-                LOG.warning(_LW("Zoning policy not recognized: %(policy)s"),
-                            {'policy': zoning_policy})
+
+                    if (zone_names and (zone_name in zone_names)):
+                        filtered_members = filter(
+                            lambda x: x not in zone_members,
+                            cfgmap_from_fabric['zones'][zone_name])
+
+                        # The assumption here is that initiator is always
+                        # there in the zone as it is 'initiator' policy. We
+                        # find the filtered list and if it is non-empty, add
+                        # initiator to it and update zone if filtered list is
+                        # empty, we remove that zone.
+                        LOG.debug("Zone delete - initiator mode: "
+                                  "filtered targets: %(targets)s",
+                                  {'targets': filtered_members})
+                        if filtered_members:
+                            filtered_members.append(formatted_initiator)
+                            LOG.debug("Filtered zone members to update: "
+                                      "%(members)s",
+                                      {'members': filtered_members})
+                            zone_map[zone_name] = filtered_members
+                            LOG.debug("Filtered zone map to update: "
+                                      "%(zonemap)s", {'zonemap': zone_map})
+                        else:
+                            zones_to_delete.append(zone_name)
+                else:
+                    LOG.warning(_LW("Zoning policy not recognized: "
+                                    "%(policy)s"), {'policy': zoning_policy})
             LOG.debug("Final zone map to update: %(zonemap)s",
                       {'zonemap': zone_map})
             LOG.debug("Final zone list to delete: %(zones)s",
                       {'zones': zones_to_delete})
-            try:
-                # Update zone membership.
-                if zone_map:
-                    conn.add_zones(
-                        zone_map, zone_activate,
-                        cfgmap_from_fabric)
-                # Delete zones ~sk.
-                if zones_to_delete:
-                    zone_name_string = ''
-                    num_zones = len(zones_to_delete)
-                    for i in range(0, num_zones):
-                        if i == 0:
-                            zone_name_string = (
-                                '%s%s' % (
-                                    zone_name_string, zones_to_delete[i]))
-                        else:
-                            zone_name_string = '%s;%s' % (
-                                zone_name_string, zones_to_delete[i])
-
-                    conn.delete_zones(
-                        zone_name_string, zone_activate,
-                        cfgmap_from_fabric)
-            except (exception.BrocadeZoningCliException,
-                    exception.BrocadeZoningHttpException) as brocade_ex:
-                raise exception.FCZoneDriverException(brocade_ex)
-            except Exception:
-                msg = _("Failed to update or delete zoning "
-                        "configuration.")
-                LOG.exception(msg)
-                raise exception.FCZoneDriverException(msg)
-            finally:
-                conn.cleanup()
+            return zone_map, zones_to_delete
+
+        self._get_zone_service(fabric).submit(_build_changes)
 
     def get_san_context(self, target_wwn_list):
         """Lookup SAN context for visible end devices.
@@ -372,31 +335,10 @@ class BrcdFCZoneDriver(fc_zone_driver.FCZoneDriver):
             LOG.debug("Formatted target WWN list: %(targetlist)s",
                       {'targetlist': formatted_target_list})
             for fabric_name in fabrics:
-                conn = self._get_southbound_client(fabric_name)
-
                 # Get name server data from fabric and get the targets
-                # logged in.
-                nsinfo = None
-                try:
-                    nsinfo = conn.get_nameserver_info()
-                    LOG.debug("Name server info from fabric: %(nsinfo)s",
-                              {'nsinfo': nsinfo})
-                except (exception.BrocadeZoningCliException,
-                        exception.BrocadeZoningHttpException):
-                    if not conn.is_supported_firmware():
-                        msg = _("Unsupported firmware on switch %s. Make sure "
-                                "switch is running firmware v6.4 or higher"
-                                ) % conn.switch_ip
-                        LOG.exception(msg)
-                        raise exception.FCZoneDriverException(msg)
-                    with excutils.save_and_reraise_exception():
-                        LOG.exception(_LE("Error getting name server info."))
-                except Exception:
-                    msg = _("Failed to get name server info.")
-                    LOG.exception(msg)
-                    raise exception.FCZoneDriverException(msg)
-                finally:
-                    conn.cleanup()
+                # logged in, serialized with the zoning of the fabric.
+                nsinfo = self._get_zone_service(fabric_name).execute(
+                    self._get_nameserver_info)
                 visible_targets = filter(
                     lambda x: x in formatted_target_list,
                     nsinfo)
@@ -417,6 +359,28 @@ class BrcdFCZoneDriver(fc_zone_driver.FCZoneDriver):
                   {'fabricmap': fabric_map})
         return fabric_map
 
+    def _get_nameserver_info(self, conn):
+        nsinfo = None
+        try:
+            nsinfo = conn.get_nameserver_info()
+            LOG.debug("Name server info from fabric: %(nsinfo)s",
+                      {'nsinfo': nsinfo})
+        except (exception.BrocadeZoningCliException,
+                exception.BrocadeZoningHttpException):
+            if not conn.is_supported_firmware():
+                msg = _("Unsupported firmware on switch %s. Make sure "
+                        "switch is running firmware v6.4 or higher"
+                        ) % conn.switch_ip
+                LOG.exception(msg)
+                raise exception.FCZoneDriverException(msg)
+            with excutils.save_and_reraise_exception():
+                LOG.exception(_LE("Error getting name server info."))
+        except Exception:
+            msg = _("Failed to get name server info.")
+            LOG.exception(msg)
+            raise exception.FCZoneDriverException(msg)
+        return nsinfo
+
     def _get_active_zone_set(self, conn):
         cfgmap = None
         try:
@@ -465,3 +429,47 @@ class BrcdFCZoneDriver(fc_zone_driver.FCZoneDriver):
             LOG.exception(msg)
             raise exception.FCZoneDriverException(msg)
         return client
+
+    def _get_zone_service(self, fabric):
+        """Return the zoning service sharing state for a fabric."""
+        service = self.zone_services.get(fabric)
+        if service is None:
+            service = self.zone_services.setdefault(
+                fabric,
+                fc_zone_service.FabricZoneService(
+                    fabric,
+                    functools.partial(self._get_southbound_client, fabric),
+                    self._get_active_zone_set,
+                    functools.partial(self._apply_zone_changes, fabric),
+                    'brcd',
+                    cache_ttl=self.configuration.fc_zone_cache_ttl,
+                    batch_window=self.configuration.fc_zone_batch_window))
+        return service
+
+    def _apply_zone_changes(self, fabric, conn, cfgmap_from_fabric, zone_map,
+                            zones_to_delete):
+        """Push zone updates and deletions with a single activation."""
+        zone_activate = self.fabric_configs[fabric].safe_get(
+            'zone_activate')
+        try:
+            # Update zone membership.
+            if zone_map:
+                conn.add_zones(
+                    zone_map, zone_activate and not zones_to_delete,
+                    cfgmap_from_fabric)
+            # Delete zones, the zones added above are still part of the
+            # active zone config.
+            if zones_to_delete:
+                zones = dict(cfgmap_from_fabric['zones'])
+                zones.update(zone_map)
+                cfgmap = dict(cfgmap_from_fabric, zones=zones)
+                conn.delete_zones(
+                    ';'.join(zones_to_delete), zone_activate, cfgmap)
+        except (exception.BrocadeZoningCliException,
+                exception.BrocadeZoningHttpException) as brocade_ex:
+            raise exception.FCZoneDriverException(brocade_ex)
+        except Exception:
+            msg = _("Failed to update or delete zoning "
+                    "configuration.")
+            LOG.exception(msg)
+            raise exception.FCZoneDriverException(msg)
@@ -27,7 +27,8 @@ add_connection and delete_connection interfaces.
 :zone_name_prefix: Used by: class: 'FCZoneDriver'. Defaults to 'openstack'
 """
 
-from oslo_concurrency import lockutils
+import functools
+
 from oslo_config import cfg
 from oslo_log import log as logging
 from oslo_utils import excutils
@@ -40,6 +41,7 @@ from cinder.i18n import _, _LE, _LI
 from cinder.zonemanager.drivers.cisco import cisco_fabric_opts as fabric_opts
 from cinder.zonemanager.drivers import driver_utils
 from cinder.zonemanager.drivers import fc_zone_driver
+from cinder.zonemanager import fc_zone_service
 from cinder.zonemanager import utils as zm_utils
 
 LOG = logging.getLogger(__name__)
@@ -65,15 +67,19 @@ class CiscoFCZoneDriver(fc_zone_driver.FCZoneDriver):
     Version history:
         1.0 - Initial Cisco FC zone driver
         1.1 - Added friendly zone name support
+        1.2 - Coalesces zoning requests per fabric and reuses connections
     """
 
-    VERSION = "1.1.0"
+    VERSION = "1.2.0"
 
     def __init__(self, **kwargs):
         super(CiscoFCZoneDriver, self).__init__(**kwargs)
+        self.zone_services = {}
         self.configuration = kwargs.get('configuration', None)
         if self.configuration:
             self.configuration.append_config_values(cisco_opts)
+            self.configuration.append_config_values(
+                fc_zone_service.zone_service_opts)
 
             # Adding a hack to handle parameters from super classes
             # in case configured with multi backends.
@@ -112,7 +118,6 @@ class CiscoFCZoneDriver(fc_zone_driver.FCZoneDriver):
                 self.fabric_configs = fabric_opts.load_fabric_configurations(
                     fabric_names)
 
-    @lockutils.synchronized('cisco', 'fcfabric-', True)
     def add_connection(self, fabric, initiator_target_map, host_name=None,
                        storage_system=None):
         """Concrete implementation of add_connection.
@@ -121,7 +126,8 @@ class CiscoFCZoneDriver(fc_zone_driver.FCZoneDriver):
         members are created and pushed to the fabric to add zones. The
         new zones created or zones updated are activated based on isActivate
         flag set in cinder.conf returned by volume driver after attach
-        operation.
+        operation. Requests for the same fabric are coalesced by the fabric
+        zone service and applied with a single activation.
 
         :param fabric: Fabric name from cinder.conf file
         :param initiator_target_map: Mapping of initiator to list of targets
@@ -130,38 +136,22 @@ class CiscoFCZoneDriver(fc_zone_driver.FCZoneDriver):
         LOG.debug("Add connection for Fabric: %s", fabric)
         LOG.info(_LI("CiscoFCZoneDriver - Add connection "
                      "for I-T map: %s"), initiator_target_map)
-        fabric_ip = self.fabric_configs[fabric].safe_get(
-            'cisco_fc_fabric_address')
-        fabric_user = self.fabric_configs[fabric].safe_get(
-            'cisco_fc_fabric_user')
-        fabric_pwd = self.fabric_configs[fabric].safe_get(
-            'cisco_fc_fabric_password')
-        fabric_port = self.fabric_configs[fabric].safe_get(
-            'cisco_fc_fabric_port')
         zoning_policy = self.configuration.zoning_policy
         zoning_policy_fab = self.fabric_configs[fabric].safe_get(
             'cisco_zoning_policy')
         if zoning_policy_fab:
             zoning_policy = zoning_policy_fab
 
-        zoning_vsan = self.fabric_configs[fabric].safe_get('cisco_zoning_vsan')
-
         LOG.info(_LI("Zoning policy for Fabric %s"), zoning_policy)
 
-        statusmap_from_fabric = self.get_zoning_status(
-            fabric_ip, fabric_user, fabric_pwd, fabric_port, zoning_vsan)
-
-        if statusmap_from_fabric.get('session') == 'none':
-
-            cfgmap_from_fabric = self.get_active_zone_set(
-                fabric_ip, fabric_user, fabric_pwd, fabric_port, zoning_vsan)
+        def _build_changes(cfgmap_from_fabric):
             zone_names = []
+            zone_map = {}
             if cfgmap_from_fabric.get('zones'):
                 zone_names = cfgmap_from_fabric['zones'].keys()
                 # based on zoning policy, create zone member list and
                 # push changes to fabric.
                 for initiator_key in initiator_target_map.keys():
-                    zone_map = {}
                     initiator = initiator_key.lower()
                     t_list = initiator_target_map[initiator_key]
                     if zoning_policy == 'initiator-target':
@@ -217,41 +207,21 @@ class CiscoFCZoneDriver(fc_zone_driver.FCZoneDriver):
                         raise exception.FCZoneDriverException(msg)
 
                 LOG.info(_LI("Zone map to add: %s"), zone_map)
+            return zone_map, []
 
-                if len(zone_map) > 0:
-                    conn = None
-                    try:
-                        conn = importutils.import_object(
-                            self.configuration.cisco_sb_connector,
-                            ipaddress=fabric_ip,
-                            username=fabric_user,
-                            password=fabric_pwd,
-                            port=fabric_port,
-                            vsan=zoning_vsan)
-                        conn.add_zones(
-                            zone_map, self.configuration.cisco_zone_activate,
-                            zoning_vsan, cfgmap_from_fabric,
-                            statusmap_from_fabric)
-                        conn.cleanup()
-                    except exception.CiscoZoningCliException as cisco_ex:
-                        msg = _("Exception: %s") % six.text_type(cisco_ex)
-                        raise exception.FCZoneDriverException(msg)
-                    except Exception:
-                        msg = _("Failed to add zoning configuration.")
-                        LOG.exception(msg)
-                        raise exception.FCZoneDriverException(msg)
-                LOG.debug("Zones added successfully: %s", zone_map)
-            else:
-                LOG.debug("Zoning session exists VSAN: %s", zoning_vsan)
+        self._get_zone_service(fabric).submit(_build_changes)
+        LOG.debug("Zones added successfully for I-T map: %s",
+                  initiator_target_map)
 
-    @lockutils.synchronized('cisco', 'fcfabric-', True)
     def delete_connection(self, fabric, initiator_target_map, host_name=None,
                           storage_system=None):
         """Concrete implementation of delete_connection.
 
         Based on zoning policy and state of each I-T pair, list of zones
         are created for deletion. The zones are either updated deleted based
-        on the policy and attach/detach state of each I-T pair.
+        on the policy and attach/detach state of each I-T pair. Requests for
+        the same fabric are coalesced by the fabric zone service and applied
+        with a single activation.
 
         :param fabric: Fabric name from cinder.conf file
         :param initiator_target_map: Mapping of initiator to list of targets
@@ -259,14 +229,6 @@ class CiscoFCZoneDriver(fc_zone_driver.FCZoneDriver):
         LOG.debug("Delete connection for fabric: %s", fabric)
         LOG.info(_LI("CiscoFCZoneDriver - Delete connection for I-T map: %s"),
                  initiator_target_map)
-        fabric_ip = self.fabric_configs[fabric].safe_get(
-            'cisco_fc_fabric_address')
-        fabric_user = self.fabric_configs[fabric].safe_get(
-            'cisco_fc_fabric_user')
-        fabric_pwd = self.fabric_configs[fabric].safe_get(
-            'cisco_fc_fabric_password')
-        fabric_port = self.fabric_configs[fabric].safe_get(
-            'cisco_fc_fabric_port')
         zoning_policy = self.configuration.zoning_policy
         zoning_policy_fab = self.fabric_configs[fabric].safe_get(
             'cisco_zoning_policy')
@@ -274,17 +236,9 @@ class CiscoFCZoneDriver(fc_zone_driver.FCZoneDriver):
         if zoning_policy_fab:
             zoning_policy = zoning_policy_fab
 
-        zoning_vsan = self.fabric_configs[fabric].safe_get('cisco_zoning_vsan')
-
         LOG.info(_LI("Zoning policy for fabric %s"), zoning_policy)
 
-        statusmap_from_fabric = self.get_zoning_status(
-            fabric_ip, fabric_user, fabric_pwd, fabric_port, zoning_vsan)
-
-        if statusmap_from_fabric.get('session') == 'none':
-            cfgmap_from_fabric = self.get_active_zone_set(
-                fabric_ip, fabric_user, fabric_pwd, fabric_port, zoning_vsan)
-
+        def _build_changes(cfgmap_from_fabric):
             zone_names = []
             if cfgmap_from_fabric.get('zones'):
                 zone_names = cfgmap_from_fabric['zones'].keys()
@@ -295,11 +249,11 @@ class CiscoFCZoneDriver(fc_zone_driver.FCZoneDriver):
             # active cfg.
 
             LOG.debug("zone config from Fabric: %s", cfgmap_from_fabric)
+            zone_map = {}
+            zones_to_delete = []
             for initiator_key in initiator_target_map.keys():
                 initiator = initiator_key.lower()
                 formatted_initiator = zm_utils.get_formatted_wwn(initiator)
-                zone_map = {}
-                zones_to_delete = []
                 t_list = initiator_target_map[initiator_key]
                 if zoning_policy == 'initiator-target':
                     # In this case, zone needs to be deleted.
@@ -361,50 +315,13 @@ class CiscoFCZoneDriver(fc_zone_driver.FCZoneDriver):
                 else:
                     LOG.info(_LI("Zoning Policy: %s, not recognized"),
                              zoning_policy)
-                LOG.debug("Final Zone map to update: %s", zone_map)
-                LOG.debug("Final Zone list to delete: %s", zones_to_delete)
-                conn = None
-                try:
-                    conn = importutils.import_object(
-                        self.configuration.cisco_sb_connector,
-                        ipaddress=fabric_ip,
-                        username=fabric_user,
-                        password=fabric_pwd,
-                        port=fabric_port,
-                        vsan=zoning_vsan)
-                    # Update zone membership.
-                    if zone_map:
-                        conn.add_zones(
-                            zone_map, self.configuration.cisco_zone_activate,
-                            zoning_vsan, cfgmap_from_fabric,
-                            statusmap_from_fabric)
-                    # Delete zones ~sk.
-                    if zones_to_delete:
-                        zone_name_string = ''
-                        num_zones = len(zones_to_delete)
-                        for i in range(0, num_zones):
-                            if i == 0:
-                                zone_name_string = ('%s%s' % (
-                                                    zone_name_string,
-                                                    zones_to_delete[i]))
-                            else:
-                                zone_name_string = ('%s%s%s' % (
-                                                    zone_name_string, ';',
-                                                    zones_to_delete[i]))
-
-                        conn.delete_zones(zone_name_string,
-                                          self.configuration.
-                                          cisco_zone_activate,
-                                          zoning_vsan, cfgmap_from_fabric,
-                                          statusmap_from_fabric)
-                    conn.cleanup()
-                except Exception:
-                    msg = _("Failed to update or delete zoning configuration")
-                    LOG.exception(msg)
-                    raise exception.FCZoneDriverException(msg)
-                LOG.debug("Zones deleted successfully: %s", zone_map)
-            else:
-                LOG.debug("Zoning session exists VSAN: %s", zoning_vsan)
+            LOG.debug("Final Zone map to update: %s", zone_map)
+            LOG.debug("Final Zone list to delete: %s", zones_to_delete)
+            return zone_map, zones_to_delete
+
+        self._get_zone_service(fabric).submit(_build_changes)
+        LOG.debug("Zones deleted successfully for I-T map: %s",
+                  initiator_target_map)
 
     def get_san_context(self, target_wwn_list):
         """Lookup SAN context for visible end devices.
@@ -424,31 +341,14 @@ class CiscoFCZoneDriver(fc_zone_driver.FCZoneDriver):
                     zm_utils.get_formatted_wwn(t.lower()))
             LOG.debug("Formatted Target wwn List: %s", formatted_target_list)
             for fabric_name in fabrics:
-                fabric_ip = self.fabric_configs[fabric_name].safe_get(
-                    'cisco_fc_fabric_address')
-                fabric_user = self.fabric_configs[fabric_name].safe_get(
-                    'cisco_fc_fabric_user')
-                fabric_pwd = self.fabric_configs[fabric_name].safe_get(
-                    'cisco_fc_fabric_password')
-                fabric_port = self.fabric_configs[fabric_name].safe_get(
-                    'cisco_fc_fabric_port')
-                zoning_vsan = self.fabric_configs[fabric_name].safe_get(
-                    'cisco_zoning_vsan')
-
                 # Get name server data from fabric and get the targets
-                # logged in.
+                # logged in, serialized with the zoning of the fabric.
                 nsinfo = None
                 try:
-                    conn = importutils.import_object(
-                        self.configuration.cisco_sb_connector,
-                        ipaddress=fabric_ip,
-                        username=fabric_user,
-                        password=fabric_pwd, port=fabric_port,
-                        vsan=zoning_vsan)
-                    nsinfo = conn.get_nameserver_info()
+                    nsinfo = self._get_zone_service(fabric_name).execute(
+                        lambda conn: conn.get_nameserver_info())
                     LOG.debug("show fcns database info from fabric: %s",
                               nsinfo)
-                    conn.cleanup()
                 except exception.CiscoZoningCliException:
                     with excutils.save_and_reraise_exception():
                         LOG.exception(_LE("Error getting show fcns database "
@@ -516,3 +416,89 @@ class CiscoFCZoneDriver(fc_zone_driver.FCZoneDriver):
             raise exception.FCZoneDriverException(msg)
         LOG.debug("Zoneset status from fabric: %s", statusmap)
         return statusmap
+
+    def _get_zone_service(self, fabric):
+        """Return the zoning service sharing state for a fabric."""
+        service = self.zone_services.get(fabric)
+        if service is None:
+            service = self.zone_services.setdefault(
+                fabric,
+                fc_zone_service.FabricZoneService(
+                    fabric,
+                    functools.partial(self._get_southbound_client, fabric),
+                    self._get_active_zone_set,
+                    functools.partial(self._apply_zone_changes, fabric),
+                    'cisco',
+                    cache_ttl=self.configuration.fc_zone_cache_ttl,
+                    batch_window=self.configuration.fc_zone_batch_window))
+        return service
+
+    def _get_southbound_client(self, fabric):
+        """Create the southbound connector of a fabric."""
+        fabric_ip = self.fabric_configs[fabric].safe_get(
+            'cisco_fc_fabric_address')
+        try:
+            LOG.debug("Southbound connector: %s",
+                      self.configuration.cisco_sb_connector)
+            conn = importutils.import_object(
+                self.configuration.cisco_sb_connector,
+                ipaddress=fabric_ip,
+                username=self.fabric_configs[fabric].safe_get(
+                    'cisco_fc_fabric_user'),
+                password=self.fabric_configs[fabric].safe_get(
+                    'cisco_fc_fabric_password'),
+                port=self.fabric_configs[fabric].safe_get(
+                    'cisco_fc_fabric_port'),
+                vsan=self.fabric_configs[fabric].safe_get(
+                    'cisco_zoning_vsan'))
+        except Exception:
+            msg = _("Failed to create south bound connector for %s.") % (
+                fabric_ip)
+            LOG.exception(msg)
+            raise exception.FCZoneDriverException(msg)
+        return conn
+
+    def _get_active_zone_set(self, conn):
+        cfgmap = {}
+        try:
+            cfgmap = conn.get_active_zone_set()
+        except Exception:
+            msg = _("Failed to access active zoning configuration.")
+            LOG.exception(msg)
+            raise exception.FCZoneDriverException(msg)
+        LOG.debug("Active zone set from fabric: %s", cfgmap)
+        return cfgmap
+
+    def _apply_zone_changes(self, fabric, conn, cfgmap_from_fabric, zone_map,
+                            zones_to_delete):
+        """Push zone updates and deletions with a single activation."""
+        zoning_vsan = self.fabric_configs[fabric].safe_get('cisco_zoning_vsan')
+        zone_activate = self.configuration.cisco_zone_activate
+        try:
+            statusmap_from_fabric = conn.get_zoning_status()
+        except Exception:
+            msg = _("Failed to access zoneset status.")
+            LOG.exception(msg)
+            raise exception.FCZoneDriverException(msg)
+        LOG.debug("Zoneset status from fabric: %s", statusmap_from_fabric)
+        if statusmap_from_fabric.get('session') != 'none':
+            LOG.debug("Zoning session exists VSAN: %s", zoning_vsan)
+            return False
+
+        try:
+            # Update zone membership.
+            if zone_map:
+                conn.add_zones(
+                    zone_map, zone_activate and not zones_to_delete,
+                    zoning_vsan, cfgmap_from_fabric, statusmap_from_fabric)
+            if zones_to_delete:
+                conn.delete_zones(';'.join(zones_to_delete), zone_activate,
+                                  zoning_vsan, cfgmap_from_fabric,
+                                  statusmap_from_fabric)
+        except exception.CiscoZoningCliException as cisco_ex:
+            msg = _("Exception: %s") % six.text_type(cisco_ex)
+            raise exception.FCZoneDriverException(msg)
+        except Exception:
+            msg = _("Failed to update or delete zoning configuration")
+            LOG.exception(msg)
+            raise exception.FCZoneDriverException(msg)
@@ -76,10 +76,11 @@ class ZoneManager(fc_common.FCCommon):
            1.0 - Initial version
            1.0.1 - Added __new__ for singleton
            1.0.2 - Added friendly zone name
+           1.0.3 - Build the zone driver once per process
 
     """
 
-    VERSION = "1.0.2"
+    VERSION = "1.0.3"
     driver = None
     fabric_names = []
 
@@ -94,7 +95,10 @@ class ZoneManager(fc_common.FCCommon):
 
         self.configuration = config.Configuration(zone_manager_opts,
                                                   'fc-zone-manager')
-        self._build_driver()
+        # The singleton is initialized again for every attach and detach,
+        # the driver and its per fabric state are kept across them.
+        if self.driver is None:
+            self._build_driver()
 
     def _build_driver(self):
         zone_driver = self.configuration.zone_driver
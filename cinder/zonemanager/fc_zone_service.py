@@ -0,0 +1,262 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+#
+"""
+Per fabric zoning service shared by the FC zone drivers.
+
+A FabricZoneService serializes the zoning of one fabric, keeps a versioned
+copy of the active zone set and applies queued zoning requests as a single
+transaction, so a burst of attaches or detaches results in one zone
+configuration update and one activation instead of one per request. The
+southbound connection opened for a transaction is closed when it ends.
+
+**Related Flags**
+
+:fc_zone_cache_ttl: Used by: class: 'FabricZoneService'. Defaults to 0
+:fc_zone_batch_window: Used by: class: 'FabricZoneService'. Defaults to 0
+"""
+
+import copy
+import threading
+import time
+
+from oslo_concurrency import lockutils
+from oslo_config import cfg
+from oslo_log import log as logging
+
+from cinder.i18n import _LW
+
+
+LOG = logging.getLogger(__name__)
+
+zone_service_opts = [
+    cfg.IntOpt('fc_zone_cache_ttl',
+               default=0,
+               min=0,
+               help='Number of seconds the active zone set read from a '
+                    'fabric is reused to evaluate zoning requests. Changes '
+                    'are always validated against a fresh copy before they '
+                    'are pushed to the fabric, but requests found to need no '
+                    'change are skipped based on the cached copy. Only set '
+                    'this when a single cinder-volume host manages the '
+                    'zones of the fabric, zones changed by other hosts are '
+                    'not seen until the copy expires.'),
+    cfg.FloatOpt('fc_zone_batch_window',
+                 default=0,
+                 help='Number of seconds a zoning request waits for other '
+                      'requests on the same fabric before the queued '
+                      'requests are applied with a single activation. '
+                      'Requests queued while a zoning transaction is running '
+                      'are always applied together.'),
+]
+
+CONF = cfg.CONF
+CONF.register_opts(zone_service_opts, group='fc-zone-manager')
+
+
+def _members_key(members):
+    # Switches may report members without colons or in another case.
+    return set(m.lower().replace(':', '') for m in members)
+
+
+class _ZoneRequest(object):
+
+    def __init__(self, build_changes):
+        self.build_changes = build_changes
+        self.done = False
+        self.error = None
+
+
+class FabricZoneService(object):
+    """Cached zone database and transactional zoning for one fabric.
+
+    Every zoning transaction and every execute call gets a new southbound
+    client, which is cleaned up once it is done, as switches limit and
+    expire the sessions kept open to them.
+
+    The vendor specific parts are provided as callables:
+
+    :param connect: returns a new southbound client for the fabric
+    :param get_zone_set: reads the active zone set through a client, in the
+                         {'zones': {name: members},
+                         'active_zone_config': name} format
+    :param apply_changes: pushes a zone map to add or update and a list of
+                          zone names to delete with one activation. May
+                          return False when the fabric did not take the
+                          changes.
+    :param lock_name: name of the external lock serializing zone changes
+    """
+
+    def __init__(self, fabric, connect, get_zone_set, apply_changes,
+                 lock_name, cache_ttl=0, batch_window=0):
+        self.fabric = fabric
+        self.version = 0
+        self._connect = connect
+        self._get_zone_set = get_zone_set
+        self._apply_changes = apply_changes
+        self._lock_name = lock_name
+        self._cache_ttl = cache_ttl
+        self._batch_window = batch_window
+        self._client = None
+        self._zone_set = None
+        self._zone_set_time = 0
+        self._queue_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._pending = []
+
+    def submit(self, build_changes):
+        """Queue a zoning request and wait until it has been applied.
+
+        :param build_changes: callable evaluated against the zone set the
+                              request is applied on, returning a tuple of the
+                              zone map to add or update and the list of zone
+                              names to delete
+        """
+        request = _ZoneRequest(build_changes)
+        with self._queue_lock:
+            self._pending.append(request)
+        if self._batch_window:
+            time.sleep(self._batch_window)
+        with self._lock:
+            # Another request applied our changes while we were waiting.
+            if not request.done:
+                with self._queue_lock:
+                    batch, self._pending = self._pending, []
+                self._apply_batch(batch)
+        if request.error:
+            raise request.error
+
+    def execute(self, func):
+        """Run func with a fabric client, serialized with zone changes."""
+        with self._lock:
+            try:
+                return func(self._get_client())
+            except Exception:
+                self._zone_set = None
+                raise
+            finally:
+                self._release()
+
+    def _get_client(self):
+        if self._client is None:
+            self._client = self._connect()
+        return self._client
+
+    def _release(self):
+        client, self._client = self._client, None
+        if client is not None:
+            try:
+                client.cleanup()
+            except Exception:
+                LOG.warning(_LW("Failed to close connection to fabric "
+                                "%(fabric)s."), {'fabric': self.fabric})
+
+    def _read_zone_set(self):
+        zone_set = dict(self._get_zone_set(self._get_client()) or {})
+        zone_set.setdefault('zones', {})
+        self._zone_set = zone_set
+        self._zone_set_time = time.time()
+        self.version += 1
+        return zone_set
+
+    def _cached_zone_set(self):
+        if (self._zone_set is not None and
+                time.time() - self._zone_set_time < self._cache_ttl):
+            return self._zone_set, False
+        return self._read_zone_set(), True
+
+    def _apply_batch(self, batch):
+        with lockutils.lock(self._lock_name, 'fcfabric-', True):
+            try:
+                self._transaction(batch)
+            except Exception as ex:
+                self._zone_set = None
+                self._fail(batch, ex)
+            finally:
+                self._release()
+
+    def _fail(self, batch, ex):
+        for request in batch:
+            if not request.done:
+                request.error = ex
+                request.done = True
+
+    def _transaction(self, batch):
+        zone_set, fresh = self._cached_zone_set()
+        zones, zone_map, zones_to_delete = self._merge(batch, zone_set)
+        if not zone_map and not zones_to_delete:
+            LOG.debug("No zone changes needed on fabric %(fabric)s for "
+                      "%(count)d request(s).",
+                      {'fabric': self.fabric, 'count': len(batch)})
+            self._complete(batch)
+            return
+        if not fresh:
+            # Changes are pushed relative to what the switch has now and
+            # some southbound clients rebuild the whole zone database from
+            # their last read.
+            zone_set = self._read_zone_set()
+            zones, zone_map, zones_to_delete = self._merge(batch, zone_set)
+            if not zone_map and not zones_to_delete:
+                self._complete(batch)
+                return
+        LOG.debug("Applying %(count)d zoning request(s) on fabric "
+                  "%(fabric)s: zones to add or update %(zonemap)s, zones to "
+                  "delete %(zones)s.",
+                  {'count': len(batch), 'fabric': self.fabric,
+                   'zonemap': zone_map, 'zones': zones_to_delete})
+        applied = self._apply_changes(self._get_client(), zone_set,
+                                      zone_map, zones_to_delete)
+        if (applied is False or not zones or
+                not zone_set.get('active_zone_config')):
+            # The resulting active config is only known by the switch.
+            self._zone_set = None
+        else:
+            self._zone_set = {
+                'active_zone_config': zone_set['active_zone_config'],
+                'zones': zones}
+            self._zone_set_time = time.time()
+            self.version += 1
+        self._complete(batch)
+
+    def _merge(self, batch, zone_set):
+        """Evaluate the requests in order and diff the result.
+
+        Each request sees the changes of the requests queued before it, so
+        requests updating the same zone compose instead of overwriting each
+        other.
+        """
+        working = copy.deepcopy(zone_set)
+        zones = working['zones']
+        for request in batch:
+            if request.done:
+                continue
+            try:
+                zone_map, zones_to_delete = request.build_changes(working)
+            except Exception as ex:
+                request.error = ex
+                request.done = True
+                continue
+            zones.update(zone_map)
+            for zone_name in zones_to_delete:
+                zones.pop(zone_name, None)
+
+        current = zone_set['zones']
+        zone_map = dict(
+            (name, members) for name, members in zones.items()
+            if (name not in current or
+                _members_key(members) != _members_key(current[name])))
+        zones_to_delete = [name for name in current if name not in zones]
+        return zones, zone_map, zones_to_delete
+
+    def _complete(self, batch):
+        for request in batch:
+            request.done = True